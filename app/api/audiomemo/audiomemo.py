@@ -1,14 +1,15 @@
 from fastapi import APIRouter, File, UploadFile, HTTPException
 from fastapi.responses import JSONResponse
-from openai import OpenAI
 from dotenv import load_dotenv
 import os
 import io
 
+from app.api.utils.llm_util import llm_provider
+
 load_dotenv()
 
-apikey = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=apikey)
+# 공유 커넥션 풀을 쓰는 비동기 클라이언트
+client = llm_provider.async_openai()
 
 
 router = APIRouter()
@@ -24,7 +25,7 @@ async def whisper(file: UploadFile = File(...)):
 
         # whisper api call
         print("Get Text...")
-        transcription = client.audio.transcriptions.create(
+        transcription = await client.audio.transcriptions.create(
             model="whisper-1", file=buffer, language="ko"
         )
 
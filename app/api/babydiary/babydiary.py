@@ -27,7 +27,7 @@ async def process_report(diary_input: DiaryInput):
     notice = diary_input.report
 
     # 키워드 추출 체인 실행
-    report = extract_keyword_chain.invoke({"report": notice})
+    report = await extract_keyword_chain.ainvoke({"report": notice})
 
     # 유효한 일기가 아니면 예외 발생
     if report["is_valid"] == False:
@@ -36,7 +36,7 @@ async def process_report(diary_input: DiaryInput):
     report.pop("is_valid", None)
 
     # 일기 작성 체인 실행
-    result = write_diary_chain.invoke(
+    result = await write_diary_chain.ainvoke(
         {
             "name": report["name"],
             "emotion": report["emotion"],
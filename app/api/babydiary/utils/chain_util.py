@@ -1,8 +1,8 @@
 import os
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
 from app.api.babydiary.models import DaycareReport
+from app.api.utils.llm_util import llm_provider
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -33,9 +33,7 @@ def setup_extract_keyword_chain():
     )
 
     # 모델 및 체인 설정
-    model = ChatOpenAI(
-        model_name=llm_model, temperature=0, openai_api_key=openai_api_key
-    )
+    model = llm_provider.chat(llm_model, temperature=0)
     chain = prompt | model | output_parser
 
     return chain
@@ -51,8 +49,6 @@ def setup_write_diary_chain():
     prompt = PromptTemplate.from_template(
         template=template,
     )
-    model = ChatOpenAI(
-        model_name=llm_model, temperature=0, openai_api_key=openai_api_key
-    )
+    model = llm_provider.chat(llm_model, temperature=0)
     chain = prompt | model | output_parser
     return chain
@@ -0,0 +1,209 @@
+"""Regression check and benchmark for the CRAFT box post-processing.
+
+Runs the sub-window `getDetBoxes_core` (EasyOCR) and `get_det_boxes_core`
+(brainOCR) against the original full-map implementation kept below, checks
+that boxes, labels and mapper are bit-identical, and reports the speed-up.
+
+Usage:
+    python benchmarks/bench_craft_postprocess.py [--size 1280] [--seeds 0 1 2] [--repeat 3]
+    python benchmarks/bench_craft_postprocess.py --maps maps.npz  # real textmap/linkmap arrays
+"""
+
+import argparse
+import math
+import sys
+import time
+
+import cv2
+import numpy as np
+from scipy.ndimage import label
+
+from easyocr.craft_utils import getDetBoxes_core
+from betterocr.engines.easy_pororo_ocr.pororo.models.brainOCR.craft_utils import (
+    get_det_boxes_core,
+)
+
+# CRAFT defaults used by both readers
+TEXT_THRESHOLD = 0.7
+LINK_THRESHOLD = 0.4
+LOW_TEXT = 0.4
+
+
+def reference_det_boxes_core(
+    textmap, linkmap, text_threshold, link_threshold, low_text, estimate_num_chars=False
+):
+    """The original implementation, one full-map pass per connected component."""
+    linkmap = linkmap.copy()
+    textmap = textmap.copy()
+    img_h, img_w = textmap.shape
+
+    ret, text_score = cv2.threshold(textmap, low_text, 1, 0)
+    ret, link_score = cv2.threshold(linkmap, link_threshold, 1, 0)
+
+    text_score_comb = np.clip(text_score + link_score, 0, 1)
+    nLabels, labels, stats, centroids = cv2.connectedComponentsWithStats(
+        text_score_comb.astype(np.uint8), connectivity=4
+    )
+
+    det = []
+    mapper = []
+    for k in range(1, nLabels):
+        size = stats[k, cv2.CC_STAT_AREA]
+        if size < 10:
+            continue
+
+        if np.max(textmap[labels == k]) < text_threshold:
+            continue
+
+        segmap = np.zeros(textmap.shape, dtype=np.uint8)
+        segmap[labels == k] = 255
+        if estimate_num_chars:
+            _, character_locs = cv2.threshold(
+                (textmap - linkmap) * segmap / 255.0, text_threshold, 1, 0
+            )
+            _, n_chars = label(character_locs)
+            mapper.append(n_chars)
+        else:
+            mapper.append(k)
+        segmap[np.logical_and(link_score == 1, text_score == 0)] = 0
+        x, y = stats[k, cv2.CC_STAT_LEFT], stats[k, cv2.CC_STAT_TOP]
+        w, h = stats[k, cv2.CC_STAT_WIDTH], stats[k, cv2.CC_STAT_HEIGHT]
+        niter = int(math.sqrt(size * min(w, h) / (w * h)) * 2)
+        sx, ex, sy, ey = x - niter, x + w + niter + 1, y - niter, y + h + niter + 1
+        if sx < 0:
+            sx = 0
+        if sy < 0:
+            sy = 0
+        if ex >= img_w:
+            ex = img_w
+        if ey >= img_h:
+            ey = img_h
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1 + niter, 1 + niter))
+        segmap[sy:ey, sx:ex] = cv2.dilate(segmap[sy:ey, sx:ex], kernel)
+
+        np_contours = (
+            np.roll(np.array(np.where(segmap != 0)), 1, axis=0)
+            .transpose()
+            .reshape(-1, 2)
+        )
+        rectangle = cv2.minAreaRect(np_contours)
+        box = cv2.boxPoints(rectangle)
+
+        w, h = np.linalg.norm(box[0] - box[1]), np.linalg.norm(box[1] - box[2])
+        box_ratio = max(w, h) / (min(w, h) + 1e-5)
+        if abs(1 - box_ratio) <= 0.1:
+            l, r = min(np_contours[:, 0]), max(np_contours[:, 0])
+            t, b = min(np_contours[:, 1]), max(np_contours[:, 1])
+            box = np.array([[l, t], [r, t], [r, b], [l, b]], dtype=np.float32)
+
+        startidx = box.sum(axis=1).argmin()
+        box = np.roll(box, 4 - startidx, 0)
+        box = np.array(box)
+
+        det.append(box)
+
+    return det, labels, mapper
+
+
+def synthetic_maps(size, seed):
+    """Text/link heatmaps shaped like CRAFT output for a dense newsletter scan."""
+    rng = np.random.default_rng(seed)
+    textmap = np.zeros((size, size), dtype=np.float32)
+    linkmap = np.zeros((size, size), dtype=np.float32)
+
+    line_height = 12
+    for top in range(8, size - line_height, line_height + rng.integers(4, 12)):
+        left = int(rng.integers(0, size // 8))
+        while left < size - 20:
+            # one word: a run of character blobs joined by link blobs
+            n_chars = int(rng.integers(1, 8))
+            char_w = int(rng.integers(5, 10))
+            for i in range(n_chars):
+                cx = left + i * char_w + char_w // 2
+                if cx >= size - 4:
+                    break
+                cy = top + line_height // 2
+                cv2.circle(textmap, (cx, cy), char_w // 2, float(rng.uniform(0.6, 1.0)), -1)
+                if i:
+                    cv2.circle(linkmap, (cx - char_w // 2, cy), 2, float(rng.uniform(0.3, 0.9)), -1)
+            left += n_chars * char_w + int(rng.integers(6, 30))
+
+    # speckle noise: tiny components that the size filter has to drop
+    for _ in range(size):
+        cx, cy = rng.integers(0, size, 2)
+        cv2.circle(textmap, (int(cx), int(cy)), 1, float(rng.uniform(0.3, 0.8)), -1)
+
+    textmap = cv2.GaussianBlur(textmap, (5, 5), 0)
+    linkmap = cv2.GaussianBlur(linkmap, (3, 3), 0)
+    return np.clip(textmap, 0, 1), np.clip(linkmap, 0, 1)
+
+
+def same_output(expected, actual):
+    exp_boxes, exp_labels, exp_mapper = expected
+    boxes, labels, mapper = actual
+    if len(exp_boxes) != len(boxes) or list(exp_mapper) != list(mapper):
+        return False
+    if not np.array_equal(exp_labels, labels):
+        return False
+    return all(
+        a.dtype == b.dtype and a.shape == b.shape and np.array_equal(a, b)
+        for a, b in zip(exp_boxes, boxes)
+    )
+
+
+def best_time(func, args, repeat):
+    elapsed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed.append(time.perf_counter() - start)
+    return min(elapsed), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=1280)
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0, 1, 2])
+    parser.add_argument("--maps", type=str, help="npz file with textmap and linkmap")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.maps:
+        data = np.load(args.maps)
+        cases = [(args.maps, data["textmap"], data["linkmap"])]
+    else:
+        cases = [
+            (f"synthetic {args.size}px seed={seed}", *synthetic_maps(args.size, seed))
+            for seed in args.seeds
+        ]
+
+    implementations = [
+        ("easyocr", lambda *a: getDetBoxes_core(*a), False),
+        ("easyocr chars", lambda *a: getDetBoxes_core(*a, estimate_num_chars=True), True),
+        ("brainocr", get_det_boxes_core, False),
+    ]
+
+    failed = False
+    for name, textmap, linkmap in cases:
+        maps = (textmap, linkmap, TEXT_THRESHOLD, LINK_THRESHOLD, LOW_TEXT)
+        print(f"{name}:")
+        for impl_name, func, estimate_num_chars in implementations:
+            ref_seconds, expected = best_time(
+                lambda *a: reference_det_boxes_core(*a, estimate_num_chars=estimate_num_chars),
+                maps,
+                args.repeat,
+            )
+            seconds, actual = best_time(func, maps, args.repeat)
+            same = same_output(expected, actual)
+            failed |= not same
+            print(
+                f"  {impl_name:<14} boxes {len(actual[0]):<5}"
+                f" full-map {ref_seconds * 1000:8.1f}ms  sub-window {seconds * 1000:8.1f}ms"
+                f"  x{ref_seconds / seconds:.1f}  {'identical' if same else 'MISMATCH'}"
+            )
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
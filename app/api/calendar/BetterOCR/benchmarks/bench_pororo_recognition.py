@@ -0,0 +1,55 @@
+"""Compare EasyPororoOcr per-ROI recognition against the batched path.
+
+Usage:
+    python benchmarks/bench_pororo_recognition.py IMAGE [--batch-sizes 8 16 32] [--repeat 3]
+"""
+
+import argparse
+import time
+
+from betterocr.engines.easy_pororo_ocr import EasyPororoOcr, load_with_filter
+
+
+def run(ocr, image, batch_size, repeat):
+    elapsed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ocr.run_ocr(image, batch_size=batch_size)
+        elapsed.append(time.perf_counter() - start)
+    return min(elapsed), ocr.get_boxes()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("image", type=str)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[8, 16, 32])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--cpu", action="store_true")
+    args = parser.parse_args()
+
+    image = load_with_filter(args.image)
+    ocr = EasyPororoOcr(["ko", "en"], gpu=not args.cpu)
+
+    # first call loads the models into the registry, keep it out of the timings
+    ocr.run_ocr(image, batch_size=None)
+
+    baseline, baseline_boxes = run(ocr, image, None, args.repeat)
+    n_lines = len(ocr.detect_result[0][0]) + len(ocr.detect_result[1][0])
+    print(f"lines: {n_lines}")
+    print(f"per-ROI   : {baseline:.3f}s  {n_lines / baseline:.1f} lines/sec")
+
+    expected = {tuple(map(tuple, item["box"])): item["text"] for item in baseline_boxes}
+    for batch_size in args.batch_sizes:
+        seconds, boxes = run(ocr, image, batch_size, args.repeat)
+        same = sum(
+            expected.get(tuple(map(tuple, item["box"]))) == item["text"]
+            for item in boxes
+        )
+        print(
+            f"batch={batch_size:<4}: {seconds:.3f}s  {n_lines / seconds:.1f} lines/sec"
+            f"  x{baseline / seconds:.1f}  same text {same}/{len(expected)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,14 @@ from .detect import (
     NoTextDetectedError,
 )
 from .wrappers import job_easy_ocr, job_tesseract
+from .wrappers.tesseract import close_tesseract_engines
 from .parsers import extract_json
+from .cache import OCRCache, ocr_cache
+from .registry import ModelRegistry, model_registry, warmup
+from .tracing import set_span_factory
+from .process_pool import EngineProcessPool, WorkerTimeoutError
+from .gate import DocumentGate, LogisticGate, NotADocumentError
+from .consensus import ConsensusMerger
 
 __all__ = [
     "detect",
@@ -20,7 +27,20 @@ __all__ = [
     "NoTextDetectedError",
     "job_easy_ocr",
     "job_tesseract",
+    "close_tesseract_engines",
     "extract_json",
+    "OCRCache",
+    "ocr_cache",
+    "ModelRegistry",
+    "model_registry",
+    "warmup",
+    "set_span_factory",
+    "EngineProcessPool",
+    "WorkerTimeoutError",
+    "DocumentGate",
+    "LogisticGate",
+    "NotADocumentError",
+    "ConsensusMerger",
 ]
 
 __author__ = "junhoyeo"
@@ -0,0 +1,178 @@
+from collections import OrderedDict
+from threading import Lock
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from .image import load_image
+
+
+def image_digest(image) -> str:
+    """SHA-256 of the decoded pixels (plus shape/dtype) of an image.
+
+    `image` is anything `load_image` accepts. Hashing decoded pixels means the
+    same photo hits the cache regardless of the file name or S3 key it was
+    uploaded under.
+    """
+    image = np.ascontiguousarray(load_image(image).rgb)
+    digest = hashlib.sha256()
+    digest.update(f"{image.shape}:{image.dtype}".encode())
+    digest.update(image.data)
+    return digest.hexdigest()
+
+
+def make_key(*parts) -> str:
+    """Build a cache key from the image digest and JSON-serializable options."""
+    return hashlib.sha256(
+        json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str).encode()
+    ).hexdigest()
+
+
+class OCRCache:
+    """Two-tier cache for OCR results.
+
+    An in-memory LRU (`max_entries`) sits in front of an optional SQLite file
+    (`path`). Both tiers expire entries after `ttl` seconds; the disk tier
+    also drops least recently used rows once it holds more than
+    `max_disk_bytes` of values. Values must be JSON-serializable.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        path: str = None,
+        ttl: float = 7 * 24 * 3600,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._memory = OrderedDict()
+        self._lock = Lock()
+
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS ocr_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL
+                )"""
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS ocr_cache_accessed ON ocr_cache (accessed)"
+            )
+            self._db.commit()
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created = entry
+                if not self._expired(created, now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created FROM ocr_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if not self._expired(row[1], now):
+                        self._db.execute(
+                            "UPDATE ocr_cache SET accessed = ? WHERE key = ?",
+                            (now, key),
+                        )
+                        self._db.commit()
+                        value = json.loads(row[0])
+                        self._put_memory(key, value, row[1])
+                        self.hits += 1
+                        return value
+                    self._db.execute("DELETE FROM ocr_cache WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value):
+        now = time.time()
+        with self._lock:
+            self._put_memory(key, value, now)
+
+            if self._db is not None:
+                data = json.dumps(value, ensure_ascii=False, default=int)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO ocr_cache VALUES (?, ?, ?, ?, ?)",
+                    (key, data, len(data.encode()), now, now),
+                )
+                self._evict_disk(now)
+                self._db.commit()
+
+    def _put_memory(self, key, value, created):
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now: float):
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM ocr_cache WHERE created < ?", (now - self.ttl,))
+
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+
+        rows = self._db.execute(
+            "SELECT key, size FROM ocr_cache ORDER BY accessed ASC"
+        ).fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_disk_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM ocr_cache WHERE key = ?", evicted)
+        logging.info(f"[*] OCR cache evicted {len(evicted)} entries from disk")
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM ocr_cache")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+            }
+            if self._db is not None:
+                count, size = self._db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_cache"
+                ).fetchone()
+                stats.update({"disk_entries": count, "disk_bytes": size})
+        return stats
+
+
+# default in-memory cache used by detect_text / detect_boxes
+ocr_cache = OCRCache()
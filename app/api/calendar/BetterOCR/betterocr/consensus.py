@@ -0,0 +1,285 @@
+"""Local consensus over the outputs of several OCR engines.
+
+Engine outputs are aligned line by line (by box overlap for box results,
+otherwise by character similarity) and every character of a line is voted on.
+Lines a majority of the engines read identically are emitted as they are;
+only the disputed lines need the LLM, and when almost everything agrees the
+LLM merge can be skipped.
+"""
+
+from threading import Lock
+import difflib
+import logging
+import unicodedata
+
+# what EasyPororoOcr returns for an empty page
+NO_TEXT = "No text detected."
+
+
+def split_lines(text) -> list[str]:
+    """Lines of an engine's text output (engines join lines with a literal ``\\n``)."""
+    if not isinstance(text, str) or text.strip() == NO_TEXT:
+        return []
+    lines = text.replace("\\n", "\n").split("\n")
+    return [line.strip() for line in lines if line.strip()]
+
+
+def compact(text: str) -> str:
+    # engines disagree on spacing (especially in Korean) far more than on characters
+    return "".join(unicodedata.normalize("NFKC", text).split())
+
+
+def similarity(a: str, b: str) -> float:
+    a, b = compact(a), compact(b)
+    if not a and not b:
+        return 1.0
+    return difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def align_lines(base: list[str], other: list[str], min_similarity: float = 0.5):
+    """Monotonic ``(i, j)`` pairs of similar lines maximizing the total similarity."""
+    n, m = len(base), len(other)
+    score = [[0.0] * (m + 1) for _ in range(n + 1)]
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            best = max(score[i - 1][j], score[i][j - 1])
+            matcher = difflib.SequenceMatcher(
+                None, compact(base[i - 1]), compact(other[j - 1]), autojunk=False
+            )
+            if matcher.real_quick_ratio() >= min_similarity:
+                sim = matcher.ratio()
+                if sim >= min_similarity:
+                    best = max(best, score[i - 1][j - 1] + sim)
+            score[i][j] = best
+
+    pairs = []
+    i, j = n, m
+    while i > 0 and j > 0:
+        if score[i][j] == score[i - 1][j]:
+            i -= 1
+        elif score[i][j] == score[i][j - 1]:
+            j -= 1
+        else:
+            pairs.append((i - 1, j - 1))
+            i, j = i - 1, j - 1
+    return pairs[::-1]
+
+
+def bounding_rect(box):
+    xs = [point[0] for point in box]
+    ys = [point[1] for point in box]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def iou(a, b) -> float:
+    ax1, ay1, ax2, ay2 = bounding_rect(a)
+    bx1, by1, bx2, by2 = bounding_rect(b)
+    w = min(ax2, bx2) - max(ax1, bx1)
+    h = min(ay2, by2) - max(ay1, by1)
+    if w <= 0 or h <= 0:
+        return 0.0
+    inter = w * h
+    union = (ax2 - ax1) * (ay2 - ay1) + (bx2 - bx1) * (by2 - by1) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def align_boxes(base: list[dict], other: list[dict], min_iou: float = 0.3):
+    """Greedy ``(i, j)`` pairs of overlapping boxes, best overlap first."""
+    candidates = sorted(
+        (
+            (overlap, i, j)
+            for i, a in enumerate(base)
+            for j, b in enumerate(other)
+            if (overlap := iou(a["box"], b["box"])) >= min_iou
+        ),
+        reverse=True,
+    )
+    used_i, used_j, pairs = set(), set(), []
+    for _, i, j in candidates:
+        if i not in used_i and j not in used_j:
+            used_i.add(i)
+            used_j.add(j)
+            pairs.append((i, j))
+    return sorted(pairs)
+
+
+class ConsensusLine:
+    """One aligned line: what each engine read (None if it missed the line) and the vote."""
+
+    def __init__(self, candidates: list, box=None):
+        self.candidates = candidates
+        self.box = box
+        self.text = ""
+        self.agreed = False
+        self.agreed_chars = 0
+        self.total_chars = 0
+
+    def vote(self, n_engines: int):
+        """Majority vote per character of the medoid reading."""
+        texts = [text for text in self.candidates if text]
+        if not texts:
+            return
+        pivot = max(range(len(texts)), key=lambda k: sum(similarity(texts[k], t) for t in texts))
+        self.text = texts[pivot]
+        reference = compact(self.text)
+        votes = [1] * len(reference)
+        for k, text in enumerate(texts):
+            if k == pivot:
+                continue
+            matcher = difflib.SequenceMatcher(None, reference, compact(text), autojunk=False)
+            for tag, i1, i2, _, _ in matcher.get_opcodes():
+                if tag == "equal":
+                    for i in range(i1, i2):
+                        votes[i] += 1
+
+        needed = n_engines // 2 + 1
+        self.total_chars = len(reference)
+        self.agreed_chars = sum(vote >= needed for vote in votes)
+        self.agreed = self.agreed_chars == self.total_chars
+
+
+class Consensus:
+    def __init__(self, lines: list[ConsensusLine], n_engines: int):
+        self.lines = lines
+        self.n_engines = n_engines
+
+    @property
+    def agreement(self) -> float:
+        """Fraction of characters a majority of engines agree on."""
+        total = sum(line.total_chars for line in self.lines)
+        if total == 0:
+            return 0.0
+        return sum(line.agreed_chars for line in self.lines) / total
+
+    @property
+    def disputed(self) -> list[int]:
+        return [i for i, line in enumerate(self.lines) if not line.agreed]
+
+    def text(self, corrections: dict = None) -> str:
+        """The voted text, with `corrections` ``{line index: text}`` applied ("" drops a line)."""
+        corrections = corrections or {}
+        lines = [corrections.get(i, line.text) for i, line in enumerate(self.lines)]
+        return "\n".join(line for line in lines if line)
+
+    def items(self) -> list[dict]:
+        return [{"box": line.box, "text": line.text} for line in self.lines if line.text]
+
+
+def group_lines(engine_lines: list[list], align):
+    """Align every engine's lines onto the engine with the most lines.
+
+    Returns ``[[line of engine 0 or None, line of engine 1 or None, ...], ...]``
+    in reading order; lines only some engines saw get their own row after the
+    closest aligned row.
+    """
+    n = len(engine_lines)
+    backbone = max(range(n), key=lambda e: len(engine_lines[e]))
+    rows = {}
+    for i, line in enumerate(engine_lines[backbone]):
+        rows[(i, -1, 0)] = [None] * n
+        rows[(i, -1, 0)][backbone] = line
+
+    for e in range(n):
+        if e == backbone:
+            continue
+        matched = dict((j, i) for i, j in align(engine_lines[backbone], engine_lines[e]))
+        previous = -1
+        for j, line in enumerate(engine_lines[e]):
+            if j in matched:
+                previous = matched[j]
+                rows[(previous, -1, 0)][e] = line
+            else:
+                rows[(previous, e, j)] = [None] * n
+                rows[(previous, e, j)][e] = line
+    return [rows[key] for key in sorted(rows)]
+
+
+class ConsensusMerger:
+    """Build `Consensus` from engine results and keep per-request merge statistics.
+
+    The LLM merge is skipped when the agreement reaches `skip_threshold`. The
+    merge prompt also rejects documents that are not daycare schedules, so with
+    `check_schedule` a skipped text merge still asks the LLM that yes/no
+    question (a few output tokens instead of the whole corrected text).
+    """
+
+    def __init__(
+        self,
+        skip_threshold: float = 0.95,
+        min_similarity: float = 0.5,
+        min_iou: float = 0.3,
+        check_schedule: bool = True,
+    ):
+        self.skip_threshold = skip_threshold
+        self.check_schedule = check_schedule
+        self.min_similarity = min_similarity
+        self.min_iou = min_iou
+        self._stats = {}
+        self._lock = Lock()
+
+    def _consensus(self, engine_lines, align, n_engines):
+        lines = []
+        for candidates in group_lines(engine_lines, align):
+            texts = [None if c is None else (c if isinstance(c, str) else c["text"]) for c in candidates]
+            box = next((c["box"] for c in candidates if isinstance(c, dict)), None)
+            line = ConsensusLine(texts, box)
+            line.vote(n_engines)
+            lines.append(line)
+        return Consensus(lines, n_engines)
+
+    def merge_text(self, results: list[str]) -> Consensus:
+        engine_lines = [split_lines(result) for result in results]
+        align = lambda base, other: align_lines(base, other, self.min_similarity)
+        return self._consensus(engine_lines, align, len(results))
+
+    def merge_boxes(self, results: list[list]) -> Consensus:
+        engine_lines = [
+            [item for item in result if str(item.get("text", "")).strip()] for result in results
+        ]
+        align = lambda base, other: align_boxes(base, other, self.min_iou)
+        return self._consensus(engine_lines, align, len(results))
+
+    def should_skip(self, consensus: Consensus) -> bool:
+        return bool(consensus.lines) and consensus.agreement >= self.skip_threshold
+
+    def record(
+        self,
+        mode: str,
+        agreement: float,
+        prompt_tokens: int,
+        consensus_seconds: float,
+        llm_seconds: float = 0.0,
+    ):
+        """`mode` is "skipped" (no LLM call), "checked" (yes/no schedule question only),
+        "compact" (disputed lines only) or "full"."""
+        logging.info(
+            f"[*] OCR merge {mode}: agreement {agreement:.3f}, {prompt_tokens} prompt tokens, "
+            f"consensus {consensus_seconds:.3f}s, llm {llm_seconds:.3f}s"
+        )
+        with self._lock:
+            stats = self._stats.setdefault(
+                mode,
+                {"count": 0, "agreement": 0.0, "prompt_tokens": 0, "consensus_seconds": 0.0, "llm_seconds": 0.0},
+            )
+            stats["count"] += 1
+            stats["agreement"] += agreement
+            stats["prompt_tokens"] += prompt_tokens
+            stats["consensus_seconds"] += consensus_seconds
+            stats["llm_seconds"] += llm_seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "skip_threshold": self.skip_threshold,
+                "check_schedule": self.check_schedule,
+                "modes": {
+                    mode: {
+                        "count": stats["count"],
+                        "avg_agreement": round(stats["agreement"] / stats["count"], 4),
+                        "avg_prompt_tokens": round(stats["prompt_tokens"] / stats["count"], 1),
+                        "avg_consensus_seconds": round(stats["consensus_seconds"] / stats["count"], 4),
+                        "avg_llm_seconds": round(stats["llm_seconds"] / stats["count"], 4),
+                    }
+                    for mode, stats in self._stats.items()
+                },
+            }
@@ -1,19 +1,28 @@
-from threading import Thread
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import asyncio
 import json
-from queue import Queue
 import os
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage
 import logging
+import time
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
-from .parsers import extract_json, extract_list, rectangle_corners
+from .cache import OCRCache, image_digest, make_key, ocr_cache
+from .consensus import ConsensusMerger
+from .gate import DocumentGate
+from .image import load_image
+from .parsers import extract_json, extract_json_object, extract_list, rectangle_corners
+from .tracing import span
 from .wrappers import (
+    job_detect_text_boxes,
     job_easy_ocr,
     job_easy_ocr_boxes,
     job_tesseract,
     job_tesseract_boxes,
+    job_text_heatmap,
 )
 
 
@@ -23,14 +32,138 @@ class OCRJobFailedError(Exception):
     pass
 
 
-def wrapper(func, args, queue):
-    try:
+def run_job(func, args):
+    with span(f"betterocr.{func.__name__}"):
         result = func(args)
-        if result is None or result == "":
-            raise OCRJobFailedError(f"OCR job {func.__name__} failed")
-        queue.put(result)
+    if result is None or result == "":
+        raise OCRJobFailedError(f"OCR job {func.__name__} failed")
+    return result
+
+
+# bounded threads for the synchronous `run_jobs`, shared by every call
+job_threads = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("BETTEROCR_JOB_THREADS", 8)),
+    thread_name_prefix="betterocr-job",
+)
+
+
+@contextmanager
+def job_runner(options, engine_pool=None):
+    """Yield the function running one job and the options to pass it.
+
+    With an `EngineProcessPool` the decoded image is moved to shared memory
+    for the duration of the block.
+    """
+    if engine_pool is None:
+        yield run_job, options
+        return
+    with engine_pool.shared_options(options) as pool_options:
+        yield engine_pool.run_job, pool_options
+
+
+def shared_detection_jobs(jobs, pending):
+    """Indexes of the pending jobs that will recognize the boxes of one shared CRAFT pass."""
+    shared = [i for i in pending if getattr(jobs[i], "uses_text_boxes", False)]
+    # a single recognizer gains nothing from a separate detection step
+    return shared if len(shared) > 1 else []
+
+
+def with_text_boxes(runner, options):
+    """`options` with the polygons of one CRAFT pass, unchanged if detection failed."""
+    try:
+        return {**options, "text_boxes": runner(job_detect_text_boxes, options)}
     except Exception as e:
-        queue.put(e)
+        logging.warning(f"[!] Shared text box detection failed, engines detect on their own: {e}")
+        return options
+
+
+def check_document(gate, runner, options):
+    """Score the image with `gate` before any engine runs, raising `NotADocumentError`."""
+    start = time.perf_counter()
+    try:
+        features = runner(job_text_heatmap, {**options, "gate": gate.options()})
+    except Exception as e:
+        gate.skip(e)
+        return
+    gate.check(features, time.perf_counter() - start, options.get("digest"))
+
+
+def engine_cache_key(job, options):
+    return make_key(options["digest"], job.__name__, options["lang"], options["tesseract"])
+
+
+def merged_cache_key(kind, jobs, options):
+    _, openai_options = split_openai_options(options)
+    return make_key(
+        options["digest"],
+        kind,
+        [job.__name__ for job in jobs],
+        options["lang"],
+        options["context"],
+        options["tesseract"],
+        openai_options,
+    )
+
+
+def lookup_cached_results(jobs, options, cache):
+    """Return per-job cached results (None when missing) and the jobs still to run."""
+    if cache is None or options.get("digest") is None:
+        return [None] * len(jobs), list(range(len(jobs)))
+
+    results = [cache.get(engine_cache_key(job, options)) for job in jobs]
+    pending = [i for i, result in enumerate(results) if result is None]
+    if len(pending) < len(jobs):
+        logging.info(f"[*] OCR cache hit for {len(jobs) - len(pending)} engine(s)")
+    return results, pending
+
+
+def store_results(jobs, options, cache, results, pending):
+    if cache is None or options.get("digest") is None:
+        return
+    for i in pending:
+        cache.set(engine_cache_key(jobs[i], options), results[i])
+
+
+async def run_jobs_async(
+    jobs, options, executor=None, cache=None, engine_pool=None, gate=None
+):
+    """Run the OCR jobs in `executor` and wait for all of them.
+
+    With an `engine_pool` the executor threads only wait on the engine worker
+    processes. Jobs marked `uses_text_boxes` share one CRAFT detection pass.
+    A `gate` rejects non-document images before any engine starts.
+    The first failure cancels the jobs that have not started yet and is re-raised.
+    """
+    results, pending = lookup_cached_results(jobs, options, cache)
+    if not pending:
+        return results
+
+    loop = asyncio.get_running_loop()
+    shared = shared_detection_jobs(jobs, pending)
+    futures = {}
+    with job_runner(options, engine_pool) as (runner, job_options):
+        try:
+            if gate is not None:
+                await loop.run_in_executor(executor, check_document, gate, runner, job_options)
+            # engines without boxes (Tesseract) start right away, the others wait for detection
+            for i in pending:
+                if i not in shared:
+                    futures[i] = loop.run_in_executor(executor, runner, jobs[i], job_options)
+            if shared:
+                box_options = await loop.run_in_executor(
+                    executor, with_text_boxes, runner, job_options
+                )
+                for i in shared:
+                    futures[i] = loop.run_in_executor(executor, runner, jobs[i], box_options)
+            for i, result in zip(pending, await asyncio.gather(*(futures[i] for i in pending))):
+                results[i] = result
+        except BaseException:
+            for future in futures.values():
+                future.cancel()
+            raise
+
+    store_results(jobs, options, cache, results, pending)
+    return results
 
 
 # custom error
@@ -38,14 +171,78 @@ class NoTextDetectedError(Exception):
     pass
 
 
-def detect():
-    """Unimplemented"""
-    raise NotImplementedError
+def engine_results(results, image, boxes):
+    """Per-engine outputs for the caller, boxes mapped back to original pixels.
+
+    Copies are returned so that cached results keep decoded coordinates.
+    """
+    if not boxes or image.scale == 1:
+        return results
+    return [scale_boxes([dict(item) for item in items], image.scale) for items in results]
+
+
+def detect(
+    image_path: str,
+    lang: list[str],
+    tesseract: dict = {},
+    boxes: bool = False,
+    cache: OCRCache = ocr_cache,
+    engine_pool=None,
+    gate: DocumentGate = None,
+    adaptive: bool = False,
+):
+    """Run every OCR engine on the image and return their raw outputs, without the LLM merge.
+
+    One result per engine of `get_jobs(lang, boxes)`, in that order: text for
+    `boxes=False`, lists of `{"box", "text"}` dicts otherwise.
+    See `detect_text` for `cache`, `engine_pool`, `gate` and `adaptive`.
+    """
+    options = make_options(image_path, lang, "", tesseract, {})
+    jobs = get_jobs(languages=options["lang"], boxes=boxes)
+
+    with span("betterocr.decode"):
+        options["image"] = load_image(image_path, adaptive)
+    if cache is not None:
+        options["digest"] = image_digest(options["image"])
 
+    results = run_jobs(jobs, options, cache, engine_pool, gate)
+    return engine_results(results, options["image"], boxes)
 
-def detect_async():
-    """Unimplemented"""
-    raise NotImplementedError
+
+async def detect_async(
+    image_path: str,
+    lang: list[str],
+    tesseract: dict = {},
+    boxes: bool = False,
+    timeout: float = None,
+    executor=None,
+    cache: OCRCache = ocr_cache,
+    engine_pool=None,
+    gate: DocumentGate = None,
+    adaptive: bool = False,
+):
+    """Async `detect`: the engines run concurrently in `executor`.
+
+    `timeout` bounds the whole call and raises `asyncio.TimeoutError`; if an
+    engine fails, the engines that have not started yet are cancelled and
+    the error is re-raised.
+    """
+    options = make_options(image_path, lang, "", tesseract, {})
+    jobs = get_jobs(languages=options["lang"], boxes=boxes)
+    loop = asyncio.get_running_loop()
+
+    async with asyncio.timeout(timeout):
+        with span("betterocr.decode"):
+            options["image"] = await loop.run_in_executor(
+                executor, load_image, image_path, adaptive
+            )
+        if cache is not None:
+            options["digest"] = await loop.run_in_executor(
+                executor, image_digest, options["image"]
+            )
+
+        results = await run_jobs_async(jobs, options, executor, cache, engine_pool, gate)
+    return engine_results(results, options["image"], boxes)
 
 
 def get_jobs(languages: list[str], boxes=False):
@@ -65,45 +262,69 @@ def get_jobs(languages: list[str], boxes=False):
 
                 jobs.append(job_easy_pororo_ocr_boxes)
         except ImportError as e:
-            print(e)
-            print(
-                "[!] Pororo dependencies is not installed. Skipping Pororo (EasyPororoOCR)."
+            logging.warning(
+                f"[!] Pororo dependencies is not installed. Skipping Pororo (EasyPororoOCR): {e}"
             )
-            pass
     return jobs
 
 
-def detect_text(
-    image_path: str,
-    lang: list[str],
-    context: str = "",
-    tesseract: dict = {},
-    openai: dict = {"model": "gpt-4"},
-):
-    """Detect text from an image using EasyOCR and Tesseract, then combine and correct the results using OpenAI's LLM."""
-    options = {
-        "path": image_path,  # "demo.png",
+def make_options(image_path, lang, context, tesseract, openai):
+    return {
+        "path": image_path,  # "demo.png", encoded bytes or a BGR numpy array
         "lang": lang,  # ["ko", "en"]
         "context": context,
         "tesseract": tesseract,
         "openai": openai,
     }
-    jobs = get_jobs(languages=options["lang"], boxes=False)
 
-    queues = []
-    for job in jobs:
-        queue = Queue()
-        Thread(target=wrapper, args=(job, options, queue)).start()
-        queues.append(queue)
 
-    # results = [queue.get() for queue in queues]
-    results = []
-    for queue in queues:
-        result = queue.get()
-        if isinstance(result, Exception):
-            raise result
-        results.append(result)
+def split_openai_options(options):
+    # Prioritize user-specified API_KEY
+    api_key = options["openai"].get("API_KEY", os.environ.get("OPENAI_API_KEY"))
+
+    # Make a shallow copy of the openai options and remove the API_KEY
+    openai_options = options["openai"].copy()
+    if "API_KEY" in openai_options:
+        del openai_options["API_KEY"]
 
+    return api_key, openai_options
+
+
+def run_jobs(jobs, options, cache=None, engine_pool=None, gate=None):
+    results, pending = lookup_cached_results(jobs, options, cache)
+    if not pending:
+        return results
+
+    shared = shared_detection_jobs(jobs, pending)
+    with job_runner(options, engine_pool) as (runner, job_options):
+        if gate is not None:
+            check_document(gate, runner, job_options)
+        # engines without boxes (Tesseract) start right away, the others wait for detection
+        futures = {
+            i: job_threads.submit(runner, jobs[i], job_options)
+            for i in pending
+            if i not in shared
+        }
+        try:
+            if shared:
+                box_options = with_text_boxes(runner, job_options)
+                for i in shared:
+                    futures[i] = job_threads.submit(runner, jobs[i], box_options)
+            for i in pending:
+                results[i] = futures[i].result()
+        finally:
+            for future in futures.values():
+                future.cancel()
+            # jobs already running still read the shared image
+            for future in futures.values():
+                if not future.cancelled():
+                    future.exception()
+
+    store_results(jobs, options, cache, results, pending)
+    return results
+
+
+def build_text_prompt(results, options):
     result_indexes_prompt = ""  # "[0][1][2]"
     result_prompt = ""  # "[0]: result_0\n[1]: result_1\n[2]: result_2"
 
@@ -128,26 +349,19 @@ def detect_text(
     {result_prompt}
     {optional_context_prompt}"""
 
-    prompt = prompt.strip()
-
-    # Prioritize user-specified API_KEY
-    api_key = options["openai"].get("API_KEY", os.environ.get("OPENAI_API_KEY"))
+    return prompt.strip()
 
-    # Make a shallow copy of the openai options and remove the API_KEY
-    openai_options = options["openai"].copy()
-    if "API_KEY" in openai_options:
-        del openai_options["API_KEY"]
 
-    chat_model = ChatOpenAI(
+def make_chat_model(options):
+    api_key, openai_options = split_openai_options(options)
+    return ChatOpenAI(
         model_name=openai_options.get("model", "gpt-4"),
         temperature=openai_options.get("temperature", 0),
         api_key=api_key,
     )
 
-    message = HumanMessage(content=prompt)
-    response = chat_model([message])
-    output = response.content
 
+def parse_text_output(output):
     logging.info(f" BetterOCR LLM completed")
 
     result = extract_json(output)
@@ -162,35 +376,271 @@ def detect_text(
     raise NoTextDetectedError("No text detected")
 
 
-def detect_text_async():
-    """Unimplemented"""
-    raise NotImplementedError
+def merge_consensus(consensus, results, boxes=False):
+    start = time.perf_counter()
+    with span("betterocr.consensus"):
+        merged = consensus.merge_boxes(results) if boxes else consensus.merge_text(results)
+    return merged, time.perf_counter() - start
 
 
-def detect_boxes(
+def build_consensus_prompt(merged, options):
+    """Compact prompt: agreed lines as they are, disputed lines with every engine's reading."""
+    lines = []
+    for i, line in enumerate(merged.lines):
+        if line.agreed:
+            lines.append(f"L{i}: {line.text}")
+        else:
+            readings = " | ".join(
+                f"[{e}] {text if text else '-'}" for e, text in enumerate(line.candidates)
+            )
+            lines.append(f"L{i}?: {readings}")
+    result_prompt = "\n".join(lines)
+    disputed = ",".join(f"L{i}" for i in merged.disputed)
+
+    optional_context_prompt = (
+        f"[context]: {options['context']}" if options["context"] else ""
+    )
+
+    prompt = f"""First, determine if this document is related to a daycare center schedule:
+    1. If it's not related to daycare schedules (lacks specific daycare schedule information or is clearly about a different topic), output "no" in JSON format {{"data":"no"}}.
+    2. If it is related to daycare schedules, correct the OCR lines below. Lines marked with "?" are disputed and list what each OCR engine read ("-" = not read). For each disputed line ({disputed}) choose or correct the reading, or use "" if it is unintended noise. Language is in {'+'.join(options['lang'])}. Refer to the [context] keywords. Answer in the JSON format {{"data":{{"<line id>":<output:string>}}}}:
+{result_prompt}
+    {optional_context_prompt}"""
+
+    return prompt.strip()
+
+
+def build_schedule_check_prompt(merged, options, max_lines=40):
+    """Yes/no daycare-schedule question for a skipped merge (the voted text, truncated)."""
+    text = "\n".join(line.text for line in merged.lines[:max_lines] if line.text)
+    prompt = f"""Is this OCR text from a daycare center schedule (specific daycare schedule information, not a different topic)? Answer only in the JSON format {{"data":"yes"}} or {{"data":"no"}}:
+{text}"""
+    return prompt.strip()
+
+
+def parse_schedule_check_output(output, merged):
+    """The voted text, or "no" when the LLM says it is not a daycare schedule."""
+    result = extract_json_object(output)
+    data = result["data"] if result else None
+    if isinstance(data, str) and data.strip().lower() == "no":
+        return "no"
+    return merged.text()
+
+
+def parse_consensus_output(output, merged):
+    """The merged text with the LLM's corrections of disputed lines, or "no"."""
+    result = extract_json_object(output)
+    data = result["data"] if result else None
+    if isinstance(data, str) and data.strip().lower() == "no":
+        return "no"
+
+    corrections = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            index = str(key).strip().lstrip("Ll").rstrip("?")
+            if index.isdigit() and isinstance(value, str):
+                corrections[int(index)] = value.strip()
+    else:
+        logging.warning(f"[!] Could not parse LLM corrections, using the voted text")
+    return merged.text(corrections)
+
+
+def consensus_text(text):
+    if text.strip().lower() == "no":
+        raise ValueError("Not related to daycare schedules")
+    return text
+
+
+def prompt_tokens(response, prompt) -> int:
+    # token usage reported by the API, a rough estimate when it is missing
+    usage = getattr(response, "usage_metadata", None) or {}
+    return usage.get("input_tokens") or len(prompt) // 3
+
+
+def detect_text(
     image_path: str,
     lang: list[str],
     context: str = "",
     tesseract: dict = {},
     openai: dict = {"model": "gpt-4"},
+    cache: OCRCache = ocr_cache,
+    chat_model: ChatOpenAI = None,
+    engine_pool=None,
+    gate: DocumentGate = None,
+    adaptive: bool = False,
+    consensus: ConsensusMerger = None,
 ):
-    options = {
-        "path": image_path,  # "demo.png",
-        "lang": lang,  # ["ko", "en"]
-        "context": context,
-        "tesseract": tesseract,
-        "openai": openai,
-    }
-    jobs = get_jobs(languages=options["lang"], boxes=True)
+    """Detect text from an image using EasyOCR and Tesseract, then combine and correct the results using OpenAI's LLM.
+
+    Raw engine outputs and the merged LLM output are cached in `cache`, keyed by
+    the decoded image hash and options. Pass `cache=None` to always recompute.
+    Pass a long-lived `chat_model` to reuse its HTTP connections across calls;
+    by default one is built from the `openai` options.
+    Pass an `EngineProcessPool` as `engine_pool` to run the engines in its
+    worker processes instead of threads of this process.
+    Pass a `DocumentGate` as `gate` to reject images without enough text
+    (`NotADocumentError`) before running the engines and the LLM.
+    With `adaptive`, paths and bytes are decoded at the resolution their text
+    needs and CRAFT runs at a per-image canvas size (see `plan_decode`).
+    With a `ConsensusMerger` as `consensus`, the engine outputs are voted on
+    locally and only disputed lines are sent to the LLM; when the agreement
+    reaches the merger's `skip_threshold` the merge is skipped and only a short
+    yes/no daycare-schedule question is asked (unless `check_schedule` is off).
+    """
+    options = make_options(image_path, lang, context, tesseract, openai)
+    jobs = get_jobs(languages=options["lang"], boxes=False)
+
+    # decode once, every engine reads the shared arrays
+    with span("betterocr.decode"):
+        options["image"] = load_image(image_path, adaptive)
+
+    if cache is not None:
+        options["digest"] = image_digest(options["image"])
+        merged_key = merged_cache_key("text" if consensus is None else "consensus", jobs, options)
+        output = cache.get(merged_key)
+        if output is not None:
+            logging.info(f"[*] OCR cache hit, skipping OCR and LLM")
+            return parse_text_output(output) if consensus is None else consensus_text(output)
+
+    results = run_jobs(jobs, options, cache, engine_pool, gate)
+
+    if consensus is not None:
+        merged, consensus_seconds = merge_consensus(consensus, results)
+        skipped = consensus.should_skip(merged)
+        if skipped and not consensus.check_schedule:
+            consensus.record("skipped", merged.agreement, 0, consensus_seconds)
+            text = merged.text()
+        else:
+            if skipped:
+                prompt = build_schedule_check_prompt(merged, options)
+            else:
+                prompt = build_consensus_prompt(merged, options)
+            chat_model = chat_model or make_chat_model(options)
+            start = time.perf_counter()
+            with span("betterocr.llm_merge"):
+                response = chat_model([HumanMessage(content=prompt)])
+            consensus.record(
+                "checked" if skipped else "compact",
+                merged.agreement,
+                prompt_tokens(response, prompt),
+                consensus_seconds,
+                time.perf_counter() - start,
+            )
+            if skipped:
+                text = parse_schedule_check_output(response.content, merged)
+            else:
+                text = parse_consensus_output(response.content, merged)
+        if cache is not None:
+            cache.set(merged_key, text)
+        return consensus_text(text)
 
-    queues = []
-    for job in jobs:
-        queue = Queue()
-        Thread(target=wrapper, args=(job, options, queue)).start()
-        queues.append(queue)
+    prompt = build_text_prompt(results, options)
 
-    results = [queue.get() for queue in queues]
+    chat_model = chat_model or make_chat_model(options)
+    message = HumanMessage(content=prompt)
+    with span("betterocr.llm_merge"):
+        response = chat_model([message])
+
+    if cache is not None:
+        cache.set(merged_key, response.content)
+    return parse_text_output(response.content)
+
+
+async def detect_text_async(
+    image_path: str,
+    lang: list[str],
+    context: str = "",
+    tesseract: dict = {},
+    openai: dict = {"model": "gpt-4"},
+    timeout: float = None,
+    executor=None,
+    cache: OCRCache = ocr_cache,
+    chat_model: ChatOpenAI = None,
+    engine_pool=None,
+    gate: DocumentGate = None,
+    adaptive: bool = False,
+    consensus: ConsensusMerger = None,
+):
+    """Async `detect_text`: OCR engines run in `executor`, the LLM merge is awaited.
+
+    `timeout` bounds the whole call (every engine and the LLM merge) and raises
+    `asyncio.TimeoutError`; pending engines and the LLM request are cancelled.
+    """
+    options = make_options(image_path, lang, context, tesseract, openai)
+    jobs = get_jobs(languages=options["lang"], boxes=False)
+    loop = asyncio.get_running_loop()
+
+    async with asyncio.timeout(timeout):
+        # decode once, every engine reads the shared arrays
+        with span("betterocr.decode"):
+            options["image"] = await loop.run_in_executor(
+                executor, load_image, image_path, adaptive
+            )
 
+        if cache is not None:
+            options["digest"] = await loop.run_in_executor(
+                executor, image_digest, options["image"]
+            )
+            merged_key = merged_cache_key(
+                "text" if consensus is None else "consensus", jobs, options
+            )
+            output = cache.get(merged_key)
+            if output is not None:
+                logging.info(f"[*] OCR cache hit, skipping OCR and LLM")
+                return parse_text_output(output) if consensus is None else consensus_text(output)
+
+        results = await run_jobs_async(
+            jobs, options, executor, cache, engine_pool, gate
+        )
+
+        if consensus is not None:
+            # line alignment is pure Python, keep it off the event loop
+            merged, consensus_seconds = await loop.run_in_executor(
+                executor, merge_consensus, consensus, results
+            )
+            skipped = consensus.should_skip(merged)
+            if skipped and not consensus.check_schedule:
+                consensus.record("skipped", merged.agreement, 0, consensus_seconds)
+                text = merged.text()
+            else:
+                if skipped:
+                    prompt = build_schedule_check_prompt(merged, options)
+                else:
+                    prompt = build_consensus_prompt(merged, options)
+                chat_model = chat_model or make_chat_model(options)
+                start = time.perf_counter()
+                with span("betterocr.llm_merge"):
+                    response = await chat_model.ainvoke([HumanMessage(content=prompt)])
+                consensus.record(
+                    "checked" if skipped else "compact",
+                    merged.agreement,
+                    prompt_tokens(response, prompt),
+                    consensus_seconds,
+                    time.perf_counter() - start,
+                )
+                if skipped:
+                    text = parse_schedule_check_output(response.content, merged)
+                else:
+                    text = parse_consensus_output(response.content, merged)
+        else:
+            prompt = build_text_prompt(results, options)
+
+            chat_model = chat_model or make_chat_model(options)
+            message = HumanMessage(content=prompt)
+            with span("betterocr.llm_merge"):
+                response = await chat_model.ainvoke([message])
+
+    if consensus is not None:
+        if cache is not None:
+            cache.set(merged_key, text)
+        return consensus_text(text)
+
+    if cache is not None:
+        cache.set(merged_key, response.content)
+    return parse_text_output(response.content)
+
+
+def build_boxes_prompt(results, options):
     result_indexes_prompt = ""  # "[0][1][2]"
     result_prompt = ""  # "[0]: result_0\n[1]: result_1\n[2]: result_2"
 
@@ -223,27 +673,37 @@ def detect_boxes(
     print("=====")
     print(prompt)
 
-    # Prioritize user-specified API_KEY
-    api_key = options["openai"].get("API_KEY", os.environ.get("OPENAI_API_KEY"))
+    return prompt
 
-    # Make a shallow copy of the openai options and remove the API_KEY
-    openai_options = options["openai"].copy()
-    if "API_KEY" in openai_options:
-        del openai_options["API_KEY"]
 
-    client = OpenAI(
-        api_key=api_key,
-    )
+def boxes_cache_kind(consensus):
+    return "boxes" if consensus is None else "boxes-consensus"
 
-    print("=====")
 
-    completion = client.chat.completions.create(
-        messages=[
-            {"role": "user", "content": prompt},
-        ],
-        **openai_options,
-    )
-    output = completion.choices[0].message.content
+def skip_boxes_merge(consensus, merged, consensus_seconds):
+    """The voted boxes as LLM-style output when the engines agree, else None."""
+    if not consensus.should_skip(merged):
+        return None
+    consensus.record("skipped", merged.agreement, 0, consensus_seconds)
+    return json.dumps(merged.items(), ensure_ascii=False, default=int)
+
+
+def record_boxes_merge(consensus, merged, consensus_seconds, prompt, completion, llm_seconds):
+    usage = getattr(completion, "usage", None)
+    tokens = usage.prompt_tokens if usage is not None else len(prompt) // 3
+    consensus.record("full", merged.agreement, tokens, consensus_seconds, llm_seconds)
+
+
+def scale_boxes(items, scale):
+    """Map boxes of an image decoded at 1/`scale` back to original pixels."""
+    if scale == 1:
+        return items
+    for item in items:
+        item["box"] = [[round(x * scale), round(y * scale)] for x, y in item["box"]]
+    return items
+
+
+def parse_boxes_output(output):
     output = output.replace("\n", "")
     print("[*] LLM", output)
 
@@ -266,6 +726,144 @@ def detect_boxes(
     return items
 
 
-def detect_boxes_async():
-    """Unimplemented"""
-    raise NotImplementedError
+def detect_boxes(
+    image_path: str,
+    lang: list[str],
+    context: str = "",
+    tesseract: dict = {},
+    openai: dict = {"model": "gpt-4"},
+    cache: OCRCache = ocr_cache,
+    client: OpenAI = None,
+    engine_pool=None,
+    adaptive: bool = False,
+    consensus: ConsensusMerger = None,
+):
+    """See `detect_text`; `client` is an optional shared `OpenAI` client.
+
+    Boxes are returned in original image coordinates, also with `adaptive`.
+    With `consensus`, engine boxes are aligned by overlap and the LLM call is
+    skipped when they agree well enough; otherwise the full prompt is sent.
+    """
+    options = make_options(image_path, lang, context, tesseract, openai)
+    jobs = get_jobs(languages=options["lang"], boxes=True)
+
+    # decode once, every engine reads the shared arrays
+    with span("betterocr.decode"):
+        options["image"] = load_image(image_path, adaptive)
+
+    if cache is not None:
+        options["digest"] = image_digest(options["image"])
+        merged_key = merged_cache_key(boxes_cache_kind(consensus), jobs, options)
+        output = cache.get(merged_key)
+        if output is not None:
+            logging.info(f"[*] OCR cache hit, skipping OCR and LLM")
+            return scale_boxes(parse_boxes_output(output), options["image"].scale)
+
+    results = run_jobs(jobs, options, cache, engine_pool)
+
+    output = None
+    if consensus is not None:
+        merged, consensus_seconds = merge_consensus(consensus, results, boxes=True)
+        output = skip_boxes_merge(consensus, merged, consensus_seconds)
+
+    if output is None:
+        prompt = build_boxes_prompt(results, options)
+
+        api_key, openai_options = split_openai_options(options)
+        client = client or OpenAI(
+            api_key=api_key,
+        )
+
+        print("=====")
+
+        start = time.perf_counter()
+        with span("betterocr.llm_merge"):
+            completion = client.chat.completions.create(
+                messages=[
+                    {"role": "user", "content": prompt},
+                ],
+                **openai_options,
+            )
+        output = completion.choices[0].message.content
+        if consensus is not None:
+            record_boxes_merge(
+                consensus, merged, consensus_seconds, prompt, completion,
+                time.perf_counter() - start,
+            )
+
+    if cache is not None:
+        cache.set(merged_key, output)
+    return scale_boxes(parse_boxes_output(output), options["image"].scale)
+
+
+async def detect_boxes_async(
+    image_path: str,
+    lang: list[str],
+    context: str = "",
+    tesseract: dict = {},
+    openai: dict = {"model": "gpt-4"},
+    timeout: float = None,
+    executor=None,
+    cache: OCRCache = ocr_cache,
+    client: AsyncOpenAI = None,
+    engine_pool=None,
+    adaptive: bool = False,
+    consensus: ConsensusMerger = None,
+):
+    """Async `detect_boxes`, see `detect_text_async` for `timeout` and `executor`."""
+    options = make_options(image_path, lang, context, tesseract, openai)
+    jobs = get_jobs(languages=options["lang"], boxes=True)
+    loop = asyncio.get_running_loop()
+
+    async with asyncio.timeout(timeout):
+        # decode once, every engine reads the shared arrays
+        with span("betterocr.decode"):
+            options["image"] = await loop.run_in_executor(
+                executor, load_image, image_path, adaptive
+            )
+
+        if cache is not None:
+            options["digest"] = await loop.run_in_executor(
+                executor, image_digest, options["image"]
+            )
+            merged_key = merged_cache_key(boxes_cache_kind(consensus), jobs, options)
+            output = cache.get(merged_key)
+            if output is not None:
+                logging.info(f"[*] OCR cache hit, skipping OCR and LLM")
+                return scale_boxes(parse_boxes_output(output), options["image"].scale)
+
+        results = await run_jobs_async(jobs, options, executor, cache, engine_pool)
+
+        output = None
+        if consensus is not None:
+            merged, consensus_seconds = await loop.run_in_executor(
+                executor, merge_consensus, consensus, results, True
+            )
+            output = skip_boxes_merge(consensus, merged, consensus_seconds)
+
+        if output is None:
+            prompt = build_boxes_prompt(results, options)
+
+            api_key, openai_options = split_openai_options(options)
+            client = client or AsyncOpenAI(
+                api_key=api_key,
+            )
+
+            start = time.perf_counter()
+            with span("betterocr.llm_merge"):
+                completion = await client.chat.completions.create(
+                    messages=[
+                        {"role": "user", "content": prompt},
+                    ],
+                    **openai_options,
+                )
+            output = completion.choices[0].message.content
+            if consensus is not None:
+                record_boxes_merge(
+                    consensus, merged, consensus_seconds, prompt, completion,
+                    time.perf_counter() - start,
+                )
+
+    if cache is not None:
+        cache.set(merged_key, output)
+    return scale_boxes(parse_boxes_output(output), options["image"].scale)
@@ -7,11 +7,10 @@ Apache License 2.0 @black7375
 
 import cv2
 from abc import ABC, abstractmethod
-from .pororo import Pororo
+from ...registry import get_easyocr_reader, get_pororo_ocr
 from .utils.image_util import plt_imshow, put_text
 from .utils.image_convert import convert_coord, crop
 from .utils.pre_processing import load_with_filter, roi_filter
-from easyocr import Reader
 import warnings
 
 warnings.filterwarnings("ignore")
@@ -64,9 +63,17 @@ class BaseOcr(ABC):
 
 
 class EasyPororoOcr(BaseOcr):
-    def __init__(self, lang: list[str] = ["ko", "en"], gpu=True, **kwargs):
+    def __init__(self, lang: list[str] = ["ko", "en"], gpu=True, quantize=True, **kwargs):
+        """`kwargs` are default keyword arguments of `run_ocr`.
+
+        The detector is the shared `Reader` of the model registry, which is only
+        keyed by `lang`, `gpu` and `quantize`.
+        """
         super().__init__()
-        self._detector = Reader(lang_list=lang, gpu=gpu, **kwargs).detect
+        self._reader = get_easyocr_reader(lang, gpu=gpu, quantize=quantize)
+        self._detector = self._reader.detect
+        self._gpu = gpu
+        self.options = kwargs
         self.detect_result = None
         self.languages = lang
 
@@ -77,14 +84,40 @@ class EasyPororoOcr(BaseOcr):
 
         return [points, text]
 
+    def create_results(self, rois, batch_size: int):
+        # recognize_crops resizes every crop to the model height, upsampling here first
+        # (roi_filter) would only resample twice
+        crops = [crop(self.img, points) for points in rois]
+        texts = self._ocr.recognize(crops, batch_size=batch_size)
+
+        return [[points, text.strip()] for points, text in zip(rois, texts)]
+
     def run_ocr(self, img_path: str, debug: bool = False, **kwargs):
+        return self._run_ocr(img_path, debug, **{**self.options, **kwargs})
+
+    def _run_ocr(
+        self,
+        img_path: str,
+        debug: bool = False,
+        batch_size: int = 16,
+        text_boxes: list = None,
+        detect_options: dict = None,
+        **kwargs,
+    ):
         self.img_path = img_path
         self.img = cv2.imread(img_path) if isinstance(img_path, str) else self.img_path
 
-        lang = "ko" if "ko" in self.languages else "en"
-        self._ocr = Pororo(task="ocr", lang=lang, model="brainocr", **kwargs)
+        self._ocr = get_pororo_ocr(self.languages, gpu=self._gpu)
 
-        self.detect_result = self._detector(self.img, slope_ths=0.3, height_ths=1)
+        if text_boxes is None:
+            self.detect_result = self._detector(
+                self.img, slope_ths=0.3, height_ths=1, **(detect_options or {})
+            )
+        else:
+            # polygons of a shared `Reader.detect_textbox` pass, grouped with our thresholds
+            self.detect_result = self._reader.group_textbox(
+                text_boxes, slope_ths=0.3, height_ths=1
+            )
         if debug:
             print(self.detect_result)
 
@@ -92,12 +125,13 @@ class EasyPororoOcr(BaseOcr):
 
         rois = [convert_coord(point) for point in horizontal_list[0]] + free_list[0]
 
-        self.ocr_result = list(
-            filter(
-                lambda result: len(result[1]) > 0,
-                [self.create_result(roi) for roi in rois],
-            )
-        )
+        # batch_size=None keeps the legacy path: full Pororo (detect + recognize) per ROI
+        if batch_size:
+            results = self.create_results(rois, batch_size)
+        else:
+            results = [self.create_result(roi) for roi in rois]
+
+        self.ocr_result = list(filter(lambda result: len(result[1]) > 0, results))
 
         if len(self.ocr_result) != 0:
             ocr_text = list(map(lambda result: result[1], self.ocr_result))
@@ -172,6 +172,49 @@ class Reader(object):
         else:  # full outputs: bounding box, text and confident score
             return result
 
+    def recognize_crops(
+        self,
+        crops: list,
+        batch_size: int = 16,
+        contrast_ths: float = 0.1,
+        adjust_contrast: float = 0.5,
+    ):
+        """
+        Recognize already-cropped text lines without running the detector.
+        All crops are resized to the model height and fed to the recognizer
+        in padded batches of `batch_size`.
+        :param crops: list of grey or BGR numpy arrays, one text line each
+        :return:
+            result (list): (text, confident score) per crop, in input order
+        """
+        opt2val = {
+            **self.opt2val,
+            "batch_size": batch_size,
+            "n_workers": 0,
+            "contrast_ths": contrast_ths,
+            "adjust_contrast": adjust_contrast,
+        }
+        imgH = opt2val["imgH"]
+
+        image_list = []
+        for idx, crop_img in enumerate(crops):
+            if len(crop_img.shape) == 3:
+                crop_img = cv2.cvtColor(crop_img, cv2.COLOR_BGR2GRAY)
+            y_max, x_max = crop_img.shape
+            ratio = x_max / y_max
+            crop_img = cv2.resize(
+                crop_img,
+                (max(1, int(imgH * ratio)), imgH),
+                interpolation=Image.LANCZOS,
+            )
+            image_list.append((idx, crop_img))
+
+        if not image_list:
+            return []
+
+        result = get_text(image_list, self.recognizer, self.converter, opt2val)
+        return [(item[1], item[2]) for item in result]
+
     def __call__(
         self,
         image,
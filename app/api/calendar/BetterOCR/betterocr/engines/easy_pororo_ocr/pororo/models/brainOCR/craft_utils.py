@@ -36,7 +36,11 @@ def get_det_boxes_core(textmap, linkmap, text_threshold, link_threshold, low_tex
     nLabels, labels, stats, centroids = cv2.connectedComponentsWithStats(
         text_score_comb.astype(np.uint8), connectivity=4
     )
+    link_area = np.logical_and(link_score == 1, text_score == 0)
 
+    # every component lies inside its stats bounding box, so each step below
+    # works on that sub-window (grown by the dilation margin) instead of the
+    # full map; the result is identical to processing the whole image
     det = []
     mapper = []
     for k in range(1, nLabels):
@@ -45,16 +49,14 @@ def get_det_boxes_core(textmap, linkmap, text_threshold, link_threshold, low_tex
         if size < 10:
             continue
 
+        x, y = stats[k, cv2.CC_STAT_LEFT], stats[k, cv2.CC_STAT_TOP]
+        w, h = stats[k, cv2.CC_STAT_WIDTH], stats[k, cv2.CC_STAT_HEIGHT]
+        component = labels[y : y + h, x : x + w] == k
+
         # thresholding
-        if np.max(textmap[labels == k]) < text_threshold:
+        if np.max(textmap[y : y + h, x : x + w][component]) < text_threshold:
             continue
 
-        # make segmentation map
-        segmap = np.zeros(textmap.shape, dtype=np.uint8)
-        segmap[labels == k] = 255
-        segmap[np.logical_and(link_score == 1, text_score == 0)] = 0  # remove link area
-        x, y = stats[k, cv2.CC_STAT_LEFT], stats[k, cv2.CC_STAT_TOP]
-        w, h = stats[k, cv2.CC_STAT_WIDTH], stats[k, cv2.CC_STAT_HEIGHT]
         niter = int(math.sqrt(size * min(w, h) / (w * h)) * 2)
         sx, ex, sy, ey = x - niter, x + w + niter + 1, y - niter, y + h + niter + 1
         # boundary check
@@ -66,18 +68,20 @@ def get_det_boxes_core(textmap, linkmap, text_threshold, link_threshold, low_tex
             ex = img_w
         if ey >= img_h:
             ey = img_h
+
+        # make segmentation map of the dilation window
+        segmap = np.zeros((ey - sy, ex - sx), dtype=np.uint8)
+        segmap[y - sy : y - sy + h, x - sx : x - sx + w][component] = 255
+        segmap[link_area[sy:ey, sx:ex]] = 0  # remove link area
         kernel = cv2.getStructuringElement(
             cv2.MORPH_RECT,
             (1 + niter, 1 + niter),
         )
-        segmap[sy:ey, sx:ex] = cv2.dilate(segmap[sy:ey, sx:ex], kernel)
+        segmap = cv2.dilate(segmap, kernel)
 
         # make box
-        np_contours = (
-            np.roll(np.array(np.where(segmap != 0)), 1, axis=0)
-            .transpose()
-            .reshape(-1, 2)
-        )
+        ys, xs = np.where(segmap != 0)
+        np_contours = np.array([xs + sx, ys + sy]).transpose().reshape(-1, 2)
         rectangle = cv2.minAreaRect(np_contours)
         box = cv2.boxPoints(rectangle)
 
@@ -62,6 +62,7 @@ class Pororo:
         task: str,
         lang: str = "en",
         model: Optional[str] = None,
+        device: Optional[str] = None,
         **kwargs,
     ) -> PororoTaskBase:
         if task not in SUPPORTED_TASKS:
@@ -75,8 +76,10 @@ class Pororo:
         lang = lang.lower()
         lang = LANG_ALIASES[lang] if lang in LANG_ALIASES else lang
 
-        # Get device information from torch API
-        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        # Get device information from torch API, unless the caller picked one
+        if device is None:
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+        device = torch.device(device)
 
         # Instantiate task-specific pipeline module, if possible
         task_module = SUPPORTED_TASKS[task](
@@ -183,3 +183,20 @@ class PororoOCR(PororoSimpleBase):
             ),
             detail,
         )
+
+    def recognize(self, crops: list, batch_size: int = 16):
+        """
+        Recognize pre-cropped text lines in batches, skipping detection
+
+        Args:
+            crops (list): list of numpy arrays, one text line each
+            batch_size (int): number of crops per recognizer forward pass
+
+        Returns:
+            list: recognized text per crop, in input order
+
+        """
+        return [
+            text
+            for text, _ in self._model.recognize_crops(crops, batch_size=batch_size)
+        ]
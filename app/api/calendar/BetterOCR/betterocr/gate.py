@@ -0,0 +1,151 @@
+"""Reject clearly non-document images before running the OCR engines and the LLM.
+
+The gate scores a CRAFT character heatmap computed on a small canvas (see
+`job_text_heatmap`): photos and selfies light up a handful of pixels, a printed
+schedule lights up hundreds of character blobs.
+"""
+
+from threading import Lock
+import json
+import logging
+import math
+import time
+
+import cv2
+import numpy as np
+
+
+class NotADocumentError(ValueError):
+    pass
+
+
+def heatmap_features(heatmap: np.ndarray, low_text: float = 0.4) -> dict:
+    """Text density features of a CRAFT region score map."""
+    mask = (heatmap > low_text).astype(np.uint8)
+    count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=4)
+    areas = stats[1:count, cv2.CC_STAT_AREA]
+    return {
+        "density": float(mask.mean()),
+        # character blobs, ignoring single-pixel noise
+        "chars": int((areas >= 2).sum()),
+        "peak": float(heatmap.max()) if heatmap.size else 0.0,
+        "mean": float(heatmap.mean()) if heatmap.size else 0.0,
+    }
+
+
+class LogisticGate:
+    """A tiny logistic regression over `heatmap_features`, loaded from JSON.
+
+    The file holds ``{"bias": float, "weights": {feature: float}}``; features
+    listed in ``"log_features"`` are fed as ``log1p(value)``.
+    """
+
+    def __init__(self, weights: dict, bias: float = 0.0, log_features=()):
+        self.weights = weights
+        self.bias = bias
+        self.log_features = set(log_features)
+
+    @classmethod
+    def from_json(cls, path: str):
+        with open(path, encoding="utf-8") as f:
+            model = json.load(f)
+        return cls(model["weights"], model.get("bias", 0.0), model.get("log_features", ()))
+
+    def __call__(self, features: dict) -> float:
+        z = self.bias
+        for name, weight in self.weights.items():
+            value = features.get(name, 0.0)
+            if name in self.log_features:
+                value = math.log1p(value)
+            z += weight * value
+        return 1 / (1 + math.exp(-z))
+
+
+class DocumentGate:
+    """Accept or reject an image from its text heatmap features.
+
+    Without a `classifier` the score is the text density (fraction of heatmap
+    pixels above `low_text`); with one it is the classifier's probability.
+    Images scoring below `threshold` are rejected. Every decision is logged,
+    and appended as a JSON line to `log_path` when given, for tuning.
+    With `enforce=False` the gate only logs and never rejects, to calibrate
+    `threshold` on real traffic first.
+    """
+
+    def __init__(
+        self,
+        threshold: float = None,
+        classifier=None,
+        canvas_size: int = 640,
+        low_text: float = 0.4,
+        log_path: str = None,
+        enforce: bool = True,
+    ):
+        self.classifier = classifier
+        if threshold is None:
+            threshold = 0.5 if classifier is not None else 0.005
+        self.threshold = threshold
+        self.canvas_size = canvas_size
+        self.low_text = low_text
+        self.log_path = log_path
+        self.enforce = enforce
+        self.checked = 0
+        self.rejected = 0
+        self.failed = 0
+        self._lock = Lock()
+
+    def options(self) -> dict:
+        """Options read by `job_text_heatmap`."""
+        return {"canvas_size": self.canvas_size, "low_text": self.low_text}
+
+    def score(self, features: dict) -> float:
+        if self.classifier is not None:
+            return self.classifier(features)
+        return features["density"]
+
+    def check(self, features: dict, elapsed: float = None, digest: str = None):
+        """Raise `NotADocumentError` when `features` score below the threshold (if enforced)."""
+        score = self.score(features)
+        accepted = score >= self.threshold
+        self._record(features, score, accepted, elapsed, digest)
+        if not accepted and self.enforce:
+            raise NotADocumentError(
+                f"Not related to daycare schedules (document score {score:.4f} < {self.threshold})"
+            )
+
+    def skip(self, error: Exception):
+        # fail open: a broken gate must not block real documents
+        with self._lock:
+            self.failed += 1
+        logging.warning(f"[!] Document gate failed, running OCR anyway: {error}")
+
+    def _record(self, features, score, accepted, elapsed, digest):
+        with self._lock:
+            self.checked += 1
+            if not accepted:
+                self.rejected += 1
+            record = {
+                "time": time.time(),
+                "digest": digest,
+                "accepted": accepted,
+                "enforced": self.enforce,
+                "score": round(score, 6),
+                "threshold": self.threshold,
+                "elapsed": None if elapsed is None else round(elapsed, 4),
+                **features,
+            }
+            logging.info(f"[*] Document gate {json.dumps(record)}")
+            if self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "threshold": self.threshold,
+                "classifier": self.classifier is not None,
+                "enforce": self.enforce,
+                "checked": self.checked,
+                "rejected": self.rejected,
+                "failed": self.failed,
+            }
@@ -0,0 +1,186 @@
+import logging
+
+import cv2
+import numpy as np
+
+# glyph heights (pixels) the CRAFT detector and the recognizers read best
+MIN_TEXT_HEIGHT = 20
+TARGET_TEXT_HEIGHT = 32
+MIN_CANVAS_SIZE = 640
+MAX_CANVAS_SIZE = 2560
+# the text height is estimated on a 1/PROBE_SCALE decode
+PROBE_SCALE = 4
+REDUCED_COLOR = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+def estimate_text_height(grey: np.ndarray, min_components: int = 30):
+    """Typical glyph height in pixels of `grey`, or None if it shows too little text.
+
+    Strokes are found on the morphological gradient and joined horizontally;
+    the 25th percentile height of text-shaped components is used so that a
+    few large headings do not hide the body text.
+    """
+    if max(grey.shape) < 256:
+        return None
+    edges = cv2.morphologyEx(grey, cv2.MORPH_GRADIENT, np.ones((3, 3), np.uint8))
+    _, mask = cv2.threshold(edges, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    mask = cv2.morphologyEx(
+        mask, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (3, 1))
+    )
+    count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    heights = stats[1:count, cv2.CC_STAT_HEIGHT]
+    widths = stats[1:count, cv2.CC_STAT_WIDTH]
+    text_like = (
+        (heights >= 3)
+        & (heights <= grey.shape[0] * 0.1)
+        & (widths <= grey.shape[1] * 0.5)
+        & (widths <= heights * 15)
+    )
+    if text_like.sum() < min_components:
+        return None
+    return float(np.percentile(heights[text_like], 25))
+
+
+def plan_decode(text_height, long_side):
+    """Decode scale, detector `canvas_size` and `mag_ratio` for full-resolution `text_height`.
+
+    The largest JPEG reduction keeping glyphs at least MIN_TEXT_HEIGHT tall is
+    picked, then the detector canvas is sized so glyphs land near
+    TARGET_TEXT_HEIGHT (upscaling up to 2x for tiny text).
+    """
+    if text_height is None:
+        return 1, MAX_CANVAS_SIZE, 1.0
+    scale = next((f for f in (8, 4, 2) if text_height / f >= MIN_TEXT_HEIGHT), 1)
+    ratio = TARGET_TEXT_HEIGHT / (text_height / scale)
+    canvas_size = int(min(MAX_CANVAS_SIZE, max(MIN_CANVAS_SIZE, long_side / scale * ratio)))
+    return scale, canvas_size, min(max(ratio, 1.0), 2.0)
+
+
+class DecodedImage:
+    """An image decoded once and shared by every OCR engine.
+
+    `rgb` is what EasyOCR's detector and Tesseract see when given a file path,
+    `grey` is what the recognizers (EasyOCR, Pororo) crop from.
+
+    Adaptive decoding (`from_bytes_adaptive`) may decode at 1/`scale` of the
+    original resolution and sets the `canvas_size`/`mag_ratio` every CRAFT
+    pass on this image should use; coordinates are in decoded pixels.
+    """
+
+    def __init__(
+        self,
+        rgb: np.ndarray,
+        grey: np.ndarray,
+        scale: int = 1,
+        canvas_size: int = MAX_CANVAS_SIZE,
+        mag_ratio: float = 1.0,
+        text_height: float = None,
+    ):
+        self.rgb = rgb
+        self.grey = grey
+        self.scale = scale
+        self.canvas_size = canvas_size
+        self.mag_ratio = mag_ratio
+        self.text_height = text_height
+
+    def plan(self) -> dict:
+        return {
+            "scale": self.scale,
+            "canvas_size": self.canvas_size,
+            "mag_ratio": self.mag_ratio,
+            "text_height": self.text_height,
+        }
+
+    def detect_options(self) -> dict:
+        """Keyword arguments for EasyOCR's `Reader.detect`/`detect_textbox`."""
+        return {"canvas_size": self.canvas_size, "mag_ratio": self.mag_ratio}
+
+    @classmethod
+    def from_bgr(cls, bgr: np.ndarray):
+        if len(bgr.shape) == 2:
+            return cls(cv2.cvtColor(bgr, cv2.COLOR_GRAY2RGB), bgr)
+        if bgr.shape[2] == 4:
+            bgr = cv2.cvtColor(bgr, cv2.COLOR_BGRA2BGR)
+        return cls(
+            cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB), cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        bgr = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        if bgr is None:
+            raise ValueError("Could not decode image bytes")
+        return cls.from_bgr(bgr)
+
+    @classmethod
+    def from_bytes_adaptive(cls, data: bytes):
+        """Decode at the resolution the text needs, using libjpeg's reduced decode."""
+        buf = np.frombuffer(data, np.uint8)
+        probe = cv2.imdecode(buf, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+        if probe is None:
+            raise ValueError("Could not decode image bytes")
+        text_height = estimate_text_height(probe)
+        if text_height is not None:
+            text_height *= PROBE_SCALE
+        scale, canvas_size, mag_ratio = plan_decode(text_height, max(probe.shape) * PROBE_SCALE)
+
+        bgr = cv2.imdecode(buf, REDUCED_COLOR[scale])
+        if bgr is None:
+            raise ValueError("Could not decode image bytes")
+        logging.info(
+            f"[*] Adaptive decode: text height {text_height}, 1/{scale} scale, "
+            f"canvas {canvas_size}, mag {mag_ratio:.2f}"
+        )
+        image = cls.from_bgr(bgr)
+        image.scale = scale
+        image.canvas_size = canvas_size
+        image.mag_ratio = mag_ratio
+        image.text_height = text_height
+        return image
+
+    @classmethod
+    def from_path(cls, path: str):
+        bgr = cv2.imread(path, cv2.IMREAD_COLOR)
+        if bgr is None:
+            raise ValueError(f"Could not read image {path}")
+        return cls.from_bgr(bgr)
+
+    @property
+    def shape(self):
+        return self.grey.shape
+
+
+def load_image(image, adaptive: bool = False) -> DecodedImage:
+    """Decode a file path, encoded bytes or BGR numpy array into a `DecodedImage`.
+
+    With `adaptive`, paths and bytes are decoded with `from_bytes_adaptive`;
+    numpy arrays are used as given.
+    """
+    if isinstance(image, DecodedImage):
+        return image
+    if isinstance(image, str):
+        if adaptive:
+            return DecodedImage.from_bytes_adaptive(np.fromfile(image, np.uint8))
+        return DecodedImage.from_path(image)
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        if adaptive:
+            return DecodedImage.from_bytes_adaptive(bytes(image))
+        return DecodedImage.from_bytes(bytes(image))
+    if isinstance(image, np.ndarray):
+        return DecodedImage.from_bgr(image)
+    raise ValueError(
+        "Invalid input type. Supporting format = string(file path), bytes, numpy array"
+    )
+
+
+def get_image(_options) -> DecodedImage:
+    """The shared decoded image of a job, decoding `path` if the caller did not."""
+    image = _options.get("image")
+    if image is None:
+        image = load_image(_options["path"])
+    return image
@@ -58,3 +58,41 @@ def extract_list(s):
 def rectangle_corners(rect):
     x, y, w, h = rect
     return [[x, y], [x + w, y], [x + w, y + h], [x, y + h]]
+
+
+def extract_json_object(s):
+    """The first JSON object in `s` that has a "data" key, or None."""
+    depth = 0
+    start_position = None
+    in_string = escaped = False
+
+    for i, c in enumerate(s):
+        # braces inside JSON strings do not count
+        if in_string:
+            if escaped:
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == '"':
+                in_string = False
+            continue
+
+        if c == '"' and depth > 0:
+            in_string = True
+        elif c == "{":
+            if depth == 0:
+                start_position = i
+            depth += 1
+
+        elif c == "}" and depth > 0:
+            depth -= 1
+            if depth == 0:
+                try:
+                    obj = json.loads(s[start_position : i + 1])
+                    if isinstance(obj, dict) and "data" in obj:
+                        return obj
+                except json.decoder.JSONDecodeError:
+                    pass
+                start_position = None
+
+    return None
@@ -0,0 +1,352 @@
+"""Run the OCR engine jobs in long-lived worker processes.
+
+Each engine job (`job_easy_ocr`, `job_tesseract`, `job_easy_pororo_ocr`, ...)
+gets dedicated worker processes that load its model once and keep it,
+so EasyOCR's and brainOCR's Python-heavy post-processing runs in parallel
+instead of contending on the GIL of the serving process.
+
+The decoded image is copied once per request into a shared memory block
+that every engine worker attaches to; only a small handle is pickled.
+Helper jobs such as `job_detect_text_boxes` are routed to the worker that
+already holds their model.
+"""
+
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+import logging
+import multiprocessing
+import pickle
+import queue
+import threading
+import time
+
+import numpy as np
+
+from .image import DecodedImage
+from .tracing import span
+
+
+class WorkerTimeoutError(TimeoutError):
+    pass
+
+
+class SharedImage:
+    """Picklable handle to a `DecodedImage` stored in one shared memory block."""
+
+    def __init__(self, name, rgb_shape, grey_shape, dtype, plan=None):
+        self.name = name
+        self.rgb_shape = rgb_shape
+        self.grey_shape = grey_shape
+        self.dtype = dtype
+        self.plan = plan or {}
+
+    @classmethod
+    def create(cls, image: DecodedImage):
+        """Copy `image` into a new block; the caller closes and unlinks the returned block."""
+        rgb = np.ascontiguousarray(image.rgb)
+        grey = np.ascontiguousarray(image.grey, dtype=rgb.dtype)
+        block = shared_memory.SharedMemory(create=True, size=rgb.nbytes + grey.nbytes)
+        np.ndarray(rgb.shape, rgb.dtype, block.buf)[:] = rgb
+        np.ndarray(grey.shape, grey.dtype, block.buf, offset=rgb.nbytes)[:] = grey
+        return cls(block.name, rgb.shape, grey.shape, rgb.dtype.str, image.plan()), block
+
+    def attach(self):
+        """Map the block and return a `DecodedImage` viewing it, plus the block to close."""
+        block = _attach_untracked(self.name)
+        dtype = np.dtype(self.dtype)
+        rgb = np.ndarray(self.rgb_shape, dtype, block.buf)
+        grey = np.ndarray(
+            self.grey_shape, dtype, block.buf, offset=int(np.prod(self.rgb_shape)) * dtype.itemsize
+        )
+        return DecodedImage(rgb, grey, **self.plan), block
+
+
+def _attach_untracked(name):
+    # the creating process owns (and unlinks) the block; a worker attaching
+    # normally registers it with a resource tracker too, which then reports it
+    # as leaked and unlinks it again when the worker exits
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 has no `track`
+        pass
+    # unregistering afterwards would drop the creator's registration from a
+    # shared tracker, so skip the registration itself (attach runs on the
+    # worker's main loop, no other thread of the worker maps shared memory)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def default_routes(jobs) -> dict:
+    """Run the CRAFT-only jobs in the EasyOCR worker, which already holds the detector."""
+    from .wrappers.easy_ocr import (
+        job_detect_text_boxes,
+        job_easy_ocr,
+        job_easy_ocr_boxes,
+        job_text_heatmap,
+    )
+
+    for job in (job_easy_ocr, job_easy_ocr_boxes):
+        if job in jobs:
+            return {job_detect_text_boxes: job, job_text_heatmap: job}
+    return {}
+
+
+def _warmup(job, languages):
+    # run the whole job once on a blank page so the model and lazy state are loaded
+    from .detect import make_options
+
+    options = make_options(None, languages, "", {}, {})
+    options["image"] = DecodedImage.from_bgr(np.full((64, 256, 3), 255, dtype=np.uint8))
+    try:
+        job(options)
+    except Exception:
+        pass
+
+
+def _picklable(error):
+    try:
+        pickle.dumps(error)
+        return error
+    except Exception:
+        return RuntimeError(repr(error))
+
+
+def _worker_main(job, conn, warmup, languages):
+    from .detect import run_job
+    from .wrappers.tesseract import close_tesseract_engines
+
+    if warmup:
+        _warmup(job, languages)
+    conn.send(("ready", None))
+
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        func, shared, options = message
+        block = None
+        try:
+            # the block is gone when the request was cancelled while this job waited
+            options["image"], block = shared.attach()
+            reply = ("ok", run_job(func, options))
+        except Exception as e:
+            reply = ("error", _picklable(e))
+        finally:
+            # drop every view of the block before closing it
+            options.pop("image", None)
+            if block is not None:
+                try:
+                    block.close()
+                except BufferError:
+                    logging.warning(f"[!] {job.__name__} kept a reference to the shared image")
+        conn.send(reply)
+    close_tesseract_engines()
+    conn.close()
+
+
+class EngineWorker:
+    """One worker process running a single engine job."""
+
+    def __init__(self, job, context, warmup=True, languages=("ko", "en")):
+        self.job = job
+        self.jobs_done = 0
+        self.ready = False
+        self.started = time.monotonic()
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(job, child_conn, warmup, list(languages)),
+            name=f"betterocr-{job.__name__}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def _receive(self, timeout):
+        if not self.conn.poll(timeout):
+            raise WorkerTimeoutError(f"{self.job.__name__} worker did not answer within {timeout}s")
+        try:
+            return self.conn.recv()
+        except EOFError:
+            raise RuntimeError(f"{self.job.__name__} worker exited unexpectedly")
+
+    def wait_ready(self, timeout=None):
+        if not self.ready:
+            self._receive(timeout)
+            self.ready = True
+
+    def call(self, func, shared, options, timeout=None, startup_timeout=None):
+        self.wait_ready(startup_timeout)
+        self.conn.send((func, shared, options))
+        status, value = self._receive(timeout)
+        self.jobs_done += 1
+        if status == "error":
+            raise value
+        return value
+
+    def stop(self, timeout=5):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.kill()
+        self.conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+
+
+class EngineProcessPool:
+    """Pre-warmed worker processes for each OCR engine job.
+
+    `run_job` has the signature of `detect.run_job` and blocks the calling
+    thread while one of its engine's workers runs; each worker runs one job at
+    a time, so an engine serves up to `workers_per_engine` requests at once.
+
+    - `job_timeout`: seconds a job may take; the worker is killed and
+      replaced when it is exceeded, raising `WorkerTimeoutError`.
+    - `max_jobs_per_worker`: a worker is replaced by a fresh one after this
+      many jobs, which bounds slow memory growth inside the engines.
+    - `routes`: ``{job: pool_job}`` running a job without its own worker in
+      a worker of `pool_job`, `default_routes(jobs)` when omitted.
+    - `languages`: what the workers warm up with, the languages later passed
+      to `detect_*`.
+    """
+
+    def __init__(
+        self,
+        jobs,
+        job_timeout: float = None,
+        max_jobs_per_worker: int = 500,
+        startup_timeout: float = 600,
+        warmup: bool = True,
+        start_method: str = "spawn",
+        routes: dict = None,
+        workers_per_engine: int = 1,
+        languages: list[str] = ["ko", "en"],
+    ):
+        self.job_timeout = job_timeout
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.startup_timeout = startup_timeout
+        self.warmup = warmup
+        self.languages = list(languages)
+        self.workers_per_engine = max(1, workers_per_engine)
+        self.recycled = 0
+        self.timeouts = 0
+        self._context = multiprocessing.get_context(start_method)
+        self._workers = {
+            job: [self._spawn(job) for _ in range(self.workers_per_engine)] for job in jobs
+        }
+        # indexes of the idle workers of each job
+        self._idle = {job: queue.Queue() for job in jobs}
+        for job in jobs:
+            for slot in range(self.workers_per_engine):
+                self._idle[job].put(slot)
+        self._routes = default_routes(jobs) if routes is None else routes
+
+    def _spawn(self, job):
+        return EngineWorker(job, self._context, self.warmup, self.languages)
+
+    @contextmanager
+    def _checkout(self, job):
+        """Index of an idle worker of `job`, waiting for one when all are busy."""
+        slot = self._idle[job].get()
+        try:
+            yield slot
+        finally:
+            self._idle[job].put(slot)
+
+    def wait_ready(self):
+        """Block until every worker finished loading its model."""
+        for job, workers in self._workers.items():
+            slots = [self._idle[job].get() for _ in workers]
+            try:
+                for slot in slots:
+                    workers[slot].wait_ready(self.startup_timeout)
+            finally:
+                for slot in slots:
+                    self._idle[job].put(slot)
+
+    def _replace(self, job, slot, kill=False):
+        old = self._workers[job][slot]
+        self._workers[job][slot] = self._spawn(job)
+        if kill:
+            old.kill()
+        else:
+            # let the old worker exit in the background, the new one is already warming up
+            threading.Thread(target=old.stop, daemon=True).start()
+
+    def run_job(self, func, options):
+        job = self._routes.get(func, func)
+        if job not in self._workers:
+            from .detect import run_job
+
+            return run_job(func, options)
+
+        with span(f"betterocr.{func.__name__}"), self._checkout(job) as slot:
+            worker = self._workers[job][slot]
+            try:
+                return worker.call(
+                    func, options["image"], options, self.job_timeout, self.startup_timeout
+                )
+            except WorkerTimeoutError:
+                self.timeouts += 1
+                logging.warning(f"[!] {job.__name__} timed out, restarting its worker")
+                self._replace(job, slot, kill=True)
+                raise
+            except RuntimeError as e:
+                if not worker.process.is_alive():
+                    logging.warning(f"[!] {e}, restarting its worker")
+                    self._replace(job, slot, kill=True)
+                raise
+            finally:
+                if (
+                    worker is self._workers[job][slot]
+                    and worker.jobs_done >= self.max_jobs_per_worker
+                ):
+                    self.recycled += 1
+                    self._replace(job, slot)
+
+    @contextmanager
+    def shared_options(self, options):
+        """Options for `run_job` with the decoded image moved to shared memory."""
+        shared, block = SharedImage.create(options["image"])
+        # the engines only read the decoded image, do not pickle the encoded bytes
+        job_options = {**options, "image": shared, "path": None}
+        try:
+            yield job_options
+        finally:
+            block.close()
+            block.unlink()
+
+    def stats(self) -> dict:
+        return {
+            "workers": {
+                job.__name__: [
+                    {
+                        "pid": worker.process.pid,
+                        "alive": worker.process.is_alive(),
+                        "ready": worker.ready,
+                        "jobs_done": worker.jobs_done,
+                        "uptime": round(time.monotonic() - worker.started, 1),
+                    }
+                    for worker in workers
+                ]
+                for job, workers in self._workers.items()
+            },
+            "idle": {job.__name__: self._idle[job].qsize() for job in self._workers},
+            "recycled": self.recycled,
+            "timeouts": self.timeouts,
+        }
+
+    def shutdown(self):
+        for workers in self._workers.values():
+            for worker in workers:
+                worker.stop()
@@ -0,0 +1,199 @@
+from threading import Lock
+import logging
+import os
+
+
+def resolve_device(gpu=True) -> str:
+    """Resolve the torch device an engine would pick for the given `gpu` flag."""
+    if gpu is False:
+        return "cpu"
+    if gpu is not True:
+        return gpu
+
+    import torch
+
+    if torch.cuda.is_available():
+        return "cuda"
+    if torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+def _load_easyocr(languages: tuple, device: str, quantize: bool):
+    import easyocr
+
+    # EASYOCR_BACKEND=onnx runs the CPU readers in onnxruntime
+    backend = os.getenv("EASYOCR_BACKEND", "torch") if device == "cpu" else "torch"
+    return easyocr.Reader(
+        list(languages),
+        gpu=device != "cpu",
+        quantize=quantize,
+        verbose=False,
+        backend=backend,
+    )
+
+
+def _load_pororo(languages: tuple, device: str, quantize: bool):
+    from .engines.easy_pororo_ocr.pororo import Pororo
+
+    lang = "ko" if "ko" in languages else "en"
+    # load on the device of the cache key, not whatever torch finds first
+    return Pororo(task="ocr", lang=lang, model="brainocr", device=device)
+
+
+def _torch_modules(model):
+    """Yield the torch modules held by an engine object (EasyOCR Reader, PororoOCR)."""
+    import torch
+
+    seen = set()
+    pending = [model]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, torch.nn.Module):
+            yield obj
+            continue
+        for attr in ("detector", "recognizer", "_model"):
+            child = getattr(obj, attr, None)
+            if child is not None:
+                pending.append(child)
+
+
+def model_nbytes(model) -> int:
+    """Bytes held by the parameters and buffers of every torch module in `model`."""
+    total = 0
+    for module in _torch_modules(model):
+        for tensor in list(module.parameters()) + list(module.buffers()):
+            total += tensor.numel() * tensor.element_size()
+    return total
+
+
+class ModelRegistry:
+    """Process-wide cache of loaded OCR models.
+
+    Models are keyed by ``(engine, languages, device, quantize)`` and built at
+    most once; concurrent callers asking for the same key wait on a per-key
+    lock instead of loading the weights twice.
+    """
+
+    def __init__(self):
+        self._loaders = {
+            "easyocr": _load_easyocr,
+            "pororo": _load_pororo,
+        }
+        self._models = {}
+        self._key_locks = {}
+        self._lock = Lock()
+
+    def register_loader(self, engine: str, loader):
+        """Register `loader(languages, device, quantize)` for a new engine name."""
+        with self._lock:
+            self._loaders[engine] = loader
+
+    @staticmethod
+    def make_key(engine: str, languages: list[str], device: str, quantize: bool):
+        return (engine, tuple(languages), device, bool(quantize))
+
+    def get(self, engine: str, languages: list[str], gpu=True, quantize=True):
+        if engine not in self._loaders:
+            raise KeyError(
+                f"Unknown OCR engine {engine}, available engines are {list(self._loaders)}"
+            )
+        key = self.make_key(engine, languages, resolve_device(gpu), quantize)
+
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, Lock())
+
+        with key_lock:
+            model = self._models.get(key)
+            if model is None:
+                logging.info(f"[*] Loading OCR model {key}")
+                model = self._loaders[engine](key[1], key[2], key[3])
+                with self._lock:
+                    self._models[key] = model
+        return model
+
+    def warmup(self, specs: list[dict]):
+        """Load every model described by `specs` (kwargs for `get`) ahead of traffic."""
+        for spec in specs:
+            self.get(**spec)
+
+    def memory_usage(self) -> dict:
+        """Return ``{key: bytes}`` for every loaded model."""
+        with self._lock:
+            items = list(self._models.items())
+        return {key: model_nbytes(model) for key, model in items}
+
+    def loaded_keys(self) -> list:
+        with self._lock:
+            return list(self._models)
+
+    def evict(self, engine: str = None, languages: list[str] = None) -> int:
+        """Drop cached models matching `engine`/`languages` (all when omitted).
+
+        Returns the number of evicted models. Callers already holding a model
+        keep a working reference; the memory is released once they let go.
+        """
+        with self._lock:
+            keys = [
+                key
+                for key in self._models
+                if (engine is None or key[0] == engine)
+                and (languages is None or key[1] == tuple(languages))
+            ]
+            for key in keys:
+                del self._models[key]
+                self._key_locks.pop(key, None)
+
+        if keys:
+            logging.info(f"[*] Evicted OCR models {keys}")
+            try:
+                import torch
+
+                if torch.cuda.is_available():
+                    torch.cuda.empty_cache()
+            except ImportError:
+                pass
+        return len(keys)
+
+
+model_registry = ModelRegistry()
+
+
+def get_easyocr_reader(lang: list[str], gpu=True, quantize=True):
+    return model_registry.get("easyocr", lang, gpu=gpu, quantize=quantize)
+
+
+def get_pororo_ocr(lang: list[str], gpu=True):
+    # brainOCR is never quantized, keep one key per device
+    return model_registry.get("pororo", lang, gpu=gpu, quantize=False)
+
+
+def warmup(lang: list[str], gpu=True, quantize=True):
+    """Load the models `detect_text`/`detect_boxes` need for `lang`."""
+    specs = [{"engine": "easyocr", "languages": lang, "gpu": gpu, "quantize": quantize}]
+    if "ko" in lang or "en" in lang:
+        try:
+            from .wrappers.easy_pororo_ocr import parse_languages
+
+            languages = parse_languages(lang)
+            specs.append(
+                {
+                    "engine": "easyocr",
+                    "languages": languages,
+                    "gpu": gpu,
+                    "quantize": quantize,
+                }
+            )
+            specs.append(
+                {"engine": "pororo", "languages": languages, "gpu": gpu, "quantize": False}
+            )
+        except ImportError as e:
+            logging.warning(f"[!] Skipping Pororo warm-up: {e}")
+    model_registry.warmup(specs)
@@ -0,0 +1,21 @@
+from contextlib import nullcontext
+
+
+_span_factory = None
+
+
+def set_span_factory(factory):
+    """Install a `factory(name) -> context manager` that times BetterOCR stages.
+
+    BetterOCR has no tracing dependency; the application passes its own span
+    (e.g. a Prometheus/OpenTelemetry one). `None` turns timing off again.
+    """
+    global _span_factory
+    _span_factory = factory
+
+
+def span(name: str):
+    """Context manager around one stage: `betterocr.decode`, `betterocr.job_easy_ocr`, `betterocr.llm_merge`..."""
+    if _span_factory is None:
+        return nullcontext()
+    return _span_factory(name)
@@ -1,9 +1,16 @@
-from .easy_ocr import job_easy_ocr, job_easy_ocr_boxes
+from .easy_ocr import (
+    job_detect_text_boxes,
+    job_easy_ocr,
+    job_easy_ocr_boxes,
+    job_text_heatmap,
+)
 from .tesseract.job import job_tesseract, job_tesseract_boxes
 
 __all__ = [
+    "job_detect_text_boxes",
     "job_easy_ocr",
     "job_easy_ocr_boxes",
     "job_tesseract",
     "job_tesseract_boxes",
+    "job_text_heatmap",
 ]
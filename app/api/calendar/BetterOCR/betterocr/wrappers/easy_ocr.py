@@ -1,18 +1,68 @@
-import easyocr
 import logging
 
+from ..gate import heatmap_features
+from ..image import get_image
+from ..registry import get_easyocr_reader
+
+# boxes recognized per forward pass (on cpu, grouped by padded width)
+BATCH_SIZE = 16
+
+
+def job_detect_text_boxes(_options):
+    """Run the CRAFT detector once; every job with `uses_text_boxes` groups its output."""
+    reader = get_easyocr_reader(_options["lang"])
+    image = get_image(_options)
+    text_boxes = reader.detect_textbox(image.rgb, **image.detect_options())
+    logging.info(f"[*] text box detection completed")
+    return text_boxes
+
+
+def job_text_heatmap(_options):
+    """Text density features of a downscaled CRAFT heatmap, for `DocumentGate`."""
+    gate = _options.get("gate", {})
+    reader = get_easyocr_reader(_options["lang"])
+    heatmap = reader.text_heatmap(
+        get_image(_options).rgb, canvas_size=gate.get("canvas_size", 640)
+    )
+    return heatmap_features(heatmap, gate.get("low_text", 0.4))
+
+
+def readtext(_options, **kwargs):
+    # same as Reader.readtext, but reusing the already decoded rgb / grey images
+    reader = get_easyocr_reader(_options["lang"])
+    image = get_image(_options)
+    text_boxes = _options.get("text_boxes")
+    if text_boxes is None:
+        horizontal_list, free_list = reader.detect(
+            image.rgb, reformat=False, **image.detect_options()
+        )
+    else:
+        horizontal_list, free_list = reader.group_textbox(text_boxes)
+    return reader.recognize(
+        image.grey,
+        horizontal_list[0],
+        free_list[0],
+        batch_size=BATCH_SIZE,
+        reformat=False,
+        **kwargs,
+    )
+
+
 def job_easy_ocr(_options):
-    reader = easyocr.Reader(_options["lang"])
-    text = reader.readtext(_options["path"], detail=0)
-    text = "".join(text)
+    text = readtext(_options, detail=0)
+    # one line per detected box, like the other engines
+    text = "\\n".join(text)
     # print("[*] job_easy_ocr", text)
     logging.info(f"[*] easy_ocr completed")
     return text
 
 
 def job_easy_ocr_boxes(_options):
-    reader = easyocr.Reader(_options["lang"])
-    boxes = reader.readtext(_options["path"], output_format="dict")
+    boxes = readtext(_options, output_format="dict")
     for box in boxes:
         box["box"] = box.pop("boxes")
     return boxes
+
+
+job_easy_ocr.uses_text_boxes = True
+job_easy_ocr_boxes.uses_text_boxes = True
@@ -1,4 +1,5 @@
-from ..engines.easy_pororo_ocr import EasyPororoOcr, load_with_filter
+from ..engines.easy_pororo_ocr import EasyPororoOcr
+from ..image import get_image
 import logging
 
 
@@ -20,13 +21,20 @@ def default_ocr(_options):
 
 
 def job_easy_pororo_ocr(_options):
-    image = load_with_filter(_options["path"])
+    # load_with_filter == grayscale of the decoded image
+    decoded = get_image(_options)
+    image = decoded.grey
 
     ocr = _options.get("ocr")
     if not ocr:
         ocr = default_ocr(_options)
 
-    text = ocr.run_ocr(image, debug=False)
+    text = ocr.run_ocr(
+        image,
+        debug=False,
+        text_boxes=_options.get("text_boxes"),
+        detect_options=decoded.detect_options(),
+    )
 
     if isinstance(text, list):
         text = "\\n".join(text)
@@ -39,3 +47,7 @@ def job_easy_pororo_ocr_boxes(_options):
     ocr = default_ocr(_options)
     job_easy_pororo_ocr({**_options, "ocr": ocr})
     return ocr.get_boxes()
+
+
+job_easy_pororo_ocr.uses_text_boxes = True
+job_easy_pororo_ocr_boxes.uses_text_boxes = True
@@ -1,3 +1,11 @@
+from .engine import TesseractEngine, close_tesseract_engines, get_tesseract_engine
 from .job import convert_to_tesseract_lang_code, job_tesseract, job_tesseract_boxes
 
-__all__ = ["convert_to_tesseract_lang_code", "job_tesseract", "job_tesseract_boxes"]
+__all__ = [
+    "TesseractEngine",
+    "get_tesseract_engine",
+    "close_tesseract_engines",
+    "convert_to_tesseract_lang_code",
+    "job_tesseract",
+    "job_tesseract_boxes",
+]
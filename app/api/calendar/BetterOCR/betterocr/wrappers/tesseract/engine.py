@@ -0,0 +1,196 @@
+"""Tesseract through long-lived tesserocr API handles.
+
+`pytesseract` forks the `tesseract` binary for every call, writes the image to
+a temp file and reloads the traineddata each time. A `TesseractEngine` keeps one
+`PyTessBaseAPI` per thread (the API is not thread-safe) with the language data
+loaded, and feeds it numpy buffers directly.
+
+When tesserocr is not installed the engine falls back to pytesseract.
+"""
+
+from threading import Lock, local
+import logging
+import os
+import shlex
+
+import numpy as np
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+
+def parse_config(config: str = "") -> tuple:
+    """Split a pytesseract `config` string into ``(psm, oem, variables)``."""
+    psm, oem, variables = None, None, {}
+    args = shlex.split(config or "")
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg in ("--psm", "--oem") and i + 1 < len(args):
+            value = int(args[i + 1])
+            psm, oem = (value, oem) if arg == "--psm" else (psm, value)
+            i += 2
+            continue
+        if arg == "-c" and i + 1 < len(args) and "=" in args[i + 1]:
+            name, value = args[i + 1].split("=", 1)
+            variables[name] = value
+            i += 2
+            continue
+        i += 1
+    return psm, oem, variables
+
+
+def merge_word_boxes(words) -> list[dict]:
+    """`[{"box", "text"}]` per line from ``(line_key, text, conf, left, top, right, bottom)`` words."""
+    lines = {}
+    for line_key, text, conf, left, top, right, bottom in words:
+        if conf < 5 or not text.strip():
+            continue
+        line = lines.setdefault(line_key, {"words": [], "box": [left, top, right, bottom]})
+        line["words"].append(text)
+        box = line["box"]
+        line["box"] = [
+            min(box[0], left),
+            min(box[1], top),
+            max(box[2], right),
+            max(box[3], bottom),
+        ]
+
+    boxes = []
+    for line in lines.values():
+        left, top, right, bottom = line["box"]
+        boxes.append(
+            {
+                "box": [[left, top], [right, top], [right, bottom], [left, bottom]],
+                "text": " ".join(line["words"]),
+            }
+        )
+    return boxes
+
+
+class TesseractEngine:
+    """Tesseract for one language string and options, with a handle per thread.
+
+    `options` are the pytesseract keyword arguments BetterOCR accepts
+    (``{"config": "--psm 6"}``); tesserocr only reads `config`.
+    """
+
+    def __init__(self, lang: str, options: dict = None):
+        self.lang = lang
+        self.options = options or {}
+        self.psm, self.oem, self.variables = parse_config(self.options.get("config", ""))
+        self._local = local()
+        # every handle created, so that `close` can end those of other threads
+        self._apis = []
+        self._apis_lock = Lock()
+
+    def _api(self):
+        api = getattr(self._local, "api", None)
+        if api is None:
+            kwargs = {"lang": self.lang}
+            if os.environ.get("TESSDATA_PREFIX"):
+                kwargs["path"] = os.environ["TESSDATA_PREFIX"]
+            if self.psm is not None:
+                kwargs["psm"] = self.psm
+            if self.oem is not None:
+                kwargs["oem"] = self.oem
+            api = tesserocr.PyTessBaseAPI(**kwargs)
+            for name, value in self.variables.items():
+                api.SetVariable(name, value)
+            self._local.api = api
+            with self._apis_lock:
+                self._apis.append(api)
+            logging.info(f"[*] Loaded Tesseract {self.lang} handle")
+        return api
+
+    def close(self):
+        """End every thread's handle. Call once the threads using the engine have stopped."""
+        with self._apis_lock:
+            apis, self._apis = self._apis, []
+            # threads that use the engine again load a fresh handle
+            self._local = local()
+        for api in apis:
+            api.End()
+        if apis:
+            logging.info(f"[*] Closed {len(apis)} Tesseract {self.lang} handle(s)")
+
+    def _set_image(self, image: np.ndarray):
+        api = self._api()
+        image = np.ascontiguousarray(image)
+        height, width = image.shape[:2]
+        channels = 1 if image.ndim == 2 else image.shape[2]
+        api.SetImageBytes(image.tobytes(), width, height, channels, width * channels)
+        return api
+
+    def image_to_string(self, image: np.ndarray) -> str:
+        if tesserocr is None:
+            import pytesseract
+
+            return pytesseract.image_to_string(image, lang=self.lang, **self.options)
+        return self._set_image(image).GetUTF8Text()
+
+    def image_to_boxes(self, image: np.ndarray) -> list[dict]:
+        """One `{"box", "text"}` per text line, from words with confidence >= 5."""
+        if tesserocr is None:
+            return merge_word_boxes(self._pytesseract_words(image))
+        return merge_word_boxes(self._words(image))
+
+    def _words(self, image):
+        api = self._set_image(image)
+        api.Recognize()
+        iterator = api.GetIterator()
+        if iterator is None:
+            return
+        level = tesserocr.RIL.WORD
+        line = -1
+        for word in tesserocr.iterate_level(iterator, level):
+            if word.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                line += 1
+            bounding_box = word.BoundingBox(level)
+            if bounding_box is None:
+                continue
+            text = word.GetUTF8Text(level) or ""
+            yield (line, text, word.Confidence(level), *bounding_box)
+
+    def _pytesseract_words(self, image):
+        import pytesseract
+
+        data = pytesseract.image_to_data(
+            image, lang=self.lang, **self.options, output_type=pytesseract.Output.DICT
+        )
+        for i, text in enumerate(data["text"]):
+            left, top = data["left"][i], data["top"][i]
+            yield (
+                (data["block_num"][i], data["par_num"][i], data["line_num"][i]),
+                text,
+                float(data["conf"][i]),
+                left,
+                top,
+                left + data["width"][i],
+                top + data["height"][i],
+            )
+
+
+_engines = {}
+_engines_lock = Lock()
+
+
+def get_tesseract_engine(lang: str, options: dict = None) -> TesseractEngine:
+    """The process-wide engine for `lang` and the pytesseract `options`."""
+    key = (lang, tuple(sorted((options or {}).items())))
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = TesseractEngine(lang, options)
+    return engine
+
+
+def close_tesseract_engines():
+    """End the handles of every engine, e.g. when the OCR pool shuts down."""
+    with _engines_lock:
+        engines = list(_engines.values())
+        _engines.clear()
+    for engine in engines:
+        engine.close()
@@ -71,6 +71,20 @@ def test_net(canvas_size, mag_ratio, net, image, text_threshold, link_threshold,
 
     return boxes_list, polys_list
 
+def get_text_heatmap(net, image, canvas_size, mag_ratio, device):
+    # character region score of a single image, at the resized resolution / 2
+    img_resized, target_ratio, size_heatmap = resize_aspect_ratio(image, canvas_size,
+                                                                  interpolation=cv2.INTER_AREA,
+                                                                  mag_ratio=mag_ratio)
+    x = np.transpose(normalizeMeanVariance(img_resized), (2, 0, 1))
+    x = torch.from_numpy(np.array([x]))
+    x = x.to(device)
+
+    with torch.no_grad():
+        y, feature = net(x)
+
+    return y[0, :, :, 0].cpu().data.numpy()
+
 def get_detector(trained_model, device='cpu', quantize=True, cudnn_benchmark=False):
     net = CRAFT()
 
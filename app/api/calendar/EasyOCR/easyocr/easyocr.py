@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from .recognition import get_recognizer, get_text
+from .onnx_backend import get_onnx_detector, get_onnx_recognizer
 from .utils import group_text_box, get_image_list, calculate_md5, get_paragraph,\
                    download_and_unzip, printProgressBar, diff, reformat_input,\
                    make_rotated_img_list, set_result_with_confidence,\
@@ -33,7 +34,7 @@ class Reader(object):
                  user_network_directory=None, detect_network="craft", 
                  recog_network='standard', download_enabled=True, 
                  detector=True, recognizer=True, verbose=True, 
-                 quantize=True, cudnn_benchmark=False):
+                 quantize=True, cudnn_benchmark=False, backend='torch', onnx_threads=None):
         """Create an EasyOCR Reader
 
         Parameters:
@@ -50,6 +51,13 @@ class Reader(object):
             EASYOCR_MODULE_PATH (preferred), MODULE_PATH (if defined), or ~/.EasyOCR/.
 
             download_enabled (bool): Enabled downloading of model data via HTTP (default).
+
+            backend (string): 'torch' (default) or 'onnx'. The onnx backend runs the CRAFT
+            detector and the recognizer in onnxruntime on CPU. Graphs are exported next to
+            the .pth weights on first use and reused afterwards.
+
+            onnx_threads (int): intra-op threads of the onnxruntime sessions. Defaults to
+            EASYOCR_ONNX_THREADS or the number of CPUs.
         """
         self.verbose = verbose
         self.download_enabled = download_enabled
@@ -81,6 +89,14 @@ class Reader(object):
         else:
             self.device = gpu
 
+        if backend not in ['torch', 'onnx']:
+            raise ValueError("Unsupported backend %s. Supported backends are torch and onnx." % backend)
+        self.backend = backend
+        self.onnx_threads = onnx_threads
+        if backend == 'onnx' and self.device != 'cpu':
+            LOGGER.warning('The onnx backend runs on CPU, ignoring device %s.' % self.device)
+            self.device = 'cpu'
+
         self.detection_models = detection_models
         self.recognition_models = recognition_models
 
@@ -228,9 +244,15 @@ class Reader(object):
                     }
             else:
                 network_params = recog_config['network_params']
-            self.recognizer, self.converter = get_recognizer(recog_network, network_params,\
-                                                         self.character, separator_list,\
-                                                         dict_list, model_path, device = self.device, quantize=quantize)
+            if self.backend == 'onnx':
+                self.recognizer, self.converter = get_onnx_recognizer(recog_network, network_params,\
+                                                                  self.character, separator_list,\
+                                                                  dict_list, model_path, input_height=imgH,\
+                                                                  quantize=quantize, intra_op_threads=self.onnx_threads)
+            else:
+                self.recognizer, self.converter = get_recognizer(recog_network, network_params,\
+                                                             self.character, separator_list,\
+                                                             dict_list, model_path, device = self.device, quantize=quantize)
 
     def getDetectorPath(self, detect_network):
         if detect_network in self.support_detection_network:
@@ -268,6 +290,10 @@ class Reader(object):
         return detector_path
 
     def initDetector(self, detector_path):
+        if self.backend == 'onnx':
+            if self.detect_network != 'craft':
+                raise RuntimeError("The onnx backend supports the craft detector only.")
+            return get_onnx_detector(detector_path, self.get_detector, self.onnx_threads)
         return self.get_detector(detector_path, 
                                  device = self.device, 
                                  quantize = self.quantize, 
@@ -318,7 +344,28 @@ class Reader(object):
         if reformat:
             img, img_cv_grey = reformat_input(img)
 
-        text_box_list = self.get_textbox(self.detector, 
+        text_box_list = self.detect_textbox(img, text_threshold = text_threshold,\
+                                            low_text = low_text, link_threshold = link_threshold,\
+                                            canvas_size = canvas_size, mag_ratio = mag_ratio,\
+                                            optimal_num_chars = optimal_num_chars,\
+                                            threshold = threshold, bbox_min_score = bbox_min_score,\
+                                            bbox_min_size = bbox_min_size, max_candidates = max_candidates)
+
+        return self.group_textbox(text_box_list, min_size = min_size,\
+                                  slope_ths = slope_ths, ycenter_ths = ycenter_ths,\
+                                  height_ths = height_ths, width_ths = width_ths,\
+                                  add_margin = add_margin, sort_output = (optimal_num_chars is None))
+
+    def detect_textbox(self, img, text_threshold = 0.7, low_text = 0.4,\
+                       link_threshold = 0.4, canvas_size = 2560, mag_ratio = 1.,\
+                       optimal_num_chars = None, threshold = 0.2, bbox_min_score = 0.2,\
+                       bbox_min_size = 3, max_candidates = 0):
+        '''
+        Run only the detector network on an already reformatted image.
+        The returned per-image polygons can be grouped several times with
+        different grouping parameters by `group_textbox`.
+        '''
+        return self.get_textbox(self.detector, 
                                     img, 
                                     canvas_size = canvas_size, 
                                     mag_ratio = mag_ratio,
@@ -334,12 +381,30 @@ class Reader(object):
                                     max_candidates = max_candidates,
                                     )
 
+    def text_heatmap(self, img, canvas_size = 640, mag_ratio = 1.):
+        '''
+        CRAFT character region score map of an already reformatted image,
+        computed on a canvas of at most `canvas_size` pixels. Cheap enough to
+        decide whether an image contains text before running full detection.
+        '''
+        if self.detect_network != 'craft':
+            raise RuntimeError("Text heatmap is only supported by the craft detector.")
+        from .detection import get_text_heatmap
+        return get_text_heatmap(self.detector, img, canvas_size, mag_ratio, self.device)
+
+    def group_textbox(self, text_box_list, min_size = 20, slope_ths = 0.1,\
+                      ycenter_ths = 0.5, height_ths = 0.5, width_ths = 0.5,\
+                      add_margin = 0.1, sort_output = True):
+        '''
+        Group the polygons of `detect_textbox` into (horizontal_list, free_list)
+        per image, as returned by `detect`.
+        '''
         horizontal_list_agg, free_list_agg = [], []
         for text_box in text_box_list:
             horizontal_list, free_list = group_text_box(text_box, slope_ths,
                                                         ycenter_ths, height_ths,
                                                         width_ths, add_margin,
-                                                        (optimal_num_chars is None))
+                                                        sort_output)
             if min_size:
                 horizontal_list = [i for i in horizontal_list if max(
                     i[1] - i[0], i[3] - i[2]) > min_size]
@@ -374,8 +439,13 @@ class Reader(object):
             horizontal_list = [[0, x_max, 0, y_max]]
             free_list = []
 
+        # on cpu with batch_size > 1, group boxes of the same padded width and run one batch per group
+        if (self.device == 'cpu') and (batch_size > 1) and not rotation_info:
+            result = self.recognize_bucketed(img_cv_grey, horizontal_list, free_list,\
+                                             ignore_char, decoder, beamWidth, batch_size,\
+                                             contrast_ths, adjust_contrast, filter_ths, workers)
         # without gpu/parallelization, it is faster to process image one by one
-        if ((batch_size == 1) or (self.device == 'cpu')) and not rotation_info:
+        elif ((batch_size == 1) or (self.device == 'cpu')) and not rotation_info:
             result = []
             for bbox in horizontal_list:
                 h_list = [bbox]
@@ -437,6 +507,35 @@ class Reader(object):
         else:
             return result
 
+    def recognize_bucketed(self, img_cv_grey, horizontal_list, free_list,\
+                           ignore_char = '', decoder = 'greedy', beamWidth = 5, batch_size = 16,\
+                           contrast_ths = 0.1, adjust_contrast = 0.5, filter_ths = 0.003, workers = 0):
+        '''
+        Width-bucketed batching for the cpu path.
+        Every box is padded to the same width it would get when recognized on its own
+        (ceil(aspect ratio) * imgH), so boxes sharing that width are stacked into one
+        forward pass per `batch_size` chunk. Results are returned in the per-box order
+        (horizontal_list first, then free_list).
+        Note: with a dynamically quantized recognizer the activation scale is computed
+        per batch, so confidences can differ from per-box inference in the last digits.
+        '''
+        buckets = {}
+        for idx, (h_list, f_list) in enumerate([([bbox], []) for bbox in horizontal_list] +\
+                                               [([], [bbox]) for bbox in free_list]):
+            image_list, max_width = get_image_list(h_list, f_list, img_cv_grey, model_height = imgH)
+            if image_list:
+                buckets.setdefault(int(max_width), []).append((idx, image_list[0]))
+
+        indexed_result = []
+        for max_width, items in buckets.items():
+            result0 = get_text(self.character, imgH, max_width, self.recognizer, self.converter,\
+                               [item for _, item in items], ignore_char, decoder, beamWidth,\
+                               batch_size, contrast_ths, adjust_contrast, filter_ths,\
+                               workers, self.device)
+            indexed_result += zip([idx for idx, _ in items], result0)
+
+        return [item for _, item in sorted(indexed_result, key = lambda x: x[0])]
+
     def readtext(self, image, decoder = 'greedy', beamWidth= 5, batch_size = 1,\
                  workers = 0, allowlist = None, blocklist = None, detail = 1,\
                  rotation_info = None, paragraph = False, min_size = 20,\
@@ -4,6 +4,8 @@ import onnx
 import torch
 import easyocr
 import numpy as np
+from easyocr.config import imgH
+from easyocr.onnx_backend import export_recognizer_onnx, quantize_onnx
 
 
 def export_detector(detector_onnx_save_path,
@@ -83,6 +85,54 @@ def export_detector(detector_onnx_save_path,
         print(f"Model exported to {detector_onnx_save_path} and tested with ONNXRuntime, and the result looks good!")
 
 
+def export_recognizer(recognizer_onnx_save_path,
+                      lang_list=["en"],
+                      model_storage_directory=None,
+                      user_network_directory=None,
+                      download_enabled=True,
+                      dynamic=True,
+                      quantize=False,
+                      test_widths=[128, 512]):
+    if dynamic is False:
+        print('WARNING: it is recommended to use -d dynamic flag when exporting onnx')
+    # dynamically quantized torch modules do not export, quantize the graph afterwards instead
+    ocr_reader = easyocr.Reader(lang_list,
+                                gpu=False,
+                                detector=False,
+                                recognizer=True,
+                                quantize=False,
+                                model_storage_directory=model_storage_directory,
+                                user_network_directory=user_network_directory,
+                                download_enabled=download_enabled)
+    recognizer = ocr_reader.recognizer.eval()
+    export_recognizer_onnx(recognizer, recognizer_onnx_save_path, imgH, dynamic=dynamic)
+
+    # verify exported onnx model
+    recognizer_onnx = onnx.load(recognizer_onnx_save_path)
+    onnx.checker.check_model(recognizer_onnx)
+    print(f"Model Inputs:\n {recognizer_onnx.graph.input}\n{'*'*80}")
+    print(f"Model Outputs:\n {recognizer_onnx.graph.output}\n{'*'*80}")
+
+    # onnx inference validation, several widths to check the dynamic axis
+    import onnxruntime
+
+    ort_session = onnxruntime.InferenceSession(recognizer_onnx_save_path)
+    for width in (test_widths if dynamic else [256]):
+        dummy_input = torch.rand([2, 1, imgH, width])
+        with torch.no_grad():
+            torch_out = recognizer(dummy_input, None).numpy()
+        onnx_out = ort_session.run(None, {ort_session.get_inputs()[0].name: dummy_input.numpy()})[0]
+        print(f"width={width}: torch output {torch_out.shape}, onnx output {onnx_out.shape}")
+        np.testing.assert_allclose(torch_out, onnx_out, rtol=1e-03, atol=1e-05)
+
+    print(f"Model exported to {recognizer_onnx_save_path} and tested with ONNXRuntime, and the result looks good!")
+
+    if quantize:
+        quantized_path = recognizer_onnx_save_path.replace('.onnx', '.int8.onnx')
+        quantize_onnx(recognizer_onnx_save_path, quantized_path)
+        print(f"int8 model saved to {quantized_path}")
+
+
 def parse_args():
     parser = argparse.ArgumentParser()
     parser.add_argument('-l', '--lang_list',
@@ -93,6 +143,13 @@ def parse_args():
                         default="detector_craft.onnx",
                         help="export detector onnx file path ending in .onnx" +
                         "Do not pass in this flag to avoid exporting detector")
+    parser.add_argument('-r', '--recognizer_onnx_save_path', type=str,
+                        default="None",
+                        help="export recognizer onnx file path ending in .onnx" +
+                        "Do not pass in this flag to avoid exporting recognizer")
+    parser.add_argument('-q', '--quantize',
+                        action='store_true',
+                        help="Also save an int8 dynamically quantized recognizer")
     parser.add_argument('-d', '--dynamic',
                         action='store_true',
                         help="Dynamic  input output shapes for detector")
@@ -107,6 +164,8 @@ def parse_args():
     args = parser.parse_args()
     dpath = args.detector_onnx_save_path
     args.detector_onnx_save_path = None if dpath == "None" else dpath
+    rpath = args.recognizer_onnx_save_path
+    args.recognizer_onnx_save_path = None if rpath == "None" else rpath
     if len(args.in_shape) != 4:
         raise ValueError(
             f"Input shape must have four values (bsize, channel, height, width) eg. 1 3 608 800")
@@ -115,12 +174,20 @@ def parse_args():
 
 def main():
     args = parse_args()
-    export_detector(detector_onnx_save_path=args.detector_onnx_save_path,
-                    in_shape=args.in_shape,
-                    lang_list=args.lang_list,
-                    model_storage_directory=args.model_storage_directory,
-                    user_network_directory=args.user_network_directory,
-                    dynamic=args.dynamic)
+    if args.detector_onnx_save_path:
+        export_detector(detector_onnx_save_path=args.detector_onnx_save_path,
+                        in_shape=args.in_shape,
+                        lang_list=args.lang_list,
+                        model_storage_directory=args.model_storage_directory,
+                        user_network_directory=args.user_network_directory,
+                        dynamic=args.dynamic)
+    if args.recognizer_onnx_save_path:
+        export_recognizer(recognizer_onnx_save_path=args.recognizer_onnx_save_path,
+                          lang_list=args.lang_list,
+                          model_storage_directory=args.model_storage_directory,
+                          user_network_directory=args.user_network_directory,
+                          dynamic=args.dynamic,
+                          quantize=args.quantize)
 
 
 if __name__ == "__main__":
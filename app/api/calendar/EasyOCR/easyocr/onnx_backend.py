@@ -0,0 +1,169 @@
+import os
+from logging import getLogger
+
+import torch
+
+from .utils import CTCLabelConverter
+
+LOGGER = getLogger(__name__)
+
+
+def get_session_options(intra_op_threads=None):
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+    # one request runs one graph at a time, give all threads to the operators
+    options.intra_op_num_threads = intra_op_threads or \
+                                   int(os.environ.get('EASYOCR_ONNX_THREADS', 0)) or \
+                                   os.cpu_count() or 1
+    options.inter_op_num_threads = 1
+    return options
+
+
+def create_session(onnx_path, intra_op_threads=None):
+    import onnxruntime
+
+    return onnxruntime.InferenceSession(onnx_path, get_session_options(intra_op_threads),
+                                        providers=['CPUExecutionProvider'])
+
+
+class OnnxDetector(object):
+    """CRAFT detector running in onnxruntime, called like the torch module."""
+
+    def __init__(self, session):
+        self.session = session
+        self.input_name = session.get_inputs()[0].name
+
+    def eval(self):
+        return self
+
+    def __call__(self, x):
+        y, feature = self.session.run(None, {self.input_name: x.cpu().numpy()})
+        return torch.from_numpy(y), torch.from_numpy(feature)
+
+
+class OnnxRecognizer(object):
+    """Recognizer running in onnxruntime, called like the torch module."""
+
+    def __init__(self, session):
+        self.session = session
+        self.input_name = session.get_inputs()[0].name
+
+    def eval(self):
+        return self
+
+    def __call__(self, image, text=None):
+        preds = self.session.run(None, {self.input_name: image.cpu().numpy()})[0]
+        return torch.from_numpy(preds)
+
+
+class RecognizerExport(torch.nn.Module):
+    """Recognizer forward without the unused `text` input.
+
+    AdaptiveAvgPool2d((None, 1)) does not export with a dynamic width, so the
+    pooling is written as the equivalent mean over the last axis.
+    """
+
+    def __init__(self, model):
+        super(RecognizerExport, self).__init__()
+        self.model = model
+
+    def forward(self, input):
+        visual_feature = self.model.FeatureExtraction(input)
+        visual_feature = visual_feature.permute(0, 3, 1, 2).mean(dim=3)
+        contextual_feature = self.model.SequenceModeling(visual_feature)
+        return self.model.Prediction(contextual_feature.contiguous())
+
+
+def export_detector_onnx(detector, onnx_path, in_shape=[1, 3, 608, 800], dynamic=True):
+    dummy_input = torch.rand(in_shape)
+    with torch.no_grad():
+        torch.onnx.export(detector,
+                          dummy_input,
+                          onnx_path,
+                          export_params=True,
+                          do_constant_folding=True,
+                          opset_version=12,
+                          input_names=['input'],
+                          output_names=['output', 'feature'],
+                          dynamic_axes={'input': {0: 'batch_size', 2: 'height', 3: 'width'},
+                                        'output': {0: 'batch_size', 1: 'dim1', 2: 'dim2'},
+                                        'feature': {0: 'batch_size', 2: 'dim2', 3: 'dim3'}
+                                        } if dynamic else None,
+                          verbose=False)
+    return dummy_input
+
+
+def export_recognizer_onnx(recognizer, onnx_path, input_height=64, dynamic=True):
+    dummy_input = torch.rand([1, 1, input_height, 256])
+    with torch.no_grad():
+        torch.onnx.export(RecognizerExport(recognizer).eval(),
+                          dummy_input,
+                          onnx_path,
+                          export_params=True,
+                          do_constant_folding=True,
+                          opset_version=12,
+                          input_names=['input'],
+                          output_names=['output'],
+                          dynamic_axes={'input': {0: 'batch_size', 3: 'width'},
+                                        'output': {0: 'batch_size', 1: 'length'}
+                                        } if dynamic else None,
+                          verbose=False)
+    return dummy_input
+
+
+def quantize_onnx(onnx_path, quantized_path):
+    """int8 dynamic quantization of the LSTM/Linear layers, like torch's quantize_dynamic."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(onnx_path, quantized_path, op_types_to_quantize=['MatMul', 'LSTM'],
+                     weight_type=QuantType.QInt8)
+
+
+def onnx_path_for(model_path, quantize=False):
+    return os.path.splitext(model_path)[0] + ('.int8.onnx' if quantize else '.onnx')
+
+
+def get_onnx_detector(trained_model, get_detector, intra_op_threads=None):
+    """Load `<trained_model>.onnx`, exporting it from the torch weights on first use."""
+    onnx_path = onnx_path_for(trained_model)
+    if not os.path.isfile(onnx_path):
+        LOGGER.warning('Exporting detector to %s, this is done only once.' % onnx_path)
+        detector = get_detector(trained_model, device='cpu', quantize=False)
+        export_detector_onnx(detector, onnx_path)
+        del detector
+    return OnnxDetector(create_session(onnx_path, intra_op_threads))
+
+
+def get_onnx_recognizer(recog_network, network_params, character,\
+                        separator_list, dict_list, model_path,\
+                        input_height=64, quantize=True, intra_op_threads=None):
+    """Load `<model_path>.onnx` (int8 when `quantize`), exporting it on first use."""
+    from .recognition import get_recognizer
+
+    onnx_path = onnx_path_for(model_path)
+    if not os.path.isfile(onnx_path):
+        LOGGER.warning('Exporting recognizer to %s, this is done only once.' % onnx_path)
+        recognizer, converter = get_recognizer(recog_network, network_params, character,\
+                                               separator_list, dict_list, model_path,\
+                                               device='cpu', quantize=False)
+        export_recognizer_onnx(recognizer, onnx_path, input_height)
+        del recognizer
+    else:
+        # the graph holds the weights, only the label converter is needed
+        converter = CTCLabelConverter(character, separator_list, dict_list)
+
+    if quantize:
+        quantized_path = onnx_path_for(model_path, quantize=True)
+        if not os.path.isfile(quantized_path):
+            try:
+                quantize_onnx(onnx_path, quantized_path)
+                onnx_path = quantized_path
+            except Exception as e:
+                LOGGER.warning('Recognizer quantization failed, using fp32 graph: %s' % e)
+        else:
+            onnx_path = quantized_path
+
+    return OnnxRecognizer(create_session(onnx_path, intra_op_threads)), converter
@@ -1,5 +1,4 @@
-import tempfile
-import uuid
+import asyncio
 from urllib.parse import urlparse
 import json, os
 import logging
@@ -7,8 +6,16 @@ from dotenv import load_dotenv
 
 from app.api.calendar.models import ImageInput
 from app.api.calendar.BetterOCR import betterocr
-from app.api.calendar.utils.s3_util import parse_s3_url, set_s3_client
+from app.api.calendar.BetterOCR.betterocr.detect import get_jobs
+from app.api.calendar.utils.s3_util import (
+    download_to_memory,
+    parse_s3_url,
+    set_s3_client,
+)
 from app.api.calendar.utils.chain_util import setup_chain
+from app.api.calendar.utils.pool_util import get_timeout, io_pool, ocr_admission, ocr_pool
+from app.api.utils.llm_util import llm_provider
+from app.api.utils.trace_util import span
 
 from fastapi import HTTPException, APIRouter
 
@@ -18,9 +25,127 @@ s3_client = set_s3_client()
 
 # 체인 설정
 chain = setup_chain()
+# BetterOCR 병합용 LLM (공유 커넥션 풀 사용)
+OCR_LLM_MODEL = "gpt-4o-mini"
+ocr_chat_model = llm_provider.chat(OCR_LLM_MODEL, temperature=0)
+
+# OCR 결과 캐시 (OCR_CACHE_PATH 지정 시 SQLite 디스크 캐시도 사용)
+ocr_cache = betterocr.OCRCache(
+    max_entries=int(os.getenv("OCR_CACHE_ENTRIES", 256)),
+    path=os.getenv("OCR_CACHE_PATH"),
+    ttl=float(os.getenv("OCR_CACHE_TTL", 7 * 24 * 3600)),
+    max_disk_bytes=int(os.getenv("OCR_CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+)
+
+# 문서 게이트: 축소한 CRAFT heatmap 의 텍스트 밀도로 셀카/사진 등은 OCR, LLM 전에 바로 거절
+# DOCUMENT_GATE_MODEL 에 LogisticGate JSON 을 지정하면 밀도 대신 분류기 확률로 판단
+# 판단 기록은 로그와 DOCUMENT_GATE_LOG(JSONL) 에 남겨 임계값 튜닝에 사용
+# 임계값이 보정되기 전까지 기본은 꺼짐, DOCUMENT_GATE=log 는 거절하지 않고 기록만 남김
+document_gate = None
+DOCUMENT_GATE = os.getenv("DOCUMENT_GATE", "false").lower()
+if DOCUMENT_GATE in ("true", "log"):
+    gate_model = os.getenv("DOCUMENT_GATE_MODEL")
+    gate_threshold = os.getenv("DOCUMENT_GATE_THRESHOLD")
+    document_gate = betterocr.DocumentGate(
+        threshold=float(gate_threshold) if gate_threshold else None,
+        classifier=betterocr.LogisticGate.from_json(gate_model) if gate_model else None,
+        canvas_size=int(os.getenv("DOCUMENT_GATE_CANVAS", 640)),
+        log_path=os.getenv("DOCUMENT_GATE_LOG"),
+        enforce=DOCUMENT_GATE == "true",
+    )
+
+# 엔진 결과를 로컬에서 줄 단위로 정렬/투표하고, 의견이 갈리는 줄만 LLM 에 전달 (기본 꺼짐)
+# 일치율이 OCR_CONSENSUS_SKIP 이상이면 병합을 생략하고 보육 일정 여부만 LLM 에 짧게 확인
+# (문서 게이트는 텍스트 밀도만 보므로 일정표가 아닌 깨끗한 인쇄 문서를 거르지 못함)
+ocr_consensus = None
+if os.getenv("OCR_CONSENSUS", "false").lower() == "true":
+    ocr_consensus = betterocr.ConsensusMerger(
+        skip_threshold=float(os.getenv("OCR_CONSENSUS_SKIP", 0.95)),
+        check_schedule=os.getenv("OCR_CONSENSUS_CHECK_SCHEDULE", "true").lower() == "true",
+    )
+
+# BetterOCR 내부 단계(디코딩, 엔진별 OCR, LLM 병합)도 같은 span 으로 측정
+betterocr.set_span_factory(span)
 
 router = APIRouter()
 
+# 단계별 타임아웃(초)
+S3_TIMEOUT = get_timeout("S3_TIMEOUT", 30)
+OCR_TIMEOUT = get_timeout("OCR_TIMEOUT", 120)
+LLM_TIMEOUT = get_timeout("LLM_TIMEOUT", 60)
+
+# 글자 크기에 맞춰 축소 디코딩(IMREAD_REDUCED_*) 하고 CRAFT canvas_size/mag_ratio 를 이미지별로 결정
+OCR_ADAPTIVE_DECODE = os.getenv("OCR_ADAPTIVE_DECODE", "false").lower() == "true"
+
+# OCR 언어 코드 (EasyOCR 기준). 엔진 프로세스 warm-up 도 같은 언어로 수행
+OCR_LANGUAGES = ["ko", "en"]
+
+# OCR 엔진별 전용 프로세스 (OCR_PROCESS_POOL=true 일 때 startup 에서 생성, 기본은 꺼짐 -> ocr_pool 스레드에서 실행)
+# 엔진마다 OCR_WORKERS_PER_ENGINE 개(기본 1)의 프로세스가 동시 요청을 나눠 처리
+# 메모리 비용: 프로세스마다 torch 와 모델을 따로 로드하므로 EasyOCR/Pororo 프로세스 하나에 수백 MB~1GB,
+# Tesseract 는 수십 MB 가 상주함 -> 전체 ≈ 엔진 수(3) x OCR_WORKERS_PER_ENGINE x 프로세스당 메모리.
+# 켜기 전에 /process_image/engine_stats 와 컨테이너 메모리 한도를 함께 확인
+engine_pool = None
+
+
+@router.on_event("startup")
+def warmup_ocr_models():
+    global engine_pool
+    # OCR 모델을 미리 로드해서 첫 요청부터 추론 시간만 소요되도록 함
+    warmup = os.getenv("OCR_WARMUP", "true").lower() == "true"
+    if os.getenv("OCR_PROCESS_POOL", "false").lower() == "true":
+        # 모델은 각 엔진 프로세스가 들고 있으므로 이 프로세스에서는 로드하지 않음
+        engine_pool = betterocr.EngineProcessPool(
+            get_jobs(OCR_LANGUAGES),
+            job_timeout=OCR_TIMEOUT,
+            max_jobs_per_worker=int(os.getenv("OCR_WORKER_MAX_JOBS", 500)),
+            warmup=warmup,
+            workers_per_engine=int(os.getenv("OCR_WORKERS_PER_ENGINE", 1)),
+            languages=OCR_LANGUAGES,
+        )
+        if warmup:
+            logging.info("OCR Model Warm-up Start...")
+            engine_pool.wait_ready()
+            logging.info("OCR Model Warm-up End...")
+        return
+    if not warmup:
+        return
+    logging.info("OCR Model Warm-up Start...")
+    betterocr.warmup(OCR_LANGUAGES)
+    for key, nbytes in betterocr.model_registry.memory_usage().items():
+        logging.info(f"OCR model {key}: {nbytes / 1024 ** 2:.1f} MiB")
+    logging.info("OCR Model Warm-up End...")
+
+
+@router.on_event("shutdown")
+def stop_ocr_engines():
+    if engine_pool is not None:
+        engine_pool.shutdown()
+    # 스레드에서 실행한 Tesseract 핸들은 OCR 스레드가 끝난 뒤 정리
+    ocr_pool.shutdown(wait=True)
+    betterocr.close_tesseract_engines()
+
+
+@router.get("/process_image/engine_stats")
+def engine_stats():
+    if engine_pool is None:
+        return {"enabled": False}
+    return {"enabled": True, **engine_pool.stats()}
+
+
+@router.get("/process_image/gate_stats")
+def gate_stats():
+    if document_gate is None:
+        return {"enabled": False}
+    return {"enabled": True, **document_gate.stats()}
+
+
+@router.get("/process_image/merge_stats")
+def merge_stats():
+    if ocr_consensus is None:
+        return {"enabled": False}
+    return {"enabled": True, **ocr_consensus.stats()}
+
 
 class InvalidImageTypeError(Exception):
     """Raised when the image is not a valid daycare schedule"""
@@ -28,9 +153,19 @@ class InvalidImageTypeError(Exception):
     pass
 
 
+@router.get("/process_image/admission_stats")
+def admission_stats():
+    return ocr_admission.stats()
+
+
 @router.post("/process_image")
 async def process_image(image_input: ImageInput):
+    # 동시 처리 요청 수가 가득 찼으면 S3 다운로드 전에 바로 거절 (처리 중인 요청은 끝까지 진행)
+    with ocr_admission.admit():
+        return await run_process_image(image_input)
 
+
+async def run_process_image(image_input: ImageInput):
     try:
         baby_id = image_input.baby_id
         user_id = image_input.user_id
@@ -48,42 +183,69 @@ image_path: {image_path}
         parsed_url = urlparse(image_path)
         is_s3 = parsed_url.netloc.endswith("amazonaws.com")
         if is_s3:
-            # 안전한 임시 파일 이름 생성
-            temp_file_name = f"{uuid.uuid4().hex}.jpg"
-            temp_file_path = os.path.join(tempfile.gettempdir(), temp_file_name)
-
             bucket = os.getenv("AWS_S3_BUCKET")
             key = parse_s3_url(image_path)["full_file_name"]
 
-            # s3에서 이미지 다운로드
+            # s3에서 이미지를 메모리로 다운로드 (디코딩은 BetterOCR 에서 한 번만 수행)
             logging.info("S3 Download Start...")
-            s3_client.download_file(bucket, key, temp_file_path)
+            with span("calendar.s3_download"):
+                ocr_target = await io_pool.run(
+                    download_to_memory,
+                    s3_client,
+                    bucket,
+                    key,
+                    timeout=S3_TIMEOUT,
+                )
             logging.info("S3 Download End...")
-            ocr_target = temp_file_path
         else:
             ocr_target = image_path
 
-        logging.info(f"!!!Downloaded OCR target!!! : {ocr_target}")
+        logging.info(f"!!!Downloaded OCR target!!! : {image_path}")
         # Perform OCR
         logging.info("OCR Start...")
-        ocr_result = betterocr.detect_text(
-            ocr_target,
-            ["ko", "en"],  # language codes (from EasyOCR)
-            openai={
-                "model": "gpt-4o-mini",
-            },
-        )
+        # OCR 엔진은 ocr_pool 에서, BetterOCR LLM 병합은 비동기로 실행
+        try:
+            with span("calendar.ocr"):
+                ocr_result = await betterocr.detect_text_async(
+                    ocr_target,
+                    OCR_LANGUAGES,  # language codes (from EasyOCR)
+                    openai={
+                        "model": OCR_LLM_MODEL,
+                    },
+                    timeout=OCR_TIMEOUT,
+                    executor=ocr_pool,
+                    cache=ocr_cache,
+                    chat_model=ocr_chat_model,
+                    engine_pool=engine_pool,
+                    gate=document_gate,
+                    adaptive=OCR_ADAPTIVE_DECODE,
+                    consensus=ocr_consensus,
+                )
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=504, detail=f"ocr stage timed out after {OCR_TIMEOUT}s"
+            )
+        except betterocr.NotADocumentError as e:
+            # 문서 게이트 거절은 서버 오류가 아니라 잘못된 입력
+            raise HTTPException(
+                status_code=400,
+                detail=f"The provided image is not a valid daycare schedule. ({e})",
+            )
         logging.info("OCR End...")
         logging.info(f"\n\nOCR Result:\n{ocr_result}")
 
-        # 임시 파일 삭제
-        if is_s3:
-            os.unlink(temp_file_path)
-            logging.info("Temp File Delete End...")
         if not ocr_result == "Invalid image type":
             # chain을 사용하여 처리
             logging.info("LLM Generate Answer Start...")
-            response = chain.invoke({"ocr_result": ocr_result})
+            try:
+                with span("calendar.chain"):
+                    response = await asyncio.wait_for(
+                        chain.ainvoke({"ocr_result": ocr_result}), LLM_TIMEOUT
+                    )
+            except asyncio.TimeoutError:
+                raise HTTPException(
+                    status_code=504, detail=f"llm stage timed out after {LLM_TIMEOUT}s"
+                )
             logging.info("LLM Generate Answer End...")
             logging.info(f"\n\nLLM Result:\n{response}")
 
@@ -97,5 +259,7 @@ image_path: {image_path}
                 "The provided image is not a valid daycare schedule."
             )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
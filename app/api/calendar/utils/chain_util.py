@@ -1,8 +1,8 @@
 import os
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from app.api.calendar.models import MonthlySchedule
+from app.api.utils.llm_util import llm_provider
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -32,7 +32,5 @@ def setup_chain():
         template=template,
     )
     # LLM 모델 정의
-    model = ChatOpenAI(
-        model_name=llm_model, temperature=0, openai_api_key=openai_api_key
-    )
+    model = llm_provider.chat(llm_model, temperature=0)
     return prompt | model | output_parser
@@ -1,5 +1,7 @@
+import calendar
 import re
-from typing import Dict, List, Union
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple, Union
 
 
 class DateProcessor:
@@ -151,6 +153,279 @@ class DateProcessor:
         return data
 
 
+class TemporalExpressionParser:
+    """
+    한국어 시간 표현(오늘, 어제, 지난주, 9월 3일, 이번 달 ...)을 날짜 범위로 변환하는 클래스입니다.
+    LLM 없이 규칙 기반으로 동작하며, 기준일(today)에 대한 상대 표현을 계산합니다.
+    """
+
+    WEEKDAYS = "월화수목금토일"
+    DAY_OFFSETS = {
+        "어젯밤": -1, "엊저녁": -1, "간밤": -1,
+        "엊그저께": -2, "엊그제": -2, "그저께": -2, "그제": -2,
+        "어저께": -1, "어제": -1, "작일": -1,
+        "오늘": 0, "금일": 0, "당일": 0,
+        "내일": 1, "모레": 2, "글피": 3,
+    }
+    WEEK_OFFSETS = {"지지난": -2, "지난": -1, "저번": -1, "이번": 0, "금": 0, "다음": 1}
+    MONTH_OFFSETS = {"지지난": -2, "지난": -1, "저번": -1, "이번": 0, "이": 0, "다음": 1}
+    YEAR_OFFSETS = {"재작년": -2, "작년": -1, "지난해": -1, "올해": 0, "금년": 0, "내년": 1}
+    # 고유어 수 관형사(한 달, 두 주)와 고유어 날수(사흘, 보름). "일주일"의 "일"도 1로 봅니다.
+    NATIVE_COUNTS = {
+        "일": 1, "한": 1, "두": 2, "세": 3, "네": 4, "다섯": 5, "여섯": 6,
+        "일곱": 7, "여덟": 8, "아홉": 9, "열": 10,
+    }
+    DAY_COUNTS = {
+        "하루": 1, "이틀": 2, "사흘": 3, "나흘": 4, "닷새": 5, "엿새": 6, "이레": 7,
+        "여드레": 8, "아흐레": 9, "열흘": 10, "보름": 15,
+    }
+    UNITS = {"주일": "주", "개월": "달", "해": "년"}
+
+    # 잘못된 날짜를 가리는 유니코드 사용자 정의 영역 문자
+    PLACEHOLDER = 0xE000
+
+    _WEEK = r"(지지난|지난|저번|이번|금|다음)\s*주"
+    _MONTH = r"(지지난|지난|저번|이번|이|다음)\s*달"
+    # 기간: "3일", "2주", "일주일", "한 달", "두 해", "사흘", "보름"
+    _SPAN = (
+        r"(?:(?P<n>\d+|일(?=\s*주일)|한|두|세|네|다섯|여섯|일곱|여덟|아홉|열)\s*"
+        r"(?P<unit>일|주일|주|달|개월|년|해)"
+        r"|(?P<days>하루|이틀|사흘|나흘|닷새|엿새|이레|여드레|아흐레|열흘|보름))"
+    )
+    # 날짜 뒤의 하루 중 때("어제 저녁", "그저께 밤")는 날짜 표현에 포함
+    _TIME_OF_DAY = r"(?:\s*(?:새벽|아침|오전|낮|점심|오후|저녁|밤))?"
+
+    # 파싱하지 못한 시간 표현이 남아 있는지 확인하는 패턴(남아 있으면 LLM 으로 넘김)
+    TEMPORAL_HINT = re.compile(
+        r"\d+\s*(일|주|달|개월|년|월|[-./])|요일|주말|지난|저번|이번|다음\s*(주|달|해)|며칠|언제|그날|전날|다음날|"
+        r"(?:전|후)(?:에|엔|부터|까지|쯤)?(?![가-힣])|밤|저녁|아침|요즘|최근|동안|"
+        r"연휴|명절|추석|설날|방학|생일|크리스마스|어린이날|"
+        r"\b(today|yesterday|tomorrow|week|month|year|ago|last|date)\b",
+        re.IGNORECASE,
+    )
+
+    def __init__(self, today: Optional[date] = None):
+        """
+        TemporalExpressionParser 클래스의 생성자입니다.
+
+        Args:
+            today (Optional[date]): 상대 표현의 기준일. 없으면 오늘 날짜
+        """
+        self.today = today or date.today()
+        # (패턴, 처리 함수) 목록. 긴 표현(복합 표현)부터 먼저 매칭합니다.
+        self.rules = [
+            (r"(\d{4})[-./]\s*(\d{1,2})[-./]\s*(\d{1,2})", self._absolute_date),
+            (r"(?:(\d{4}|\d{2})\s*년\s*)?(\d{1,2})\s*월\s*(\d{1,2})\s*일", self._absolute_date),
+            (r"(?<![\d/])(\d{1,2})/(\d{1,2})(?![\d/])", self._month_day),
+            (r"(지지난|지난|저번|이번|다음)\s*주말", self._week_weekend),
+            (self._WEEK + r"\s*(?:의\s*)?([월화수목금토일])요일", self._week_weekday),
+            (self._WEEK + r"\s*(?:의\s*)?주말", self._week_weekend),
+            (self._MONTH + r"\s*(\d{1,2})\s*일", self._month_day_relative),
+            (r"(?:최근|지난)\s*" + self._SPAN + r"\s*(?:간|동안)?", self._last_n),
+            (self._SPAN + r"\s*(?:간|동안)", self._last_n),
+            (self._SPAN + r"\s*(?P<direction>전|후|뒤)", self._ago),
+            (r"(?:지난|저번)\s*([월화수목금토일])요일", self._last_weekday),
+            (r"([월화수목금토일])요일", self._weekday),
+            (r"주말", self._weekend),
+            (self._WEEK, self._week),
+            (r"(지지난|지난|저번|다음)\s*달|이번\s*달|(?<![가-힣])이\s*달(?!리|려|라|래|콤)", self._month),
+            (r"(?:(\d{4}|\d{2})\s*년\s*)?(\d{1,2})\s*월(?!\s*\d)(?!요)", self._absolute_month),
+            ("|".join(self.YEAR_OFFSETS), self._relative_year),
+            (r"(\d{4})\s*년", self._absolute_year),
+            ("(" + "|".join(self.DAY_OFFSETS) + ")" + self._TIME_OF_DAY, self._relative_day),
+            (r"(?<!\d)(\d{1,2})\s*일", self._day_of_month),
+        ]
+
+    def parse(self, text: str) -> Optional[Tuple[date, date]]:
+        """
+        텍스트의 시간 표현을 하나의 날짜 범위로 변환합니다.
+
+        Args:
+            text (str): 사용자 질문
+
+        Returns:
+            Optional[Tuple[date, date]]: (시작일, 종료일). 시간 표현이 없으면 None
+        """
+        ranges, _ = self.extract(text)
+        if not ranges:
+            return None
+        return min(start for start, _ in ranges), max(end for _, end in ranges)
+
+    def extract(self, text: str) -> Tuple[List[Tuple[date, date]], str]:
+        """
+        텍스트에서 시간 표현을 찾아 날짜 범위로 변환하고, 변환한 부분을 지운 나머지 텍스트를 함께 반환합니다.
+
+        Args:
+            text (str): 사용자 질문
+
+        Returns:
+            Tuple[List[Tuple[date, date]], str]: 날짜 범위 리스트와 남은 텍스트
+        """
+        ranges = []
+        # 잘못된 날짜(2월 30일, 2월의 "지난달 31일")는 뒤 규칙이 일부("2월", "30일")를 다시 해석하지 않도록
+        # 자리표시 문자로 가려 두었다가, 남은 텍스트에 원문 그대로 돌려놓습니다(has_unparsed 로 LLM 에 넘김).
+        invalid = []
+        for pattern, handler in self.rules:
+            def replace(match: re.Match) -> str:
+                try:
+                    result = handler(match)
+                except ValueError:
+                    invalid.append(match.group(0))
+                    return chr(self.PLACEHOLDER + len(invalid) - 1)
+                if result is None:
+                    return match.group(0)
+                ranges.append(result)
+                return " "
+
+            text = re.sub(pattern, replace, text)
+        for i, original in enumerate(invalid):
+            text = text.replace(chr(self.PLACEHOLDER + i), original)
+        return ranges, text
+
+    def has_unparsed(self, rest: str) -> bool:
+        """extract 후 남은 텍스트에 해석하지 못한 시간 표현이 있는지 확인합니다."""
+        return self.TEMPORAL_HINT.search(rest) is not None
+
+    # ---- 날짜 계산 ----
+
+    def _past(self, d: date, years: int = 1) -> date:
+        # 연도가 생략된 날짜가 미래면 작년 날짜로 봅니다(일기는 지난 기록을 검색).
+        return d.replace(year=d.year - years) if d > self.today else d
+
+    @staticmethod
+    def _add_months(year: int, month: int, delta: int) -> Tuple[int, int]:
+        index = year * 12 + month - 1 + delta
+        return index // 12, index % 12 + 1
+
+    @staticmethod
+    def _month_range(year: int, month: int) -> Tuple[date, date]:
+        return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+    def _week_start(self, weeks: int) -> date:
+        return self.today - timedelta(days=self.today.weekday()) + timedelta(weeks=weeks)
+
+    @staticmethod
+    def _full_year(year: str) -> int:
+        return int(year) + 2000 if len(year) == 2 else int(year)
+
+    # ---- 규칙별 처리 함수 ----
+
+    def _absolute_date(self, match: re.Match) -> Tuple[date, date]:
+        year, month, day = match.groups()
+        if year:
+            d = date(self._full_year(year), int(month), int(day))
+        else:
+            d = self._past(date(self.today.year, int(month), int(day)))
+        return d, d
+
+    def _month_day(self, match: re.Match) -> Tuple[date, date]:
+        d = self._past(date(self.today.year, int(match.group(1)), int(match.group(2))))
+        return d, d
+
+    def _week_weekday(self, match: re.Match) -> Tuple[date, date]:
+        start = self._week_start(self.WEEK_OFFSETS[match.group(1)])
+        d = start + timedelta(days=self.WEEKDAYS.index(match.group(2)))
+        return d, d
+
+    def _week_weekend(self, match: re.Match) -> Tuple[date, date]:
+        start = self._week_start(self.WEEK_OFFSETS[match.group(1)])
+        return start + timedelta(days=5), start + timedelta(days=6)
+
+    def _month_day_relative(self, match: re.Match) -> Tuple[date, date]:
+        year, month = self._add_months(self.today.year, self.today.month, self.MONTH_OFFSETS[match.group(1)])
+        d = date(year, month, int(match.group(2)))
+        return d, d
+
+    def _span(self, match: re.Match) -> Tuple[int, str]:
+        """_SPAN 매치를 (개수, 단위: 일/주/달/년)로 변환합니다."""
+        if match.group("days"):
+            return self.DAY_COUNTS[match.group("days")], "일"
+        n = match.group("n")
+        n = int(n) if n.isdigit() else self.NATIVE_COUNTS[n]
+        unit = match.group("unit")
+        return n, self.UNITS.get(unit, unit)
+
+    def _last_n(self, match: re.Match) -> Tuple[date, date]:
+        n, unit = self._span(match)
+        if unit == "일":
+            start = self.today - timedelta(days=n - 1)
+        elif unit == "주":
+            start = self.today - timedelta(weeks=n) + timedelta(days=1)
+        else:
+            months = n * 12 if unit == "년" else n
+            year, month = self._add_months(self.today.year, self.today.month, -months)
+            day = min(self.today.day, calendar.monthrange(year, month)[1])
+            start = date(year, month, day) + timedelta(days=1)
+        return start, self.today
+
+    def _ago(self, match: re.Match) -> Tuple[date, date]:
+        n, unit = self._span(match)
+        sign = -1 if match.group("direction") == "전" else 1
+        if unit == "일":
+            d = self.today + timedelta(days=sign * n)
+            return d, d
+        if unit == "주":
+            start = self._week_start(sign * n)
+            return start, start + timedelta(days=6)
+        if unit == "년":
+            year = self.today.year + sign * n
+            return date(year, 1, 1), date(year, 12, 31)
+        return self._month_range(*self._add_months(self.today.year, self.today.month, sign * n))
+
+    def _weekday(self, match: re.Match) -> Tuple[date, date]:
+        # 주 표현 없이 요일만 있으면 오늘 이전의 가장 가까운 해당 요일
+        days_back = (self.today.weekday() - self.WEEKDAYS.index(match.group(1))) % 7
+        d = self.today - timedelta(days=days_back)
+        return d, d
+
+    def _last_weekday(self, match: re.Match) -> Tuple[date, date]:
+        # "지난 금요일": 오늘을 제외한 가장 최근의 해당 요일
+        days_back = (self.today.weekday() - self.WEEKDAYS.index(match.group(1))) % 7 or 7
+        d = self.today - timedelta(days=days_back)
+        return d, d
+
+    def _weekend(self, match: re.Match) -> Tuple[date, date]:
+        # 주말 중이면 이번 주말, 아니면 지난 주말
+        start = self._week_start(0 if self.today.weekday() >= 5 else -1)
+        return start + timedelta(days=5), start + timedelta(days=6)
+
+    def _week(self, match: re.Match) -> Tuple[date, date]:
+        start = self._week_start(self.WEEK_OFFSETS[match.group(1)])
+        return start, start + timedelta(days=6)
+
+    def _month(self, match: re.Match) -> Tuple[date, date]:
+        offset = self.MONTH_OFFSETS[match.group(1)] if match.group(1) else 0
+        return self._month_range(*self._add_months(self.today.year, self.today.month, offset))
+
+    def _absolute_month(self, match: re.Match) -> Tuple[date, date]:
+        year, month = match.group(1), int(match.group(2))
+        if year:
+            return self._month_range(self._full_year(year), month)
+        year = self.today.year if month <= self.today.month else self.today.year - 1
+        return self._month_range(year, month)
+
+    def _relative_year(self, match: re.Match) -> Tuple[date, date]:
+        year = self.today.year + self.YEAR_OFFSETS[match.group(0)]
+        return date(year, 1, 1), date(year, 12, 31)
+
+    def _absolute_year(self, match: re.Match) -> Tuple[date, date]:
+        year = int(match.group(1))
+        return date(year, 1, 1), date(year, 12, 31)
+
+    def _relative_day(self, match: re.Match) -> Tuple[date, date]:
+        d = self.today + timedelta(days=self.DAY_OFFSETS[match.group(1)])
+        return d, d
+
+    def _day_of_month(self, match: re.Match) -> Tuple[date, date]:
+        # 월 없이 일만 있으면 이번 달, 미래면 지난달의 해당 일
+        day = int(match.group(1))
+        d = date(self.today.year, self.today.month, day) if day <= self.today.day else None
+        if d is None:
+            year, month = self._add_months(self.today.year, self.today.month, -1)
+            d = date(year, month, day)
+        return d, d
+
+
 # 사용 예시
 if __name__ == "__main__":
     # 텍스트 처리 예시
@@ -0,0 +1,142 @@
+# 블로킹 작업(S3, OCR)을 이벤트 루프 밖에서 실행하기 위한 워커 풀
+import asyncio
+import functools
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import contextmanager
+from threading import Lock
+
+from fastapi import HTTPException
+
+
+class WorkerPool(Executor):
+    """
+    블로킹 함수를 제한된 스레드 풀에서 실행하는 클래스입니다.
+    실행 중 + 대기 중 작업 수가 max_workers + max_queue 를 넘으면 503 을 반환합니다.
+    max_queue=None 이면 작업 단위로 거절하지 않습니다(요청 단위 제한은 AdmissionLimit 사용).
+    Executor 를 상속하므로 loop.run_in_executor 에 그대로 넘길 수 있습니다.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int = None):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+        self._pending = 0
+        self._lock = Lock()
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._pending -= 1
+
+    def has_capacity(self) -> bool:
+        if self.max_queue is None:
+            return True
+        return self._pending < self.max_workers + self.max_queue
+
+    def check_capacity(self):
+        """대기열이 가득 찼으면 요청을 바로 거절합니다."""
+        if not self.has_capacity():
+            raise HTTPException(
+                status_code=503,
+                detail=f"{self.name} queue is full, please retry later",
+                headers={"Retry-After": "5"},
+            )
+
+    def submit(self, fn, /, *args, **kwargs):
+        """
+        대기열에 여유가 있으면 fn 을 풀에 제출합니다.
+
+        타임아웃이 나도 이미 실행 중인 스레드는 중단되지 않으므로,
+        해당 작업이 실제로 끝날 때까지 슬롯을 점유한 것으로 계산합니다.
+        """
+        with self._lock:
+            self.check_capacity()
+            self._pending += 1
+
+        future = self._executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, func, *args, timeout: float = None, **kwargs):
+        """func 를 풀에서 실행하고 결과를 기다립니다."""
+        future = self.submit(functools.partial(func, *args, **kwargs))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=504, detail=f"{self.name} stage timed out after {timeout}s"
+            )
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+        }
+
+
+class AdmissionLimit:
+    """
+    요청 단위로 동시에 처리하는 수를 제한하는 클래스입니다.
+    한 요청이 풀에 여러 작업(디코딩, 엔진별 OCR, 병합 ...)을 제출하더라도 한도는 요청 수로 계산하므로,
+    이미 받아들인 요청이 처리 도중 503 으로 끊기지 않고 거절은 작업을 시작하기 전에만 발생합니다.
+    """
+
+    def __init__(self, name: str, max_requests: int):
+        self.name = name
+        self.max_requests = max_requests
+        self.rejected = 0
+        self._active = 0
+        self._lock = Lock()
+
+    @contextmanager
+    def admit(self):
+        """한도 안이면 요청 처리 동안 슬롯을 점유하고, 가득 찼으면 503 을 반환합니다."""
+        with self._lock:
+            if self._active >= self.max_requests:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"{self.name} is busy, please retry later",
+                    headers={"Retry-After": "5"},
+                )
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "max_requests": self.max_requests,
+            "active": self._active,
+            "rejected": self.rejected,
+        }
+
+
+def get_timeout(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+# OCR 은 CPU 를 많이 쓰므로 코어 수 기준으로 제한, S3 다운로드는 I/O 대기 위주
+# OCR 작업 풀은 요청 하나가 여러 작업을 제출하므로 작업 단위로 거절하지 않고,
+# /process_image 요청 수를 ocr_admission(OCR_MAX_REQUESTS) 으로 제한
+ocr_pool = WorkerPool(
+    "ocr",
+    max_workers=int(os.getenv("OCR_WORKERS", max(1, (os.cpu_count() or 2) // 2))),
+)
+ocr_admission = AdmissionLimit("ocr", max_requests=int(os.getenv("OCR_MAX_REQUESTS", 8)))
+io_pool = WorkerPool(
+    "s3",
+    max_workers=int(os.getenv("IO_WORKERS", 8)),
+    max_queue=int(os.getenv("IO_MAX_QUEUE", 32)),
+)
@@ -1,4 +1,5 @@
 # s3 연동
+import io
 import boto3
 import tempfile
 from botocore.exceptions import ClientError
@@ -18,6 +19,13 @@ def set_s3_client():
     return s3_client
 
 
+# s3 객체를 임시 파일 없이 메모리 버퍼로 다운로드
+def download_to_memory(s3_client, bucket, key) -> bytes:
+    buffer = io.BytesIO()
+    s3_client.download_fileobj(bucket, key, buffer)
+    return buffer.getvalue()
+
+
 # s3 파일 이름 파싱
 def parse_s3_url(url):
     # URL 파싱
@@ -1,22 +1,6 @@
-from pymilvus import (
-    Collection,
-    connections,
-    utility,
-)
-from .utils import init_db
-import os
+from app.api.utils.vector_store import get_vector_store
 
 
-# Get the MILVUS_HOST from environment variables
-MILVUS_HOST = os.getenv("MILVUS_HOST")
-MILVUS_PORT = os.getenv("MILVUS_PORT")
-collection_name = os.getenv("COLLECTION_NAME")
-
-connections.connect("default", host=MILVUS_HOST, port=str(MILVUS_PORT))
-# Milvus 컬렉션 로드
-
-if not utility.has_collection(collection_name):
-    init_db()
-else:
-    collection = Collection(collection_name)
-collection.load()
+# 벡터 저장소 (VECTOR_STORE 환경변수로 milvus / numpy 선택)
+# milvus 면 MILVUS_HOST, MILVUS_PORT, COLLECTION_NAME 으로 연결하고 컬렉션이 없으면 생성 후 로드
+vector_store = get_vector_store()
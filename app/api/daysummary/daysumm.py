@@ -1,5 +1,9 @@
+import asyncio
+import json
 import logging
+import os
 import time
+from typing import NamedTuple, Union
 
 from langchain.agents.format_scratchpad.log import format_log_to_str
 from langchain.agents.output_parsers import ReActSingleInputOutputParser
@@ -12,6 +16,9 @@ from .tools import (
     write_diary_assistant,
     save_diary_assistant,
     except_situation_assistant,
+    embedding_client,
+    embedding_model,
+    astream_final_tool,
 )
 from .utils.agent_util import (
      find_tool, 
@@ -20,7 +27,12 @@ from .utils.agent_util import (
      handle_exception
      )
 from .models import Query, AIChatHistory
+from .utils.filter_util import filter_builder
+from .utils.intent_router import IntentRouter, RouteMetrics
+from app.api.utils.embedding_cache import cached_embeddings, embedding_cache
+from app.api.utils.trace_util import span
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 
 
 # 로깅 설정
@@ -42,25 +54,114 @@ agent = setup_agent(tools)
 output_parser = ReActSingleInputOutputParser()
 
 # 사용자 채팅 기록 관리 클래스 정의
-chat_history_manager = AIChatHistory()
+# (세션별 턴/토큰 윈도우, idle TTL, 전체 세션 수 제한, CHAT_HISTORY_PATH 지정 시 worker 간 공유되는 SQLite 저장소)
+chat_history_manager = AIChatHistory(
+    max_turns=int(os.getenv("CHAT_HISTORY_MAX_TURNS", 10)),
+    max_tokens=int(os.getenv("CHAT_HISTORY_MAX_TOKENS", 2000)),
+    idle_ttl=float(os.getenv("CHAT_HISTORY_IDLE_TTL", 3600)),
+    max_sessions=int(os.getenv("CHAT_HISTORY_MAX_SESSIONS", 10000)),
+    path=os.getenv("CHAT_HISTORY_PATH"),
+)
+
+# 의도 사전 분류기: 확실한 의도는 cls_intent_assistant 단계를 생략한 ReAct 로 처리 (INTENT_ROUTER=true 로 활성화)
+# INTENT_DIRECT=true 이면 SHARING/EXCEPT 는 ReAct 에이전트 없이 바로 도구 호출
+# 임계값(INTENT_MIN_SCORE/MARGIN)을 라벨된 질문으로 보정하기 전까지는 둘 다 기본 꺼짐
+intent_router = None
+INTENT_DIRECT = os.getenv("INTENT_DIRECT", "false").lower() == "true"
+if os.getenv("INTENT_ROUTER", "false").lower() == "true":
+    intent_router = IntentRouter(
+        embed=lambda texts: cached_embeddings(embedding_cache, embedding_client, texts, embedding_model),
+        min_score=float(os.getenv("INTENT_MIN_SCORE", 0.45)),
+        min_margin=float(os.getenv("INTENT_MIN_MARGIN", 0.05)),
+        examples_path=os.getenv("INTENT_EXAMPLES_PATH"),
+        max_recorded=int(os.getenv("INTENT_EXAMPLES_MAX", 5000)),
+    )
+route_metrics = RouteMetrics()
+stream_metrics = RouteMetrics()
 
 router = APIRouter()
 
-# 채팅 기록 초기화 로직 추가.(reset_history)
-@router.post("/process_query")
-async def process_user_query(query: Query, reset_history: bool = False):
-    start_time = time.time()  # 시작 시간 기록
-    # 로깅: 쿼리 처리 시작
-    logger.info(f"Processing query: {query}")
 
-    # 쿼리에서 필요한 정보 추출
-    input = query.text
+# 검색 필터 생성 통계 (규칙 기반 / LLM fallback 비율)
+@router.get("/process_query/filter_stats")
+def retrieval_filter_stats():
+    return filter_builder.stats()
+
+
+# 채팅 기록 저장소 상태 (세션 수, 메시지 수, 삭제된 세션 수)
+@router.get("/process_query/history_stats")
+def chat_history_stats():
+    return chat_history_manager.stats()
+
+
+# 처리 경로별 지연시간 (direct: 도구 바로 호출, react_seeded: 의도 분류 단계 생략한 ReAct, react: 기존 ReAct)
+@router.get("/process_query/route_stats")
+def route_stats():
+    return route_metrics.stats()
+
+
+# 스트리밍 응답의 첫 토큰까지 걸린 시간(ttft)과 전체 시간(total)
+@router.get("/process_query/stream_stats")
+def stream_stats():
+    return stream_metrics.stats()
+
+
+# 출력이 곧 최종 답변인 도구 호출 (스트리밍에서는 도구 대신 체인을 직접 stream)
+class FinalToolCall(NamedTuple):
+    tool_name: str
+    tool_input: str
+
+
+FINAL_TOOLS = ["except_situation_assistant", "sharing_assistant", "write_diary_assistant"]
+UNCLEAR_INPUT_THOUGHT = "I see that your input is a bit unclear, and I'm not sure how to proceed. Would you like to share more about your day or perhaps ask a specific question? Let me know how I can assist you!"
+
+# 도구 출력이 곧 최종 답변인 의도는 에이전트 없이 바로 도구 호출
+# DIARY_WRITE 는 대화 기록이 부족하면 추가 질문/retriever_assistant 를 거쳐야 하므로(프롬프트 규칙) ReAct 에서 처리
+DIRECT_INTENTS = {
+    "SHARING": "sharing_assistant",
+    "EXCEPT": "except_situation_assistant",
+}
+
+
+def direct_tool_call(intent: str, input: str, chat_history: str) -> FinalToolCall:
+    tool_name = DIRECT_INTENTS[intent]
+    if tool_name == "sharing_assistant":
+        tool_input = {"query": input, "chat_history": chat_history}
+    else:
+        tool_input = {"query": input, "thought": "The user's query is unclear or unrelated to writing a diary about the day."}
+    return FinalToolCall(tool_name, json.dumps(tool_input, ensure_ascii=False))
+
+
+def except_tool_call(input: str, thought: str) -> FinalToolCall:
+    return FinalToolCall("except_situation_assistant", json.dumps({"query": input, "thought": thought}))
+
+
+async def run_final_tool(call: FinalToolCall) -> AgentFinish:
+    with span(f"daysummary.tool.{call.tool_name}"):
+        observation = await find_tool(tools, call.tool_name).ainvoke(call.tool_input)
+    return AgentFinish(
+        return_values={"output": observation},
+        log=f"{call.tool_name} tool returned {observation}, ending the agent execution.",
+    )
+
+
+# 의도를 이미 알고 있으면 cls_intent_assistant 단계를 실행한 것처럼 scratchpad 에 넣음
+def seed_intent_step(input: str, intent: str):
+    tool_input = json.dumps({"query": input}, ensure_ascii=False)
+    action = AgentAction(
+        tool="cls_intent_assistant",
+        tool_input=tool_input,
+        log=f"Thought: I need to classify the intent of the query.\nAction: cls_intent_assistant\nAction Input: {tool_input}",
+    )
+    return action, intent
+
+
+# 쿼리 공통 전처리: 세션 생성, 기록 초기화, 사용자 입력 저장
+def prepare_query(query: Query, reset_history: bool):
     user_id = query.user_id
     baby_id = query.baby_id
     # 세션 ID가 없으면 새로 생성
     session_id = chat_history_manager.get_or_create_session(user_id, query.session_id)
-    # 출력 형식 설정
-    output_format = {"user_id": user_id, "baby_id": baby_id, "session_id": session_id}
 
     # 채팅 기록 초기화 로직
     if reset_history:
@@ -68,73 +169,116 @@ async def process_user_query(query: Query, reset_history: bool = False):
         logger.info(f"Chat history reset for user {user_id}, baby {baby_id}")
 
     # 사용자 입력 채팅 기록에 추가
-    chat_history_manager.add_message(user_id, session_id, baby_id, input)
+    chat_history_manager.add_message(user_id, session_id, baby_id, query.text)
+    return session_id
+
+
+# 의도 사전 분류 (임베딩 1회). 애매하면 기존 ReAct 루프 사용
+# 반환: (경로, 바로 호출할 도구 또는 None, 에이전트 scratchpad 초기값)
+async def pre_route(input: str, chat_history: str):
+    intent = None
+    if intent_router is not None:
+        with span("daysummary.pre_route"):
+            intent, score, margin = await asyncio.to_thread(intent_router.classify, input)
+        logger.info(f"Pre-routed intent: {intent} (score: {score:.3f}, margin: {margin:.3f})")
+    if INTENT_DIRECT and intent in DIRECT_INTENTS:
+        return "direct", direct_tool_call(intent, input, chat_history), []
+    if intent is not None:
+        return "react_seeded", None, [seed_intent_step(input, intent)]
+    return "react", None, []
 
-    # 에이전트 실행
-    intermediate_steps = []
-    agent_step = None
 
+# ReAct 에이전트 루프. defer_final 이면 최종 답변 도구를 실행하지 않고 FinalToolCall 로 반환
+async def run_agent(
+    input: str,
+    user_id: int,
+    baby_id: int,
+    chat_history: str,
+    intermediate_steps: list,
+    defer_final: bool = False,
+) -> Union[AgentFinish, FinalToolCall]:
+    async def finish_with_exception(thought: str):
+        if defer_final:
+            return except_tool_call(input, thought)
+        return await handle_exception(input, thought, tools)
+
+    agent_step = None
     while not isinstance(agent_step, AgentFinish):
         # 에이전트 호출
-        chat_history = chat_history_manager.get_full_history(user_id, session_id, baby_id)
-        agent_step = agent.invoke(
-            {
-                "input": f"user_id: {user_id}, baby_id: {baby_id}, input: {input}",
-                "agent_scratchpad": format_log_to_str(intermediate_steps),
-                "chat_history": str(chat_history),
-            }
-        )
+        with span("daysummary.agent_step"):
+            agent_step = await agent.ainvoke(
+                {
+                    "input": f"user_id: {user_id}, baby_id: {baby_id}, input: {input}",
+                    "agent_scratchpad": format_log_to_str(intermediate_steps),
+                    "chat_history": str(chat_history),
+                }
+            )
         if not valid_output_format(agent_step.content):
-                agent_step = await handle_exception(
-                    input,
-                    "I see that your input is a bit unclear, and I'm not sure how to proceed. Would you like to share more about your day or perhaps ask a specific question? Let me know how I can assist you!",
-                    tools
-                )
-        else:
-            # output parser로 파싱이 가능한 경우.
-            # 출력 결과 'Action' or 'Final Answer' 가 있는 경우 처리.
-            agent_step = output_parser.parse(agent_step.content)
+            return await finish_with_exception(UNCLEAR_INPUT_THOUGHT)
+        # output parser로 파싱이 가능한 경우.
+        # 출력 결과 'Action' or 'Final Answer' 가 있는 경우 처리.
+        agent_step = output_parser.parse(agent_step.content)
 
         # 추가 행동이 필요한 경우
         if isinstance(agent_step, AgentAction):
             # 도구 이름, 입력값 추출 및 도구 실행.
             tool_name = agent_step.tool
             tool_input = agent_step.tool_input
+            # 특정 도구들의 경우 출력한 답변을 최종 답변으로 바로 사용. 다음 행동이 필요 없음.
+            if tool_name in FINAL_TOOLS:
+                call = FinalToolCall(tool_name, tool_input)
+                return call if defer_final else await run_final_tool(call)
+
             tool_to_use = find_tool(tools, tool_name)
-            observation = tool_to_use.invoke(tool_input)
+            with span(f"daysummary.tool.{tool_name}"):
+                observation = await tool_to_use.ainvoke(tool_input)
             logger.info(f"=== Tool Response!!=== \nTool Response: {observation}")
+            # LLM 의도 분류 결과는 사전 분류기 예시로 기록
+            if tool_name == "cls_intent_assistant" and intent_router is not None:
+                intent_router.record(input, str(observation))
 
             # RAG 결과 없을 경우 except_situation_assistant 사용
             if tool_name == "retriever_assistant" and observation == 'No results found':
-                    agent_step = await handle_exception(
-                        input,
-                        "retriever_assistant found no results, using except_situation_assistant",
-                        tools
-                    )
-            # 사용자 쿼리가 모호하거나 관련이 없는 경우 처리
-            elif observation == 'EXCEPT':
-                agent_step = await handle_exception(
-                    input,
-                    "I see that your input is a bit unclear, and I'm not sure how to proceed. Would you like to share more about your day or perhaps ask a specific question? Let me know how I can assist you!",
-                    tools
-                )
-            # 특정 도구들의 경우 출력한 답변을 최종 답변으로 바로 사용. 다음 행동이 필요 없음.
-            elif tool_name in ['except_situation_assistant', "sharing_assistant", "write_diary_assistant"]:
-                agent_step = AgentFinish(
-                    return_values={"output": observation},
-                    log=f"{tool_name} tool returned {observation}, ending the agent execution.",
+                return await finish_with_exception(
+                    "retriever_assistant found no results, using except_situation_assistant"
                 )
+            # 사용자 쿼리가 모호하거나 관련이 없는 경우 처리
+            if observation == 'EXCEPT':
+                return await finish_with_exception(UNCLEAR_INPUT_THOUGHT)
             # 중간 단계 저장
             intermediate_steps.append((agent_step, str(observation)))
-        # 최종 답변인 경우
-        if isinstance(agent_step, AgentFinish) or agent_step:
-            result = agent_step
+    return agent_step
+
+
+# 채팅 기록 초기화 로직 추가.(reset_history)
+@router.post("/process_query")
+async def process_user_query(query: Query, reset_history: bool = False):
+    start_time = time.time()  # 시작 시간 기록
+    # 로깅: 쿼리 처리 시작
+    logger.info(f"Processing query: {query}")
+
+    # 쿼리에서 필요한 정보 추출
+    input = query.text
+    user_id = query.user_id
+    baby_id = query.baby_id
+    session_id = prepare_query(query, reset_history)
+    # 출력 형식 설정
+    output_format = {"user_id": user_id, "baby_id": baby_id, "session_id": session_id}
+
+    # 대화 기록은 요청 중에 바뀌지 않으므로 한 번만 조회
+    chat_history = chat_history_manager.get_full_history(user_id, session_id, baby_id)
+
+    # 에이전트 실행
+    route, call, intermediate_steps = await pre_route(input, chat_history)
+    if call is not None:
+        result = await run_final_tool(call)
+    else:
+        result = await run_agent(input, user_id, baby_id, chat_history, intermediate_steps)
 
     # 결과 처리
-    if output_format.get("response") is None:
-        print("=== Agent Finish!!===")
-        logger.info(f"=== Agent Finish!!=== \nAgent Response: {result}")
-        output_format.update({"response": result.return_values["output"]})
+    print("=== Agent Finish!!===")
+    logger.info(f"=== Agent Finish!!=== \nAgent Response: {result}")
+    output_format.update({"response": result.return_values["output"]})
 
     # 챗봇 답변 저장
     chat_history_manager.add_message(user_id, session_id, baby_id, output_format['response'], is_user=False)
@@ -143,9 +287,83 @@ async def process_user_query(query: Query, reset_history: bool = False):
     )
     end_time = time.time()  # 종료 시간 기록
     processing_time = end_time - start_time
-    logger.info(f"Query processing time: {processing_time:.2f} seconds")
+    route_metrics.observe(route, processing_time)
+    logger.info(f"Query processing time ({route}): {processing_time:.2f} seconds")
     return output_format
 
     # 예외 처리
     # except Exception as e:
     #     raise HTTPException(status_code=500, detail=str(e))
+
+
+def sse_event(data: dict, event: str = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+# /process_query 의 스트리밍 버전 (Server-Sent Events)
+# 이벤트 순서: {"type": "session", ...} -> {"type": "token", "content": str} ... -> {"type": "done", "response": str}
+# 최종 답변 도구의 LLM 출력 토큰을 생성되는 대로 전송하고, 끝나면 전체 답변을 채팅 기록에 저장
+# 처리 중 예외가 나면 event: error 프레임({"type": "error", "detail": str})을 보내고 스트림을 닫음
+@router.post("/process_query/stream")
+async def process_user_query_stream(query: Query, reset_history: bool = False):
+    start_time = time.time()
+    logger.info(f"Processing streaming query: {query}")
+
+    input = query.text
+    user_id = query.user_id
+    baby_id = query.baby_id
+    session_id = prepare_query(query, reset_history)
+    chat_history = chat_history_manager.get_full_history(user_id, session_id, baby_id)
+
+    async def event_stream():
+        yield sse_event({"type": "session", "user_id": user_id, "baby_id": baby_id, "session_id": session_id})
+
+        try:
+            route, call, intermediate_steps = await pre_route(input, chat_history)
+            if call is None:
+                result = await run_agent(
+                    input, user_id, baby_id, chat_history, intermediate_steps, defer_final=True
+                )
+                call = result if isinstance(result, FinalToolCall) else None
+
+            chunks = []
+            first_token_time = None
+            if call is not None:
+                with span(f"daysummary.tool.{call.tool_name}"):
+                    async for chunk in astream_final_tool(call.tool_name, call.tool_input):
+                        if not chunk:
+                            continue
+                        if first_token_time is None:
+                            first_token_time = time.time()
+                        chunks.append(chunk)
+                        yield sse_event({"type": "token", "content": chunk})
+            else:
+                # 에이전트가 직접 Final Answer 를 낸 경우(검색 결과 기반 답변)는 한 번에 전송
+                first_token_time = time.time()
+                chunks.append(result.return_values["output"])
+                yield sse_event({"type": "token", "content": chunks[0]})
+
+            response = "".join(chunks)
+            chat_history_manager.add_message(user_id, session_id, baby_id, response, is_user=False)
+            yield sse_event({"type": "done", "response": response})
+
+            end_time = time.time()
+            route_metrics.observe(route, end_time - start_time)
+            stream_metrics.observe("total", end_time - start_time)
+            if first_token_time is not None:
+                stream_metrics.observe("ttft", first_token_time - start_time)
+            logger.info(
+                f"Streaming query processing time ({route}): {end_time - start_time:.2f} seconds, "
+                f"first token: {(first_token_time or end_time) - start_time:.2f} seconds"
+            )
+        except Exception as e:
+            logger.exception("Streaming query failed")
+            stream_metrics.observe("error", time.time() - start_time)
+            yield sse_event({"type": "error", "detail": str(e)}, event="error")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,6 +1,11 @@
+from collections import OrderedDict
 from pydantic import BaseModel
-from typing import Dict, List
+from threading import Lock
+from typing import List, Tuple
 from uuid import uuid4
+import os
+import sqlite3
+import time
 
 # 사용자 쿼리를 처리하는 클래스
 class Query(BaseModel):
@@ -10,9 +15,53 @@ class Query(BaseModel):
     text: str
 
 #  AI 채팅 시스템의 대화 기록을 관리하는 클래스
+#  - 세션별로 최근 max_turns 턴(사용자+AI 메시지 2개), max_tokens 토큰까지만 유지
+#  - idle_ttl 초 동안 사용하지 않은 세션은 삭제, 세션 수가 max_sessions 를 넘으면 가장 오래 안 쓴 세션부터 삭제
+#  - path 를 주면 SQLite 파일에 저장해서 여러 uvicorn worker 가 같은 기록을 공유
 class AIChatHistory:
-    def __init__(self):
-        self.sessions: Dict[str, Dict[str, List[str]]] = {}
+    def __init__(
+        self,
+        max_turns: int = 10,
+        max_tokens: int = 2000,
+        idle_ttl: float = 3600.0,
+        max_sessions: int = 10000,
+        path: str = None,
+        sweep_every: int = 100,
+    ):
+        self.max_messages = max_turns * 2
+        self.max_tokens = max_tokens
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self.sweep_every = sweep_every
+        self.evictions = 0
+
+        self._writes = 0
+        self._lock = Lock()
+        # (session_key, baby_id) -> {"messages": [(메시지, 토큰 수), ...], "last_access": time}
+        self.sessions: "OrderedDict[Tuple[str, str], dict]" = OrderedDict()
+        self._encoding = _load_encoding()
+
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS chat_sessions (
+                    key TEXT PRIMARY KEY,
+                    last_access REAL NOT NULL
+                )"""
+            )
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS chat_messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    key TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    tokens INTEGER NOT NULL
+                )"""
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS chat_messages_key ON chat_messages (key, id)")
+            self._db.commit()
 
     # 사용자 ID와 세션 ID를 조합하여 고유한 세션 키를 생성
     def get_session_key(self, user_id: str, session_id: str) -> str:
@@ -23,29 +72,173 @@ class AIChatHistory:
         if not session_id:
             session_id = str(uuid4())
         return session_id
-    
-    # 특정 사용자, 세션, 아기에 대한 대화 기록 반환
+
+    def count_tokens(self, message: str) -> int:
+        if self._encoding is None:
+            return len(message)  # 한국어는 대략 글자당 1토큰 이상
+        return len(self._encoding.encode(message))
+
+    # 토큰 제한 안에 들어가는 최근 메시지만 남김 (마지막 메시지는 항상 유지)
+    def _trim(self, messages: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+        messages = messages[-self.max_messages:]
+        total = sum(tokens for _, tokens in messages)
+        while len(messages) > 1 and total > self.max_tokens:
+            total -= messages[0][1]
+            messages = messages[1:]
+        return messages
+
+    # 특정 사용자, 세션, 아기에 대한 대화 기록 반환 (윈도우 안의 최근 메시지)
     def get_chat_history(self, user_id: str, session_id: str, baby_id: str) -> List[str]:
-        session_key = self.get_session_key(user_id, session_id)
-        return self.sessions.setdefault(session_key, {}).get(baby_id, [])
-    
+        key = (self.get_session_key(user_id, session_id), str(baby_id))
+        now = time.time()
+        with self._lock:
+            if self._db is not None:
+                return [message for message, _ in self._db_get(key, now)]
+            entry = self.sessions.get(key)
+            if entry is None:
+                return []
+            if now - entry["last_access"] > self.idle_ttl:
+                del self.sessions[key]
+                self.evictions += 1
+                return []
+            entry["last_access"] = now
+            self.sessions.move_to_end(key)
+            return [message for message, _ in entry["messages"]]
+
     # 새로운 메시지를 대화 기록에 추가. 사용자와 AI의 메시지를 구분.(is_user)
     def add_message(self, user_id: str, session_id: str, baby_id: str, message: str, is_user: bool = True):
-        session_key = self.get_session_key(user_id, session_id)
-        if session_key not in self.sessions:
-            self.sessions[session_key] = {}
-        if baby_id not in self.sessions[session_key]:
-            self.sessions[session_key][baby_id] = []
-        
+        key = (self.get_session_key(user_id, session_id), str(baby_id))
         prefix = "User: " if is_user else "Bot: "
-        self.sessions[session_key][baby_id].append(f"{prefix}{message}")
+        message = f"{prefix}{message}"
+        tokens = self.count_tokens(message)
+        now = time.time()
+        with self._lock:
+            self._writes += 1
+            if self._db is not None:
+                self._db_add(key, message, tokens, now)
+                return
+
+            entry = self.sessions.get(key)
+            if entry is None or now - entry["last_access"] > self.idle_ttl:
+                entry = {"messages": [], "last_access": now}
+                self.sessions[key] = entry
+            entry["messages"] = self._trim(entry["messages"] + [(message, tokens)])
+            entry["last_access"] = now
+            self.sessions.move_to_end(key)
+            self._evict(now)
 
     #  특정 대화 기록을 초기화
     def reset_history(self, user_id: str, session_id: str, baby_id: str):
-        session_key = self.get_session_key(user_id, session_id)
-        if session_key in self.sessions and baby_id in self.sessions[session_key]:
-            self.sessions[session_key][baby_id] = []
+        key = (self.get_session_key(user_id, session_id), str(baby_id))
+        with self._lock:
+            if self._db is not None:
+                self._db.execute("DELETE FROM chat_messages WHERE key = ?", (self._db_key(key),))
+                self._db.execute("DELETE FROM chat_sessions WHERE key = ?", (self._db_key(key),))
+                self._db.commit()
+            else:
+                self.sessions.pop(key, None)
 
     # 전체 대화 기록을 문자열로 반환
     def get_full_history(self, user_id: str, session_id: str, baby_id: str) -> str:
-        return str(self.get_chat_history(user_id, session_id, baby_id))
\ No newline at end of file
+        return str(self.get_chat_history(user_id, session_id, baby_id))
+
+    # 만료된 세션과 max_sessions 초과분을 LRU 순서(OrderedDict 앞쪽)로 삭제
+    def _evict(self, now: float):
+        while self.sessions:
+            key, entry = next(iter(self.sessions.items()))
+            if len(self.sessions) <= self.max_sessions and now - entry["last_access"] <= self.idle_ttl:
+                break
+            del self.sessions[key]
+            self.evictions += 1
+
+    # ---- SQLite 공유 저장소 ----
+
+    @staticmethod
+    def _db_key(key: Tuple[str, str]) -> str:
+        return f"{key[0]}:{key[1]}"
+
+    def _db_get(self, key, now) -> List[Tuple[str, int]]:
+        db_key = self._db_key(key)
+        row = self._db.execute(
+            "SELECT last_access FROM chat_sessions WHERE key = ?", (db_key,)
+        ).fetchone()
+        if row is None:
+            return []
+        if now - row[0] > self.idle_ttl:
+            self._db.execute("DELETE FROM chat_messages WHERE key = ?", (db_key,))
+            self._db.execute("DELETE FROM chat_sessions WHERE key = ?", (db_key,))
+            self._db.commit()
+            self.evictions += 1
+            return []
+        self._db.execute("UPDATE chat_sessions SET last_access = ? WHERE key = ?", (now, db_key))
+        self._db.commit()
+        rows = self._db.execute(
+            "SELECT message, tokens FROM chat_messages WHERE key = ? ORDER BY id DESC LIMIT ?",
+            (db_key, self.max_messages),
+        ).fetchall()
+        return self._trim(rows[::-1])
+
+    def _db_add(self, key, message, tokens, now):
+        db_key = self._db_key(key)
+        row = self._db.execute(
+            "SELECT last_access FROM chat_sessions WHERE key = ?", (db_key,)
+        ).fetchone()
+        if row is not None and now - row[0] > self.idle_ttl:
+            self._db.execute("DELETE FROM chat_messages WHERE key = ?", (db_key,))
+            self.evictions += 1
+        self._db.execute(
+            "INSERT OR REPLACE INTO chat_sessions VALUES (?, ?)", (db_key, now)
+        )
+        self._db.execute(
+            "INSERT INTO chat_messages (key, message, tokens) VALUES (?, ?, ?)",
+            (db_key, message, tokens),
+        )
+        # 윈도우 밖의 오래된 메시지 삭제
+        self._db.execute(
+            """DELETE FROM chat_messages WHERE key = ? AND id NOT IN (
+                SELECT id FROM chat_messages WHERE key = ? ORDER BY id DESC LIMIT ?
+            )""",
+            (db_key, db_key, self.max_messages),
+        )
+        if self._writes % self.sweep_every == 0:
+            self._db_evict(now)
+        self._db.commit()
+
+    def _db_evict(self, now):
+        expired = self._db.execute(
+            "DELETE FROM chat_sessions WHERE last_access < ?", (now - self.idle_ttl,)
+        ).rowcount
+        overflow = self._db.execute(
+            """DELETE FROM chat_sessions WHERE key IN (
+                SELECT key FROM chat_sessions ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )""",
+            (self.max_sessions,),
+        ).rowcount
+        self._db.execute(
+            "DELETE FROM chat_messages WHERE key NOT IN (SELECT key FROM chat_sessions)"
+        )
+        self.evictions += max(expired, 0) + max(overflow, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            if self._db is not None:
+                sessions, messages = self._db.execute(
+                    "SELECT (SELECT COUNT(*) FROM chat_sessions), (SELECT COUNT(*) FROM chat_messages)"
+                ).fetchone()
+            else:
+                sessions = len(self.sessions)
+                messages = sum(len(entry["messages"]) for entry in self.sessions.values())
+            return {"sessions": sessions, "messages": messages, "evictions": self.evictions}
+
+
+# 토큰 수 계산용 인코딩 (tiktoken 을 쓸 수 없으면 글자 수로 근사)
+def _load_encoding():
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(os.getenv("LLM_MODEL", ""))
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
@@ -6,22 +6,19 @@ from datetime import datetime
 
 from langchain_core.prompts import ChatPromptTemplate
 from langchain.agents import tool
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from openai import OpenAI
 
-from .config import collection
-from pymilvus import (
-    RRFRanker,
-)
+from app.api.utils.llm_util import llm_provider
+from app.api.utils.embedding_cache import cached_embedding, embedding_cache
+from .config import vector_store
+from .utils.filter_util import filter_builder
 
 import json
 from langchain.chains.query_constructor.base import AttributeInfo
 from langchain.retrievers.self_query.base import SelfQueryRetriever
 
 from langchain_core.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import StrOutputParser
 import os
 
@@ -59,7 +56,41 @@ logging.basicConfig(
 
 llm_model = os.getenv("LLM_MODEL")
 embedding_model = os.getenv("EMBEDDING_MODEL")
-embedding_client = OpenAI(api_key=openai_key)
+embedding_client = llm_provider.openai()
+
+# 도구 체인은 호출마다 만들지 않고 한 번만 생성(LLM 은 공유 커넥션 풀 사용)
+cls_intent_chain = (
+    ChatPromptTemplate.from_messages(
+        [
+            (
+                "system",
+                cls_intent_template,
+            ),
+            ("user", "{query}"),
+        ]
+    )
+    | llm_provider.chat(llm_model, temperature=0)
+)
+except_situation_chain = (
+    PromptTemplate.from_template(except_situation_template)
+    | llm_provider.chat(llm_model)
+    | StrOutputParser()
+)
+sharing_chain = (
+    PromptTemplate.from_template(sharing_template)
+    | llm_provider.chat(llm_model)
+    | StrOutputParser()
+)
+write_diary_chain = (
+    PromptTemplate.from_template(write_diary_template)
+    | llm_provider.chat(llm_model)
+    | StrOutputParser()
+)
+retriever_chain = (
+    PromptTemplate.from_template(retriever_template)
+    | llm_provider.chat(llm_model, temperature=0.0)
+    | StrOutputParser()
+)
 
 
 # 사용자 쿼리 의도 분류 도구('QUESTION', 'DIARY_WRITE', 'DIARY_SAVE', 'SHARING', 'EXCEPT_SITUATION')
@@ -72,22 +103,7 @@ def cls_intent_assistant(query: str) -> str:
     Returns:
         str: 'QUESTION', 'DIARY_WRITE', 'DIARY_SAVE', 'SHARING', 'EXCEPT_SITUATION'
     """
-    llm = ChatOpenAI(
-        model_name=llm_model,
-        openai_api_key=os.getenv("OPENAI_API_KEY"),
-        temperature=0,
-    )
-    prompt = ChatPromptTemplate.from_messages(
-        [
-            (
-                "system",
-                cls_intent_template,
-            ),
-            ("user", "{query}"),
-        ]
-    )
-    chain = prompt | llm
-    response = chain.invoke({"query": query})
+    response = cls_intent_chain.invoke({"query": query})
     return response.content.strip().upper()
 
 
@@ -102,6 +118,10 @@ def except_situation_assistant(query_and_thought: str) -> str:
     Returns:
         str: The response generated by the assistant
     """
+    return except_situation_chain.invoke(parse_except_situation_input(query_and_thought))
+
+
+def parse_except_situation_input(query_and_thought: str) -> dict:
     if "{" not in query_and_thought:
         query_and_thought = "{" + query_and_thought + "}"
     logging.info(f"except_situation_assistant Input string: {query_and_thought}")
@@ -110,16 +130,7 @@ def except_situation_assistant(query_and_thought: str) -> str:
     query = input_json["query"]
     thought = input_json["thought"]
 
-    chain = (
-        PromptTemplate.from_template(except_situation_template)
-        | ChatOpenAI(
-            model=llm_model,
-            openai_api_key=openai_key,
-        )
-        | StrOutputParser()
-    )
-
-    return chain.invoke({"query": query, "thought": thought})
+    return {"query": query, "thought": thought}
 
 
 # 사용자 쿼리 의도가 'SHARING'일 때 사용되는 도구(공감 대화 생성)
@@ -132,6 +143,10 @@ def sharing_assistant(query_and_chat_history: str) -> str:
     Returns:
         str: The empathetic response generated by the assistant
     """
+    return sharing_chain.invoke(parse_sharing_input(query_and_chat_history))
+
+
+def parse_sharing_input(query_and_chat_history: str) -> dict:
     if "{" not in query_and_chat_history:
         query_and_chat_history = "{" + query_and_chat_history + "}"
     logging.info(f"sharing_assistant Input string: {query_and_chat_history}")
@@ -139,16 +154,8 @@ def sharing_assistant(query_and_chat_history: str) -> str:
 
     query = input_json["query"]
     chat_history = input_json["chat_history"]
-    chain = (
-        PromptTemplate.from_template(sharing_template)
-        | ChatOpenAI(
-            model=llm_model,
-            openai_api_key=openai_key,
-        )
-        | StrOutputParser()
-    )
 
-    return chain.invoke({"query": query, "chat_history": chat_history})
+    return {"query": query, "chat_history": chat_history}
 
 
 # 사용자 쿼리 의도가 'DIARY_WRITE'일 때 사용되는 도구(일기 생성)
@@ -161,28 +168,23 @@ def write_diary_assistant(day_information: str) -> str:
     Returns:
         str: The diary entry generated by the assistant
     """
+    return write_diary_chain.invoke(parse_write_diary_input(day_information))
+
+
+def parse_write_diary_input(day_information: str) -> dict:
     logging.info(f"write_diary_assistant Input string: {day_information}")
     day_information_json = json.loads(day_information)
     day_info = day_information_json["day_information"]
 
     # Get the current date + day information
     day_info = current_date + f"\n{day_info}"
-    chain = (
-        PromptTemplate.from_template(write_diary_template)
-        | ChatOpenAI(
-            model=llm_model,
-            openai_api_key=openai_key,
-        )
-        | StrOutputParser()
-    )
 
-    return chain.invoke({"day_information": day_info})
+    return {"day_information": day_info}
 
 
-# 사용자 질의 임베딩 생성 함수
+# 사용자 질의 임베딩 생성 함수 (같은 질의는 캐시에서 재사용)
 def get_embedding(client, text, model=embedding_model):
-    text = text.replace("\n", " ")
-    return client.embeddings.create(input=[text], model=model).data[0].embedding
+    return cached_embedding(embedding_cache, client, text, model)
 
 
 # 사용자 쿼리 의도가 'QUESTION'일 때 사용되는 도구(특정 정보 검색)
@@ -209,41 +211,25 @@ def retriever_assistant(input_str: str) -> str:
     logging.info(
         f"Input parameters - user_id: {user_id}, baby_id: {baby_id}, query: {query}, today_date: {today_date}"
     )
-    llm = ChatOpenAI(
-        openai_api_key=openai_key,
-        model=llm_model,
-        temperature=0.0,
-    )
-    prompt = PromptTemplate.from_template(retriever_template)
-
-    chain = prompt | llm | StrOutputParser()
-
-    # 쿼리 표현식 생성
-    expr = chain.invoke(
-        {
-            "query": query,
-            "today_date": today_date,
-            "user_id": user_id,
-            "baby_id": baby_id,
-        }
+    # 쿼리 표현식 생성 (규칙 기반으로 해석하지 못하는 시간 표현만 LLM 사용)
+    expr = filter_builder.build(
+        query,
+        fallback=lambda: retriever_chain.invoke(
+            {
+                "query": query,
+                "today_date": today_date,
+                "user_id": user_id,
+                "baby_id": baby_id,
+            }
+        ),
     )
     logging.info(f"Generated expression: {expr}")
     # 쿼리 임베딩
     query_embeddings = get_embedding(embedding_client, query)
 
-    res = collection.search(
-        [query_embeddings],
-        expr=expr,
-        anns_field="embedding",
-        param={
-            "metric_type": "COSINE",
-            "params": {"nprobe": 10},
-        },  # COSINE 메트릭 타입 사용
-        rerank=RRFRanker(),
-        limit=1,
-        output_fields=["date", "text"],
-    )
-    if len(res[0]) == 0:
+    # 한 가족(user_id, baby_id)의 데이터 중 expr 조건을 만족하는 결과만 검색
+    res = vector_store.search(query_embeddings, user_id, baby_id, expr=expr, limit=1)
+    if len(res) == 0:
         return "No results found"
     return res
 
@@ -278,3 +264,17 @@ def save_diary_assistant(input_str: str) -> bool:
     response.status_code == requests.codes.ok
     logging.info(f"Response from backend: {response.status_code}")
     return response.status_code
+
+
+# 출력이 곧 최종 답변인 도구들의 체인과 입력 파싱 함수 (스트리밍 응답에서 도구 대신 체인을 직접 stream)
+FINAL_TOOL_CHAINS = {
+    "sharing_assistant": (sharing_chain, parse_sharing_input),
+    "write_diary_assistant": (write_diary_chain, parse_write_diary_input),
+    "except_situation_assistant": (except_situation_chain, parse_except_situation_input),
+}
+
+
+async def astream_final_tool(tool_name: str, tool_input: str):
+    chain, parse_input = FINAL_TOOL_CHAINS[tool_name]
+    async for chunk in chain.astream(parse_input(tool_input)):
+        yield chunk
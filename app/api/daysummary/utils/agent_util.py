@@ -8,13 +8,13 @@ import json
 from langchain.prompts import PromptTemplate
 from langchain.schema import AgentAction, AgentFinish
 from langchain.tools.render import render_text_description
-from langchain_openai import ChatOpenAI
+
+from app.api.utils.llm_util import llm_provider
 
 
 def setup_agent(tools: List[str]):
     # env setting
     llm_model = os.getenv("LLM_MODEL")
-    openai_key = os.getenv("OPENAI_API_KEY")
 
     # template load
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -34,10 +34,9 @@ def setup_agent(tools: List[str]):
     )
 
     # llm setting
-    llm = ChatOpenAI(
-        model=llm_model,
+    llm = llm_provider.chat(
+        llm_model,
         temperature=0,
-        openai_api_key=openai_key,
         stop=["\nObservation", "Observation"],
     )
 
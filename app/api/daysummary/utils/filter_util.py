@@ -0,0 +1,79 @@
+# 검색 필터(expr) 생성: 규칙 기반으로 먼저 만들고, 해석하지 못한 시간 표현이 있을 때만 LLM 체인 사용
+import logging
+import re
+from datetime import date
+from threading import Lock
+from typing import Callable, Optional
+
+from app.api.calendar.utils.date_util import TemporalExpressionParser
+
+# 질문 대상(role) 판별 키워드. 한쪽만 나오면 role 필터를 추가하고, 둘 다/둘 다 없으면 role 조건 없이 검색
+CHILD_PATTERN = re.compile(r"아이|아기|애기|딸|아들|첫째|둘째|막내|우리\s*애|(?:^|\s)애(?:가|는|랑|를|도|한테)")
+PARENTS_PATTERN = re.compile(r"(?:^|\s)(?:나|내|저|제|난)(?:는|가|도|랑|를|한테)?(?=\s|$|[?.!,])")
+
+
+class RetrievalFilterBuilder:
+    """
+    retriever_assistant 의 Milvus 필터 표현식을 만드는 클래스입니다.
+    날짜/역할을 규칙으로 해석할 수 있으면 LLM 호출 없이 바로 만들고,
+    해석하지 못한 시간 표현이 남아 있으면 fallback(LLM 체인)을 호출합니다.
+    """
+
+    def __init__(self):
+        self.rule_count = 0
+        self.fallback_count = 0
+        self._lock = Lock()
+
+    def build(self, query: str, fallback: Callable[[], str], today: Optional[date] = None) -> str:
+        """
+        Args:
+            query (str): 사용자 질문
+            fallback (Callable[[], str]): 규칙으로 해석하지 못할 때 호출할 LLM 표현식 생성 함수
+            today (Optional[date]): 기준일. 없으면 오늘 날짜
+
+        Returns:
+            str: Milvus 필터 표현식(user_id/baby_id 조건은 vector store 에서 추가)
+        """
+        parser = TemporalExpressionParser(today)
+        ranges, rest = parser.extract(query)
+        if parser.has_unparsed(rest):
+            with self._lock:
+                self.fallback_count += 1
+            logging.info(f"Filter fallback to LLM, unparsed temporal expression: {query}")
+            return fallback()
+
+        with self._lock:
+            self.rule_count += 1
+        # 시간 표현이 없으면 오늘 날짜 기준(retriever 프롬프트와 같은 규칙)
+        start = min((s for s, _ in ranges), default=parser.today)
+        end = max((e for _, e in ranges), default=parser.today)
+        if start == end:
+            conditions = [f"date == '{start.isoformat()}'"]
+        else:
+            conditions = [f"date >= '{start.isoformat()}'", f"date <= '{end.isoformat()}'"]
+
+        role = self.detect_role(rest)
+        if role:
+            conditions.append(f"role == '{role}'")
+        return " and ".join(conditions)
+
+    @staticmethod
+    def detect_role(text: str) -> Optional[str]:
+        is_child = CHILD_PATTERN.search(text) is not None
+        is_parents = PARENTS_PATTERN.search(text) is not None
+        if is_child != is_parents:
+            return "child" if is_child else "parents"
+        return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.rule_count + self.fallback_count
+            return {
+                "rule": self.rule_count,
+                "llm_fallback": self.fallback_count,
+                "fallback_rate": round(self.fallback_count / total, 4) if total else 0.0,
+            }
+
+
+# 프로세스 전체에서 공유하는 필터 생성기
+filter_builder = RetrievalFilterBuilder()
@@ -1,7 +1,4 @@
 from pymilvus import (
-    FieldSchema,
-    CollectionSchema,
-    DataType,
     Collection,
     connections,
     utility,
@@ -9,6 +6,7 @@ from pymilvus import (
 import os
 from openai import OpenAI
 from fastapi import APIRouter, HTTPException
+from app.api.embedding.utils.vecdb_util import create_collection, needs_migration, migrate_collection
 
 # 환경변수 설정
 openai_key = os.getenv("OPENAI_API_KEY")
@@ -22,38 +20,18 @@ router = APIRouter()
 # Milvus 연결 및 컬렉션 생성
 connections.connect("default", host=milvus_host, port=str(milvus_port))
 
-# Schema 생성
-fields = [
-    FieldSchema(name="user_id", dtype=DataType.INT64, is_primary=True),
-    FieldSchema(name="baby_id", dtype=DataType.INT64),
-    FieldSchema(name="date", dtype=DataType.VARCHAR, max_length=65535),
-    FieldSchema(name="role", dtype=DataType.VARCHAR, max_length=65535),
-    FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=65535),
-    FieldSchema(
-        name="embedding", dtype=DataType.FLOAT_VECTOR, dim=embedding_dimension
-    ),
-]
-
 # Embedding Client 설정
 client = OpenAI(api_key=openai_key)
 
-# 컬렉션 schema 생성
-schema = CollectionSchema(
-    fields, "Collection for storing text and embeddings about child and parents"
-)
-
-
 # 컬렉션 생성
 if utility.has_collection(collection_name):
     print(f"Collection '{collection_name}' already exists. Skipping data insertion.")
     collection = Collection(collection_name)
+    if needs_migration(collection) and os.getenv("MILVUS_AUTO_MIGRATE", "false").lower() == "true":
+        collection = migrate_collection(collection_name, embedding_dimension)
 else:
-    collection = Collection(collection_name, schema)
-
-    # 인덱스 생성
-    collection.create_index(
-        "embedding", {"index_type": "FLAT", "metric_type": "COSINE"}
-    )
+    # ANN 인덱스 + user_id partition key 컬렉션 생성
+    collection = create_collection(collection_name, embedding_dimension)
 
     # 백엔드 api에서 데이터 받아와서 동작.
     dummy = [
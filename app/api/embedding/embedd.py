@@ -1,45 +1,107 @@
 import os
-from openai import OpenAI
+import asyncio
 import logging
 from fastapi import APIRouter, HTTPException
 from .models import DayInfoBatch
-from .utils.vecdb_util import prepare_vecdb
+from .utils.vecdb_util import FlushScheduler
+from app.api.utils.llm_util import llm_provider
+from app.api.utils.embedding_cache import (
+    cached_embedding,
+    embedding_cache,
+    lookup_embeddings,
+    store_embeddings,
+)
+from app.api.utils.vector_store import get_vector_store
+from app.api.utils.trace_util import span
 
 # 환경변수 설정
 openai_key = os.getenv("OPENAI_API_KEY")
-milvus_host = os.getenv("MILVUS_HOST")
-milvus_port = os.getenv("MILVUS_PORT")
 embedding_model = os.getenv("EMBEDDING_MODEL")
-embedding_dimension = os.getenv("EMBEDDING_DIMENSION")
-collection_name = os.getenv("COLLECTION_NAME")
+
+# 배치 임베딩 / bulk insert 설정
+EMBEDDING_CHUNK_SIZE = int(os.getenv("EMBEDDING_CHUNK_SIZE", 256))  # 임베딩 API 1회 호출당 입력 수
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", 4))  # 동시에 보내는 임베딩 요청 수
 
 
-# Embedding Client 설정
-client = OpenAI(api_key=openai_key)
+# Embedding Client 설정 (공유 커넥션 풀 사용)
+client = llm_provider.openai()
+async_client = llm_provider.async_openai()
 
-# Milvus 연결 및 컬렉션 생성
-collection = prepare_vecdb(collection_name, embedding_dimension, milvus_host, milvus_port)
+# 벡터 저장소 (VECTOR_STORE=milvus 면 Milvus 연결 및 컬렉션 생성, numpy 면 프로세스 내 저장소)
+vector_store = get_vector_store()
 
-# 임베딩 생성 함수
+# flush 는 요청마다 하지 않고 백그라운드에서 모아서 실행
+flush_scheduler = FlushScheduler(
+    vector_store,
+    interval=float(os.getenv("MILVUS_FLUSH_INTERVAL", 300)),
+    min_rows=int(os.getenv("MILVUS_FLUSH_MIN_ROWS", 10000)),
+)
+
+# 임베딩 생성 함수 (같은 텍스트는 캐시에서 재사용)
 def get_embedding(client, text, model= embedding_model):
-    text = text.replace("\n", " ")
-    return client.embeddings.create(input=[text], model=model).data[0].embedding
+    return cached_embedding(embedding_cache, client, text, model)
+
+
+# 여러 텍스트를 chunk 단위 다중 입력 호출로 임베딩 (입력 순서 유지)
+# 캐시에 있는 텍스트와 요청 내 중복 텍스트는 API 로 보내지 않음
+async def get_embeddings(client, texts, model=embedding_model,
+                         chunk_size=EMBEDDING_CHUNK_SIZE, concurrency=EMBEDDING_CONCURRENCY):
+    texts, embeddings, missing = lookup_embeddings(embedding_cache, texts, model)
+    if not missing:
+        return embeddings
+    new_embeddings = await embed_texts(client, missing, model, chunk_size, concurrency)
+    return store_embeddings(embedding_cache, texts, embeddings, missing, new_embeddings, model)
+
+
+async def embed_texts(client, texts, model, chunk_size, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def embed_chunk(chunk):
+        async with semaphore:
+            with span("embedding.create"):
+                response = await client.embeddings.create(input=chunk, model=model)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    chunks = [texts[i : i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    results = await asyncio.gather(*(embed_chunk(chunk) for chunk in chunks))
+    return [embedding for chunk in results for embedding in chunk]
 
 router = APIRouter()
 
-# DayInfoBatch 데이터를 받아서 임베딩 생성 후 Milvus에 저장.
+
+# 임베딩 캐시 hit/miss 조회
+@router.get("/embedding/cache_stats")
+def embedding_cache_stats():
+    return embedding_cache.stats()
+
+
+@router.on_event("startup")
+async def start_flush_scheduler():
+    flush_scheduler.start()
+
+
+@router.on_event("shutdown")
+async def stop_flush_scheduler():
+    await flush_scheduler.stop()
+
+
+# DayInfoBatch 데이터를 받아서 임베딩 생성 후 벡터 저장소에 저장.
 @router.post("/embedding")
 async def insert_day_info(batch: DayInfoBatch):
     try:
+        if not batch.items:
+            return {"message": "Successfully inserted 0 entities into the collection"}
+
+        embeddings = await get_embeddings(async_client, [item.text for item in batch.items])
         entities = []
-        for item in batch.items:
+        for item, embedding in zip(batch.items, embeddings):
             entity = {
                 "user_id": item.user_id,
                 "baby_id": item.baby_id,
                 "date": item.date,
                 "role": item.role,
                 "text": item.text,
-                "embedding": get_embedding(client, item.text),
+                "embedding": embedding,
             }
             entities.append(entity)
         logging.info(f"""
@@ -51,9 +113,10 @@ role: {entities[0]['role']}\n
 text: {entities[0]['text']}\n
 """
 )
-        collection.insert(entities)
-        collection.flush()
-        logging.info(f"Successfully inserted {len(entities)} entities into the collection\n Total Collection Size: {collection.num_entities}")
-        return {"message": f"Successfully inserted {len(entities)} entities into the collection\n Total Collection Size: {collection.num_entities}"}
+        # pymilvus insert / 파일 append 는 블로킹 호출이므로 스레드에서 실행
+        inserted = await asyncio.to_thread(vector_store.insert, entities)
+        flush_scheduler.mark_inserted(inserted)
+        logging.info(f"Successfully inserted {inserted} entities into the collection\n Pending flush: {flush_scheduler.pending_rows}")
+        return {"message": f"Successfully inserted {inserted} entities into the collection"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
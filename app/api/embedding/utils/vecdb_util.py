@@ -6,10 +6,184 @@ from pymilvus import (
     connections,
     utility,
 )
+import asyncio
 import logging
+import os
+import time
+
+# 인덱스 종류별 빌드 파라미터 / 검색 파라미터 (환경변수로 조정)
+INDEX_TYPE = os.getenv("MILVUS_INDEX_TYPE", "HNSW")
+INDEX_BUILD_PARAMS = {
+    "FLAT": {},
+    "HNSW": {
+        "M": int(os.getenv("MILVUS_HNSW_M", 16)),
+        "efConstruction": int(os.getenv("MILVUS_HNSW_EF_CONSTRUCTION", 200)),
+    },
+    "IVF_FLAT": {"nlist": int(os.getenv("MILVUS_IVF_NLIST", 1024))},
+    "IVF_SQ8": {"nlist": int(os.getenv("MILVUS_IVF_NLIST", 1024))},
+}
+INDEX_SEARCH_PARAMS = {
+    "FLAT": {},
+    "HNSW": {"ef": int(os.getenv("MILVUS_HNSW_EF", 64))},
+    "IVF_FLAT": {"nprobe": int(os.getenv("MILVUS_IVF_NPROBE", 16))},
+    "IVF_SQ8": {"nprobe": int(os.getenv("MILVUS_IVF_NPROBE", 16))},
+}
+METRIC_TYPE = "COSINE"
+# user_id 를 partition key 로 사용 -> 검색 시 한 가족의 데이터만 조회
+NUM_PARTITIONS = int(os.getenv("MILVUS_NUM_PARTITIONS", 64))
+DATA_FIELDS = ["user_id", "baby_id", "date", "role", "text", "embedding"]
+
+
+def index_params(index_type=None):
+    index_type = (index_type or INDEX_TYPE).upper()
+    if index_type not in INDEX_BUILD_PARAMS:
+        raise ValueError(
+            f"Unsupported index type {index_type}, supported types are {list(INDEX_BUILD_PARAMS)}"
+        )
+    return {
+        "index_type": index_type,
+        "metric_type": METRIC_TYPE,
+        "params": INDEX_BUILD_PARAMS[index_type],
+    }
+
+
+# collection.search 의 param 인자 (모르는 인덱스 종류는 Milvus 기본값 사용)
+def search_params(index_type=None):
+    index_type = (index_type or INDEX_TYPE).upper()
+    return {"metric_type": METRIC_TYPE, "params": INDEX_SEARCH_PARAMS.get(index_type, {})}
+
+
+def build_schema(embedding_dimension):
+    # Schema 생성 (id 는 auto_id, user_id 는 partition key)
+    fields = [
+        FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=True),
+        FieldSchema(name="user_id", dtype=DataType.INT64, is_partition_key=True),
+        FieldSchema(name="baby_id", dtype=DataType.INT64),
+        FieldSchema(name="date", dtype=DataType.VARCHAR, max_length=65535),
+        FieldSchema(name="role", dtype=DataType.VARCHAR, max_length=65535),
+        FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=65535),
+        FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=int(embedding_dimension)),
+        ]
+
+    # 컬렉션 schema 생성
+    return CollectionSchema(
+        fields, "Collection for storing text and embeddings about child and parents")
+
+
+def create_collection(collection_name, embedding_dimension, index_type=None):
+    collection = Collection(
+        collection_name, build_schema(embedding_dimension), num_partitions=NUM_PARTITIONS
+    )
+    # 인덱스 생성
+    collection.create_index("embedding", index_params(index_type))
+    return collection
+
+
+def is_partitioned(collection):
+    return any(getattr(field, "is_partition_key", False) for field in collection.schema.fields)
+
+
+def current_index_type(collection):
+    for index in collection.indexes:
+        if index.field_name == "embedding":
+            return index.params.get("index_type")
+    return None
+
+
+# 환경변수가 아니라 컬렉션에 실제로 만들어진 인덱스 기준의 검색 파라미터
+# (MILVUS_AUTO_MIGRATE=false 로 마이그레이션하지 않은 컬렉션은 기존 인덱스를 그대로 씀)
+def collection_search_params(collection):
+    return search_params(current_index_type(collection) or "FLAT")
+
+
+def needs_migration(collection, index_type=None):
+    index_type = (index_type or INDEX_TYPE).upper()
+    return not is_partitioned(collection) or current_index_type(collection) != index_type
+
+
+def distinct_user_ids(collection, batch_size=1000):
+    """
+    컬렉션의 user_id 목록을 오름차순으로 반환합니다.
+    user_id 만 조회하므로 같은 user_id 의 행이 여러 개여도 값이 빠지지 않습니다.
+    """
+    user_ids, last = [], None
+    while True:
+        expr = "user_id >= 0" if last is None else f"user_id > {last}"
+        rows = collection.query(expr=expr, output_fields=["user_id"], limit=batch_size)
+        page = sorted({row["user_id"] for row in rows})
+        if not page:
+            return user_ids
+        user_ids.extend(page)
+        last = page[-1]
+
+
+def query_user_rows(collection, user_id, batch_size=1000):
+    """한 user_id 의 행들을 offset/limit 페이지로 나누어 반환합니다."""
+    offset = 0
+    while True:
+        rows = collection.query(
+            expr=f"user_id == {int(user_id)}",
+            output_fields=DATA_FIELDS,
+            offset=offset,
+            limit=batch_size,
+        )
+        if rows:
+            yield rows
+        if len(rows) < batch_size:
+            return
+        offset += len(rows)
+
+
+def migrate_collection(collection_name, embedding_dimension, index_type=None, batch_size=1000):
+    """
+    기존 컬렉션을 같은 이름으로 다시 만듭니다.
+    - schema 가 이미 partition key 를 쓰면 인덱스만 새로 생성
+    - 아니면 새 schema 의 임시 컬렉션에 데이터를 복사한 뒤 기존 컬렉션을 교체
+      (기존 schema 는 user_id 가 primary key 라 값이 중복되므로, primary key 로 페이지를 나누는
+      query_iterator 대신 user_id 별 offset/limit 조회로 복사)
+    """
+    collection = Collection(collection_name)
+
+    if is_partitioned(collection):
+        logging.info(f"Rebuilding index of '{collection_name}' as {index_params(index_type)}")
+        collection.release()
+        collection.drop_index()
+        collection.create_index("embedding", index_params(index_type))
+        collection.load()
+        return collection
+
+    tmp_name = f"{collection_name}_migrating"
+    if utility.has_collection(tmp_name):
+        # 이전 마이그레이션이 중간에 실패한 경우 처음부터 다시
+        utility.drop_collection(tmp_name)
+    new_collection = create_collection(tmp_name, embedding_dimension, index_type)
+
+    collection.load()
+    copied = 0
+    for user_id in distinct_user_ids(collection, batch_size):
+        for rows in query_user_rows(collection, user_id, batch_size):
+            new_collection.insert([{field: row[field] for field in DATA_FIELDS} for row in rows])
+            copied += len(rows)
+    new_collection.flush()
+
+    if copied != collection.num_entities:
+        utility.drop_collection(tmp_name)
+        raise RuntimeError(
+            f"Migration of '{collection_name}' copied {copied} of {collection.num_entities} rows, keeping the old collection"
+        )
+
+    collection.release()
+    utility.drop_collection(collection_name)
+    utility.rename_collection(tmp_name, collection_name)
+    logging.info(f"Migrated {copied} rows of '{collection_name}' to partitioned {index_params(index_type)}")
+
+    collection = Collection(collection_name)
+    collection.load()
+    return collection
+
 
 # Milvus 컬렉션 생성 함수
-def prepare_vecdb(collection_name, embedding_dimension, milvus_host, milvus_port):
+def prepare_vecdb(collection_name, embedding_dimension, milvus_host, milvus_port, index_type=None):
     # Milvus 연결 및 컬렉션 생성
     connections.connect("default", host=milvus_host, port=str(milvus_port))
 
@@ -18,29 +192,110 @@ def prepare_vecdb(collection_name, embedding_dimension, milvus_host, milvus_port
         # Collection 있을 경우 불러오기
         logging.info(f"Collection '{collection_name}' already exists. Skipping data insertion.")
         collection = Collection(collection_name)
-        
+        if needs_migration(collection, index_type):
+            if os.getenv("MILVUS_AUTO_MIGRATE", "false").lower() == "true":
+                collection = migrate_collection(collection_name, embedding_dimension, index_type)
+            else:
+                logging.warning(
+                    f"Collection '{collection_name}' uses an old schema or index, "
+                    "set MILVUS_AUTO_MIGRATE=true or run `python -m app.api.embedding.utils.vecdb_util` to migrate."
+                )
+
     else:
         # Collection 없을 경우 생성.
-        # Schema 생성
         logging.info(f"Collection '{collection_name}' does not exist. Creating new collection.")
-        fields = [
-            FieldSchema(name="user_id", dtype=DataType.INT64, is_primary=True),
-            FieldSchema(name="baby_id", dtype=DataType.INT64),
-            FieldSchema(name="date", dtype=DataType.VARCHAR, max_length=65535),
-            FieldSchema(name="role", dtype=DataType.VARCHAR, max_length=65535),
-            FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=65535),
-            FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=embedding_dimension),
-            ]
-
-        # 컬렉션 schema 생성
-        schema = CollectionSchema(
-            fields, "Collection for storing text and embeddings about child and parents")
-        
-        collection = Collection(collection_name, schema)
-
-        # 인덱스 생성
-        collection.create_index(
-            "embedding", {"index_type": "FLAT", "metric_type": "COSINE"}
-            # index_type 데이터 수가 늘어남에 따라 다양한 종류 고려 필요.
-        )
-    return collection
\ No newline at end of file
+        collection = create_collection(collection_name, embedding_dimension, index_type)
+    return collection
+
+
+# 엔티티를 batch_size 단위로 나누어 bulk insert
+def insert_in_batches(collection, entities, batch_size=1000):
+    inserted = 0
+    for start in range(0, len(entities), batch_size):
+        result = collection.insert(entities[start : start + batch_size])
+        inserted += result.insert_count
+    return inserted
+
+
+class FlushScheduler:
+    """
+    요청마다 flush 하지 않고 백그라운드에서 모아서 flush 하는 클래스입니다.
+    insert 된 데이터는 flush 전에도 growing segment 로 검색되므로,
+    작은 segment 가 계속 생기지 않도록 아래 조건에서만 flush 합니다.
+    - flush 되지 않은 행이 min_rows 이상일 때
+    - 마지막 flush 이후 interval 초가 지났고 flush 되지 않은 행이 있을 때
+    """
+
+    def __init__(self, collection, interval=300.0, min_rows=10000, check_every=10.0):
+        self.collection = collection
+        self.interval = interval
+        self.min_rows = min_rows
+        self.check_every = check_every
+        self.pending_rows = 0
+        self.last_flush = time.monotonic()
+        self.flush_count = 0
+        self._task = None
+        self._lock = asyncio.Lock()
+
+    def mark_inserted(self, rows):
+        self.pending_rows += rows
+
+    def should_flush(self):
+        if self.pending_rows >= self.min_rows:
+            return True
+        return self.pending_rows > 0 and time.monotonic() - self.last_flush >= self.interval
+
+    async def flush(self):
+        async with self._lock:
+            if self.pending_rows == 0:
+                return
+            rows = self.pending_rows
+            await asyncio.to_thread(self.collection.flush)
+            self.pending_rows -= rows
+            self.last_flush = time.monotonic()
+            self.flush_count += 1
+            logging.info(f"Flushed {rows} rows into collection '{self.collection.name}'")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.check_every)
+            try:
+                if self.should_flush():
+                    await self.flush()
+            except Exception as e:
+                logging.error(f"Background flush failed: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # 종료 시 남은 데이터 flush
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    def stats(self):
+        return {
+            "pending_rows": self.pending_rows,
+            "seconds_since_flush": round(time.monotonic() - self.last_flush, 1),
+            "flush_count": self.flush_count,
+        }
+
+
+if __name__ == "__main__":
+    # 기존 컬렉션 마이그레이션: python -m app.api.embedding.utils.vecdb_util [INDEX_TYPE]
+    import sys
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    connections.connect(
+        "default", host=os.getenv("MILVUS_HOST"), port=str(os.getenv("MILVUS_PORT"))
+    )
+    migrate_collection(
+        os.getenv("COLLECTION_NAME"),
+        os.getenv("EMBEDDING_DIMENSION"),
+        sys.argv[1] if len(sys.argv) > 1 else None,
+    )
@@ -19,7 +19,9 @@ from app.api.fairytale.utils.image_cut_utils import (
 )
 from app.api.fairytale.models import FairytaleInput
 import cv2
-from openai import AsyncOpenAI
+
+from app.api.utils.llm_util import llm_provider
+from app.api.utils.trace_util import span
 
 from fastapi import APIRouter, HTTPException
 
@@ -28,6 +30,17 @@ load_dotenv()
 apikey = os.getenv("OPENAI_API_KEY")
 router = APIRouter()
 
+# 프롬프트 로드
+current_dir = os.path.dirname(os.path.abspath(__file__))
+prompt_path = os.path.join(current_dir, "prompts", "fairytale_prompt_ver4.txt")
+
+with open(
+    prompt_path,
+    "r",
+    encoding="utf-8",
+) as file:
+    prompts = file.read()
+
 
 @router.post("/generate_fairytale")
 async def generate_fairytale(input_data: FairytaleInput):
@@ -40,44 +53,36 @@ async def generate_fairytale(input_data: FairytaleInput):
 
     # Request 데이터 전처리(필요한 데이터만 추출)
     data = select_keys_from_diary_data(data)
-    # 프롬프트 로드
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    prompt_path = os.path.join(current_dir, "prompts", "fairytale_prompt_ver4.txt")
-
-    with open(
-        prompt_path,
-        "r",
-        encoding="utf-8",
-    ) as file:
-        prompts = file.read()
-
-    # 동화 생성 체인 생성
+    # 동화 생성 체인 (캐시된 체인 재사용)
     chain = create_pairy_chain(prompts, data)
 
     logging.info("Fairytale generation started")
     # 동화 생성
-    result = chain.invoke(
-        {
-            "name": data["name"],
-            "age": data["age"],
-            "gender": data["gender"],
-            "activities": data["activities"],
-            "special": data["special"],
-        }
-    )
+    with span("fairytale.story"):
+        result = await chain.ainvoke(
+            {
+                "name": data["name"],
+                "age": data["age"],
+                "gender": data["gender"],
+                "activities": data["activities"],
+                "special": data["special"],
+            }
+        )
     logging.info("Fairytale generation completed")
 
     dall_e_prompt = create_image_prompt(result)
     print(dall_e_prompt)
-    # # 이미지 생성 클라이언트 생성
-    client = AsyncOpenAI(api_key=apikey)
-    url = await generate_image(client, dall_e_prompt)
+    # # 이미지 생성 클라이언트 (공유 커넥션 풀 사용)
+    client = llm_provider.async_openai()
+    with span("fairytale.dalle"):
+        url = await generate_image(client, dall_e_prompt)
     logging.info(f"Generate Image URL: {url}")
 
     # 이미지 다운로드 및 패널로 분할
-    panels = detect_and_crop_panels(url)
-    # 패널 이미지 base64 인코딩
-    base64_panels = [numpy_to_base64(panel) for panel in panels]
+    with span("fairytale.crop_panels"):
+        panels = detect_and_crop_panels(url)
+        # 패널 이미지 base64 인코딩
+        base64_panels = [numpy_to_base64(panel) for panel in panels]
 
     # 결과 표지 이미지 추가
     result['cover_illustration'] = base64_panels.pop(0)
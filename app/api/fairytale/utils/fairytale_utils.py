@@ -1,8 +1,9 @@
 import json
-from langchain_openai import ChatOpenAI
+from functools import lru_cache
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.prompts import PromptTemplate
 from app.api.fairytale.models import StoryResponse
+from app.api.utils.llm_util import llm_provider
 import os
 
 # 알림장 요약 데이터 Load, key 선택
@@ -56,13 +57,14 @@ def create_pairy_chain(template: str, selected_data: dict):
     Returns:
         Chain: 생성된 Pairy 체인
     """
-    selected_keys = list(selected_data.keys())
+    return _build_pairy_chain(template, tuple(selected_data.keys()))
+
+
+# 같은 템플릿/키 조합이면 체인을 다시 만들지 않고 재사용
+@lru_cache(maxsize=8)
+def _build_pairy_chain(template: str, selected_keys: tuple):
     # 모델 생성
-    llm = ChatOpenAI(
-        model_name="gpt-4o-mini",
-        temperature=0,
-        openai_api_key=os.getenv("OPENAI_API_KEY"),
-    )
+    llm = llm_provider.chat("gpt-4o-mini", temperature=0)
 
     # 출력 파서 생성
     output_parser = JsonOutputParser(pydantic_object=StoryResponse)
@@ -70,7 +72,7 @@ def create_pairy_chain(template: str, selected_data: dict):
 
     # 프롬프트 템플릿 생성
     prompt = PromptTemplate(
-        input_variables=selected_keys,
+        input_variables=list(selected_keys),
         partial_variables={
             "format_instructions": output_parser.get_format_instructions()
         },
@@ -0,0 +1,186 @@
+# 임베딩 캐시: 같은 텍스트(정규화 기준)와 모델이면 임베딩 API 를 다시 호출하지 않음
+# daysummary 검색 쿼리와 embedding 라우터의 일기 텍스트가 같은 캐시를 공유합니다.
+from collections import OrderedDict
+from threading import Lock
+import hashlib
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.api.utils.trace_util import span
+
+load_dotenv()
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """유니코드 정규화(NFKC), 공백 정리, 대소문자 통일."""
+    text = unicodedata.normalize("NFKC", text)
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def make_key(text: str, model: str) -> str:
+    return hashlib.sha256(f"{model}\n{normalize_text(text)}".encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    메모리 LRU(max_entries) + 선택적 SQLite 디스크 캐시(path)로 구성된 임베딩 캐시입니다.
+    디스크 항목은 ttl(초)이 지나면 만료됩니다. (ttl=None 이면 만료 없음)
+    벡터는 float32 로 저장하고 hit/miss 횟수를 기록합니다.
+    """
+
+    def __init__(self, max_entries: int = 4096, path: str = None, ttl: float = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._memory = OrderedDict()
+        self._lock = Lock()
+
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS embedding_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    created REAL NOT NULL
+                )"""
+            )
+            self._db.commit()
+
+    def _put_memory(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def get(self, text: str, model: str):
+        """캐시된 임베딩(list[float]) 또는 None."""
+        key = make_key(text, model)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return vector.tolist()
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT vector, created FROM embedding_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and self._expired(row[1]):
+                    self._db.execute("DELETE FROM embedding_cache WHERE key = ?", (key,))
+                    self._db.commit()
+                    row = None
+                if row is not None:
+                    vector = np.frombuffer(row[0], dtype=np.float32)
+                    self._put_memory(key, vector)
+                    self.disk_hits += 1
+                    return vector.tolist()
+
+            self.misses += 1
+            return None
+
+    def set(self, text: str, model: str, embedding):
+        key = make_key(text, model)
+        vector = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            self._put_memory(key, vector)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO embedding_cache VALUES (?, ?, ?, ?)",
+                    (key, model, vector.tobytes(), time.time()),
+                )
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM embedding_cache")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            stats = {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+                "memory_entries": len(self._memory),
+            }
+            if self._db is not None:
+                stats["disk_entries"] = self._db.execute(
+                    "SELECT COUNT(*) FROM embedding_cache"
+                ).fetchone()[0]
+        return stats
+
+
+def cached_embedding(cache: EmbeddingCache, client, text: str, model: str):
+    """캐시를 먼저 확인하고, 없으면 임베딩 API 를 호출한 뒤 저장합니다."""
+    text = text.replace("\n", " ")
+    embedding = cache.get(text, model)
+    if embedding is None:
+        with span("embedding.create"):
+            embedding = client.embeddings.create(input=[text], model=model).data[0].embedding
+        cache.set(text, model, embedding)
+    return embedding
+
+
+def lookup_embeddings(cache: EmbeddingCache, texts: list, model: str):
+    """
+    캐시를 조회해 (정리된 texts, 임베딩 목록(없으면 None), API 로 보낼 텍스트)를 돌려줍니다.
+    요청 내 중복 텍스트는 한 번만 보냅니다.
+    """
+    texts = [text.replace("\n", " ") for text in texts]
+    embeddings = [cache.get(text, model) for text in texts]
+    missing = list(dict.fromkeys(text for text, embedding in zip(texts, embeddings) if embedding is None))
+    return texts, embeddings, missing
+
+
+def store_embeddings(cache: EmbeddingCache, texts: list, embeddings: list, missing: list,
+                     new_embeddings: list, model: str):
+    """API 로 받은 임베딩을 캐시에 저장하고 입력 순서대로 채운 임베딩 목록을 돌려줍니다."""
+    new_embeddings = dict(zip(missing, new_embeddings))
+    for text, embedding in new_embeddings.items():
+        cache.set(text, model, embedding)
+    return [
+        new_embeddings[text] if embedding is None else embedding
+        for text, embedding in zip(texts, embeddings)
+    ]
+
+
+def cached_embeddings(cache: EmbeddingCache, client, texts: list, model: str):
+    """여러 텍스트를 임베딩합니다. 캐시에 없는 텍스트만 한 번의 다중 입력 API 호출로 보냅니다."""
+    texts, embeddings, missing = lookup_embeddings(cache, texts, model)
+    if not missing:
+        return embeddings
+    with span("embedding.create"):
+        response = client.embeddings.create(input=missing, model=model)
+    new_embeddings = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+    return store_embeddings(cache, texts, embeddings, missing, new_embeddings, model)
+
+
+# 프로세스 전체에서 공유하는 캐시 (EMBEDDING_CACHE_PATH 지정 시 SQLite 디스크 캐시도 사용)
+embedding_cache = EmbeddingCache(
+    max_entries=int(os.getenv("EMBEDDING_CACHE_ENTRIES", 4096)),
+    path=os.getenv("EMBEDDING_CACHE_PATH"),
+    ttl=float(os.getenv("EMBEDDING_CACHE_TTL")) if os.getenv("EMBEDDING_CACHE_TTL") else None,
+)
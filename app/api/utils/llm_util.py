@@ -0,0 +1,298 @@
+# 모든 라우터가 공유하는 LLM 클라이언트 제공자
+# 요청마다 ChatOpenAI / OpenAI 객체와 TLS 연결을 새로 만들지 않도록
+# HTTP/2 커넥션 풀을 하나 두고 그 위에 모델별 클라이언트를 캐시합니다.
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+import httpx
+from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI
+from openai import AsyncOpenAI, OpenAI
+
+load_dotenv()
+
+RATE_LIMIT_HEADERS = {
+    "limit_requests": "x-ratelimit-limit-requests",
+    "limit_tokens": "x-ratelimit-limit-tokens",
+    "remaining_requests": "x-ratelimit-remaining-requests",
+    "remaining_tokens": "x-ratelimit-remaining-tokens",
+    "reset_requests": "x-ratelimit-reset-requests",
+    "reset_tokens": "x-ratelimit-reset-tokens",
+}
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_reset(value: str) -> float:
+    """'6m0s', '1.5s', '20ms' 형태의 리셋 시간을 초 단위로 변환합니다."""
+    return sum(float(n) * _UNITS[unit] for n, unit in _DURATION.findall(value or ""))
+
+
+def request_model(request: httpx.Request) -> str:
+    """요청 본문의 model 값, 없으면(멀티파트 등) URL 경로를 반환합니다."""
+    try:
+        return json.loads(request.content).get("model") or request.url.path
+    except Exception:
+        return request.url.path
+
+
+class RateLimitTracker:
+    """
+    OpenAI 응답의 x-ratelimit-* 헤더를 모델별로 기록하는 클래스입니다.
+    남은 요청 수가 0 이면 리셋 시각까지 새 요청을 보내지 않도록 대기 시간을 알려줍니다.
+    """
+
+    def __init__(self, max_wait: float = 10.0):
+        self.max_wait = max_wait
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, model: str) -> dict:
+        return self._models.setdefault(
+            model, {"requests": 0, "errors": 0, "rate_limited": 0}
+        )
+
+    def record(self, model: str, response: httpx.Response):
+        now = time.time()
+        with self._lock:
+            entry = self._entry(model)
+            entry["requests"] += 1
+            if response.status_code >= 400:
+                entry["errors"] += 1
+            if response.status_code == 429:
+                entry["rate_limited"] += 1
+
+            for name, header in RATE_LIMIT_HEADERS.items():
+                value = response.headers.get(header)
+                if value is None:
+                    continue
+                if name.startswith("reset_"):
+                    entry[name + "_at"] = now + parse_reset(value)
+                else:
+                    entry[name] = int(value)
+            entry["updated"] = now
+
+    def wait_time(self, model: str) -> float:
+        """다음 요청 전에 기다려야 하는 시간(초)."""
+        with self._lock:
+            entry = self._models.get(model)
+            if not entry or entry.get("remaining_requests", 1) > 0:
+                return 0.0
+            wait = entry.get("reset_requests_at", 0) - time.time()
+        return min(max(wait, 0.0), self.max_wait)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {model: dict(entry) for model, entry in self._models.items()}
+
+
+class LimitedTransport(httpx.HTTPTransport):
+    """동시 요청 수를 제한하고 rate limit 헤더를 기록하는 동기 전송 계층."""
+
+    def __init__(self, provider, **kwargs):
+        super().__init__(**kwargs)
+        self._provider = provider
+        self._semaphore = threading.BoundedSemaphore(provider.max_concurrency)
+
+    def handle_request(self, request):
+        model = request_model(request)
+        wait = self._provider.rate_limits.wait_time(model)
+        if wait:
+            logging.warning(f"[*] {model} rate limit reached, waiting {wait:.1f}s")
+            time.sleep(wait)
+
+        with self._semaphore, self._provider.track_in_flight():
+            response = super().handle_request(request)
+        self._provider.rate_limits.record(model, response)
+        return response
+
+
+class AsyncLimitedTransport(httpx.AsyncHTTPTransport):
+    """LimitedTransport 의 비동기 버전."""
+
+    def __init__(self, provider, **kwargs):
+        super().__init__(**kwargs)
+        self._provider = provider
+        self._semaphore = asyncio.BoundedSemaphore(provider.max_concurrency)
+
+    async def handle_async_request(self, request):
+        model = request_model(request)
+        wait = self._provider.rate_limits.wait_time(model)
+        if wait:
+            logging.warning(f"[*] {model} rate limit reached, waiting {wait:.1f}s")
+            await asyncio.sleep(wait)
+
+        async with self._semaphore:
+            with self._provider.track_in_flight():
+                response = await super().handle_async_request(request)
+        self._provider.rate_limits.record(model, response)
+        return response
+
+
+class _InFlight:
+    def __init__(self, provider):
+        self._provider = provider
+
+    def __enter__(self):
+        with self._provider._lock:
+            self._provider._in_flight += 1
+
+    def __exit__(self, *exc):
+        with self._provider._lock:
+            self._provider._in_flight -= 1
+
+
+class LLMClientProvider:
+    """
+    프로세스 전체에서 공유하는 OpenAI / LangChain 클라이언트 제공자입니다.
+
+    - httpx 클라이언트(동기/비동기)를 하나씩만 만들고 HTTP/2 + keep-alive 로 연결을 재사용합니다.
+    - max_concurrency 로 동시에 나가는 LLM 요청 수를 제한합니다.
+    - chat(model, temperature, ...) 는 같은 설정이면 같은 ChatOpenAI 객체를 돌려줍니다.
+    """
+
+    def __init__(
+        self,
+        api_key: str = None,
+        max_connections: int = 100,
+        max_keepalive: int = 20,
+        keepalive_expiry: float = 60.0,
+        max_concurrency: int = 32,
+        timeout: float = 120.0,
+        http2: bool = True,
+    ):
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.http2 = http2
+        self.rate_limits = RateLimitTracker()
+
+        self._http_client = None
+        self._async_http_client = None
+        self._openai = None
+        self._async_openai = None
+        self._chat_models = {}
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def track_in_flight(self):
+        return _InFlight(self)
+
+    def _limits(self):
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    @property
+    def http_client(self) -> httpx.Client:
+        with self._lock:
+            if self._http_client is None:
+                transport = LimitedTransport(
+                    self, http2=self.http2, limits=self._limits()
+                )
+                self._http_client = httpx.Client(
+                    transport=transport, timeout=self.timeout, follow_redirects=True
+                )
+            return self._http_client
+
+    @property
+    def async_http_client(self) -> httpx.AsyncClient:
+        with self._lock:
+            if self._async_http_client is None:
+                transport = AsyncLimitedTransport(
+                    self, http2=self.http2, limits=self._limits()
+                )
+                self._async_http_client = httpx.AsyncClient(
+                    transport=transport, timeout=self.timeout, follow_redirects=True
+                )
+            return self._async_http_client
+
+    def openai(self) -> OpenAI:
+        """공유 커넥션 풀을 쓰는 OpenAI 클라이언트."""
+        if self._openai is None:
+            client = OpenAI(api_key=self.api_key, http_client=self.http_client)
+            with self._lock:
+                self._openai = self._openai or client
+        return self._openai
+
+    def async_openai(self) -> AsyncOpenAI:
+        """공유 커넥션 풀을 쓰는 AsyncOpenAI 클라이언트."""
+        if self._async_openai is None:
+            client = AsyncOpenAI(api_key=self.api_key, http_client=self.async_http_client)
+            with self._lock:
+                self._async_openai = self._async_openai or client
+        return self._async_openai
+
+    def chat(self, model: str, temperature: float = 0.7, **kwargs) -> ChatOpenAI:
+        """
+        설정별로 캐시된 ChatOpenAI 를 반환합니다.
+        ChatOpenAI 는 상태가 없으므로 여러 요청/체인에서 같이 써도 됩니다.
+        """
+        key = json.dumps([model, temperature, kwargs], sort_keys=True, default=str)
+        chat_model = self._chat_models.get(key)
+        if chat_model is None:
+            chat_model = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                api_key=self.api_key,
+                http_client=self.http_client,
+                http_async_client=self.async_http_client,
+                **kwargs,
+            )
+            with self._lock:
+                chat_model = self._chat_models.setdefault(key, chat_model)
+        return chat_model
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {
+                "http2": self.http2,
+                "max_connections": self.max_connections,
+                "max_keepalive": self.max_keepalive,
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._in_flight,
+                "chat_models": len(self._chat_models),
+            }
+            for name, client in (
+                ("sync", self._http_client),
+                ("async", self._async_http_client),
+            ):
+                # httpcore 커넥션 풀의 현재 연결 상태
+                pool = getattr(getattr(client, "_transport", None), "_pool", None)
+                connections = getattr(pool, "connections", [])
+                stats[f"{name}_connections"] = {
+                    "open": len(connections),
+                    "idle": sum(c.is_idle() for c in connections),
+                }
+        stats["models"] = self.rate_limits.stats()
+        return stats
+
+    def close(self):
+        if self._http_client is not None:
+            self._http_client.close()
+
+    async def aclose(self):
+        self.close()
+        if self._async_http_client is not None:
+            await self._async_http_client.aclose()
+
+
+llm_provider = LLMClientProvider(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", 100)),
+    max_keepalive=int(os.getenv("LLM_MAX_KEEPALIVE", 20)),
+    keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY", 60)),
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", 32)),
+    timeout=float(os.getenv("LLM_HTTP_TIMEOUT", 120)),
+    http2=os.getenv("LLM_HTTP2", "true").lower() == "true",
+)
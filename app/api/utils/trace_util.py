@@ -0,0 +1,139 @@
+# 단계별 지연시간 측정(span)
+# - 모든 span 은 Prometheus histogram(stage_latency_seconds{stage, status}) 으로 집계되고 GET /metrics 로 노출
+# - OTEL_EXPORTER_OTLP_ENDPOINT 가 설정되어 있고 opentelemetry-sdk 가 설치되어 있으면 OTLP 로 span 도 전송
+# 집계는 프로세스(worker) 단위입니다.
+import bisect
+import functools
+import inspect
+import logging
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from threading import Lock
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def escape_label(value: str) -> str:
+    """Prometheus text format 의 라벨 값 이스케이프(\\, ", 줄바꿈)."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class LatencyHistogram:
+    """stage/status 라벨별 누적 histogram. render() 는 Prometheus text format 을 반환합니다."""
+
+    def __init__(self, name: str, description: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        # (stage, status) -> [bucket 별 count..., +Inf count], sum
+        self._counts = {}
+        self._sums = {}
+        self._lock = Lock()
+
+    def observe(self, stage: str, seconds: float, status: str = "ok"):
+        key = (stage, status)
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            counts[index] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + seconds
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for (stage, status), counts in sorted(self._counts.items()):
+                labels = f'stage="{escape_label(stage)}",status="{escape_label(status)}"'
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                cumulative += counts[-1]
+                lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+                lines.append(f"{self.name}_sum{{{labels}}} {self._sums[(stage, status)]}")
+                lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _init_tracer():
+    if not os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        return None, None
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError as e:
+        logging.warning(f"OTLP export disabled, opentelemetry is not installed: {e}")
+        return None, None
+
+    # endpoint 등 exporter 설정은 OTEL_EXPORTER_OTLP_* 환경변수를 그대로 사용
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", "final-ml")})
+    )
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+    return provider, trace.get_tracer("app")
+
+
+stage_latency = LatencyHistogram("stage_latency_seconds", "Latency of request stages in seconds.")
+_provider, _tracer = _init_tracer()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    with span("ocr.easyocr"): ... 형태로 구간 시간을 측정합니다.
+    예외가 발생하면 status="error" 로 기록하고 예외는 그대로 전달합니다.
+    """
+    otel_span = (
+        _tracer.start_as_current_span(name, attributes=attributes) if _tracer is not None else nullcontext()
+    )
+    status = "ok"
+    start = time.perf_counter()
+    with otel_span:
+        try:
+            yield
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            stage_latency.observe(name, time.perf_counter() - start, status)
+
+
+def traced(name: str):
+    """함수 전체를 span 으로 감싸는 데코레이터 (동기/비동기 함수 모두 지원)."""
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def render_metrics() -> str:
+    return stage_latency.render()
+
+
+def shutdown_tracing():
+    # 남아 있는 OTLP span 전송
+    if _provider is not None:
+        _provider.shutdown()
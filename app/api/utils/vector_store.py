@@ -0,0 +1,320 @@
+# 일기 임베딩 저장소 인터페이스
+# VECTOR_STORE=milvus(기본) 는 원격 Milvus, VECTOR_STORE=numpy 는 프로세스 내 NumPy 저장소를 사용합니다.
+# embedding 라우터(insert)와 daysummary retriever(search)가 같은 인스턴스를 공유합니다.
+import ast
+import json
+import logging
+import os
+import re
+from threading import Lock
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.api.utils.trace_util import span
+
+load_dotenv()
+
+META_FIELDS = ["user_id", "baby_id", "date", "role", "text"]
+
+
+class VectorStore:
+    """일기 임베딩 저장소의 공통 인터페이스."""
+
+    name = "vector_store"
+
+    def insert(self, entities: list[dict]) -> int:
+        """META_FIELDS + embedding 을 가진 엔티티들을 저장하고 저장한 개수를 반환합니다."""
+        raise NotImplementedError
+
+    def search(self, embedding, user_id: int, baby_id: int, expr: str = None, limit: int = 1) -> list[dict]:
+        """
+        한 가족(user_id, baby_id)의 데이터 중 expr 조건을 만족하는 top-k 를 반환합니다.
+        반환 형식: [{"date": str, "text": str, "score": float}, ...] (score 는 cosine 유사도)
+        """
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+
+class MilvusVectorStore(VectorStore):
+    def __init__(self, collection, insert_batch_size: int = 1000):
+        from app.api.embedding.utils.vecdb_util import collection_search_params
+
+        self.collection = collection
+        self.name = collection.name
+        self.insert_batch_size = insert_batch_size
+        # 컬렉션에 실제로 있는 인덱스 종류에 맞춘 검색 파라미터
+        self.search_param = collection_search_params(collection)
+
+    def insert(self, entities):
+        from app.api.embedding.utils.vecdb_util import insert_in_batches
+
+        with span("vector_store.insert", backend="milvus"):
+            return insert_in_batches(self.collection, entities, self.insert_batch_size)
+
+    def search(self, embedding, user_id, baby_id, expr=None, limit=1):
+        # partition key(user_id) 로 한 가족의 데이터만 검색하도록 필터를 항상 포함
+        family_expr = f"user_id == {int(user_id)} and baby_id == {int(baby_id)}"
+        expr = f"{family_expr} and ({expr})" if expr and expr.strip() else family_expr
+
+        with span("vector_store.search", backend="milvus"):
+            res = self.collection.search(
+                [embedding],
+                expr=expr,
+                anns_field="embedding",
+                param=self.search_param,  # COSINE 메트릭, 인덱스 종류별 검색 파라미터
+                limit=limit,
+                output_fields=["date", "text"],
+            )
+        return [
+            {"date": hit.entity.get("date"), "text": hit.entity.get("text"), "score": hit.distance}
+            for hit in res[0]
+        ]
+
+    def flush(self):
+        self.collection.flush()
+
+    def count(self):
+        return self.collection.num_entities
+
+
+# ---- Milvus 필터 표현식(expr) 을 메타데이터에 대해 정확히 평가 ----
+
+_LIKE = re.compile(r"""(\w+)\s+like\s+(['"])(.*?)\2""", re.IGNORECASE)
+_COMPARE = {
+    ast.Eq: lambda a, b: a == b,
+    ast.NotEq: lambda a, b: a != b,
+    ast.Lt: lambda a, b: a < b,
+    ast.LtE: lambda a, b: a <= b,
+    ast.Gt: lambda a, b: a > b,
+    ast.GtE: lambda a, b: a >= b,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+}
+
+
+def _like(value, pattern):
+    regex = "".join(".*" if c == "%" else "." if c == "_" else re.escape(c) for c in pattern)
+    return re.fullmatch(regex, str(value), re.DOTALL) is not None
+
+
+def compile_filter(expr: str):
+    """
+    Milvus 불리언 표현식(==, !=, <, >, in, like, and/or/not, 괄호)을 row(dict) -> bool 함수로 변환합니다.
+    지원하지 않는 구문이면 ValueError 를 발생시킵니다.
+    """
+    if not expr or not expr.strip():
+        return lambda row: True
+
+    source = expr.replace("&&", " and ").replace("||", " or ")
+    source = re.sub(r"(?<![=!<>])!(?!=)", " not ", source)
+    source = _LIKE.sub(lambda m: f"__like__({m.group(1)}, {m.group(2)}{m.group(3)}{m.group(2)})", source)
+    source = re.sub(r"\b(AND|And)\b", "and", source)
+    source = re.sub(r"\b(OR|Or)\b", "or", source)
+    source = re.sub(r"\b(NOT|Not)\b", "not", source)
+    try:
+        tree = ast.parse(source.strip(), mode="eval").body
+    except SyntaxError as e:
+        raise ValueError(f"Invalid filter expression {expr!r}: {e}")
+
+    def build(node):
+        if isinstance(node, ast.BoolOp):
+            parts = [build(value) for value in node.values]
+            if isinstance(node.op, ast.And):
+                return lambda row: all(part(row) for part in parts)
+            return lambda row: any(part(row) for part in parts)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            inner = build(node.operand)
+            return lambda row: not inner(row)
+        if isinstance(node, ast.Compare):
+            operands = [build(node.left)] + [build(c) for c in node.comparators]
+            ops = [_COMPARE[type(op)] for op in node.ops if type(op) in _COMPARE]
+            if len(ops) != len(node.ops):
+                raise ValueError(f"Unsupported operator in {expr!r}")
+
+            def compare(row):
+                values = [operand(row) for operand in operands]
+                return all(op(a, b) for op, a, b in zip(ops, values, values[1:]))
+
+            return compare
+        if isinstance(node, ast.Call) and getattr(node.func, "id", None) == "__like__":
+            field, pattern = build(node.args[0]), build(node.args[1])
+            return lambda row: _like(field(row), pattern(row))
+        if isinstance(node, ast.Name):
+            if node.id not in META_FIELDS:
+                raise ValueError(f"Unknown field {node.id!r} in {expr!r}")
+            return lambda row: row[node.id]
+        if isinstance(node, ast.Constant):
+            return lambda row: node.value
+        if isinstance(node, (ast.List, ast.Tuple)):
+            items = [build(item) for item in node.elts]
+            return lambda row: [item(row) for item in items]
+        raise ValueError(f"Unsupported syntax {type(node).__name__} in {expr!r}")
+
+    return build(tree)
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    프로세스 내 NumPy 벡터 저장소입니다.
+
+    - 임베딩은 L2 정규화한 float32 연속 행렬에 저장 -> cosine 유사도가 내적 한 번
+    - (user_id, baby_id) 별 행 인덱스를 유지 -> 필터 검색은 해당 가족 행만 matmul
+    - path 를 주면 append-only 파일(<path>.f32 벡터, <path>.jsonl 메타데이터)에 기록하고
+      재시작 시 memmap 으로 읽어 복원
+    """
+
+    name = "numpy"
+
+    def __init__(self, dimension: int, path: str = None, initial_capacity: int = 1024):
+        self.dimension = dimension
+        self.path = path
+        self._matrix = np.zeros((initial_capacity, dimension), dtype=np.float32)
+        self._size = 0
+        self._meta = []
+        self._families = {}
+        self._lock = Lock()
+
+        self._vec_file = None
+        self._meta_file = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._load()
+            self._vec_file = open(f"{path}.f32", "ab")
+            self._meta_file = open(f"{path}.jsonl", "a", encoding="utf-8")
+
+    def _load(self):
+        vec_path, meta_path = f"{self.path}.f32", f"{self.path}.jsonl"
+        if not (os.path.exists(vec_path) and os.path.exists(meta_path)):
+            return
+        with open(meta_path, encoding="utf-8") as f:
+            meta = [json.loads(line) for line in f if line.strip()]
+        rows = os.path.getsize(vec_path) // (4 * self.dimension)
+        # 벡터를 먼저 쓰고 메타데이터를 쓰므로, 중간에 끊긴 경우 짧은 쪽 기준으로 복원
+        n = min(rows, len(meta))
+        if n:
+            vectors = np.memmap(vec_path, dtype=np.float32, mode="r", shape=(rows, self.dimension))
+            self._append(np.asarray(vectors[:n]), meta[:n])
+            del vectors
+        if n < max(rows, len(meta)):
+            # 잘린 꼬리를 정리해서 이후 append 가 어긋나지 않도록 함
+            with open(vec_path, "r+b") as f:
+                f.truncate(n * 4 * self.dimension)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(m, ensure_ascii=False) + "\n" for m in meta[:n])
+        logging.info(f"Loaded {n} vectors from {self.path}")
+
+    def _append(self, vectors: np.ndarray, meta: list[dict]):
+        needed = self._size + len(vectors)
+        if needed > len(self._matrix):
+            capacity = max(needed, 2 * len(self._matrix))
+            matrix = np.zeros((capacity, self.dimension), dtype=np.float32)
+            matrix[: self._size] = self._matrix[: self._size]
+            self._matrix = matrix
+        self._matrix[self._size : needed] = vectors
+        for offset, m in enumerate(meta):
+            key = (int(m["user_id"]), int(m["baby_id"]))
+            self._families.setdefault(key, []).append(self._size + offset)
+        self._meta.extend(meta)
+        self._size = needed
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def insert(self, entities):
+        if not entities:
+            return 0
+        vectors = self._normalize(
+            np.asarray([e["embedding"] for e in entities], dtype=np.float32)
+        )
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected {self.dimension}-d embeddings, got {vectors.shape[1]}")
+        meta = [{field: e[field] for field in META_FIELDS} for e in entities]
+
+        with self._lock:
+            if self._vec_file is not None:
+                self._vec_file.write(vectors.tobytes())
+                self._vec_file.flush()
+                self._meta_file.writelines(json.dumps(m, ensure_ascii=False) + "\n" for m in meta)
+                self._meta_file.flush()
+            self._append(vectors, meta)
+        return len(entities)
+
+    def search(self, embedding, user_id, baby_id, expr=None, limit=1):
+        with span("vector_store.search", backend="numpy"):
+            return self._search(embedding, user_id, baby_id, expr, limit)
+
+    def _search(self, embedding, user_id, baby_id, expr, limit):
+        predicate = compile_filter(expr)
+        query = self._normalize(np.asarray([embedding], dtype=np.float32))[0]
+
+        with self._lock:
+            rows = [
+                i
+                for i in self._families.get((int(user_id), int(baby_id)), [])
+                if predicate(self._meta[i])
+            ]
+            if not rows:
+                return []
+            rows = np.asarray(rows)
+            scores = self._matrix[rows] @ query
+
+        k = min(limit, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            {
+                "date": self._meta[rows[i]]["date"],
+                "text": self._meta[rows[i]]["text"],
+                "score": float(scores[i]),
+            }
+            for i in top
+        ]
+
+    def flush(self):
+        with self._lock:
+            for f in (self._vec_file, self._meta_file):
+                if f is not None:
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    def count(self):
+        return self._size
+
+
+_store = None
+_store_lock = Lock()
+
+
+def get_vector_store() -> VectorStore:
+    """환경변수 설정에 따라 프로세스 전체에서 공유하는 저장소를 생성/반환합니다."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            backend = os.getenv("VECTOR_STORE", "milvus").lower()
+            dimension = int(os.getenv("EMBEDDING_DIMENSION"))
+            if backend == "numpy":
+                _store = NumpyVectorStore(dimension, path=os.getenv("VECTOR_STORE_PATH"))
+            elif backend == "milvus":
+                from app.api.embedding.utils.vecdb_util import prepare_vecdb
+
+                collection = prepare_vecdb(
+                    os.getenv("COLLECTION_NAME"),
+                    dimension,
+                    os.getenv("MILVUS_HOST"),
+                    os.getenv("MILVUS_PORT"),
+                )
+                collection.load()
+                _store = MilvusVectorStore(
+                    collection, int(os.getenv("MILVUS_INSERT_BATCH_SIZE", 1000))
+                )
+            else:
+                raise ValueError(f"Unknown VECTOR_STORE {backend}, use milvus or numpy")
+        return _store
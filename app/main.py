@@ -1,4 +1,7 @@
-from fastapi import FastAPI
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.babydiary import babydiary
@@ -7,6 +10,8 @@ from app.api.daysummary import daysumm
 from app.api.fairytale import fairytale
 from app.api.embedding import embedd
 from app.api.audiomemo import audiomemo
+from app.api.utils.llm_util import llm_provider
+from app.api.utils.trace_util import render_metrics, shutdown_tracing, stage_latency
 import os
 
 
@@ -20,6 +25,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 요청 전체 처리 시간 (route path 별)
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = "error"
+    try:
+        response = await call_next(request)
+        status = "ok" if response.status_code < 500 else "error"
+        return response
+    finally:
+        route = request.scope.get("route")
+        if route is not None:
+            stage_latency.observe(f"http {request.method} {route.path}", time.perf_counter() - start, status)
+
+
 app.include_router(babydiary.router)
 app.include_router(calendar.router)
 app.include_router(daysumm.router)
@@ -27,6 +47,24 @@ app.include_router(fairytale.router)
 app.include_router(embedd.router)
 app.include_router(audiomemo.router)
 
+
+# LLM 커넥션 풀 / 모델별 rate limit 상태 조회
+@app.get("/llm/stats")
+def llm_stats():
+    return llm_provider.stats()
+
+
+# 단계별 지연시간 histogram (Prometheus text format)
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.on_event("shutdown")
+async def close_llm_clients():
+    await llm_provider.aclose()
+    shutdown_tracing()
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,174 @@
+import importlib
+
+import pytest
+
+from app.api.calendar.BetterOCR.betterocr.consensus import (
+    ConsensusLine,
+    ConsensusMerger,
+    align_boxes,
+    align_lines,
+    split_lines,
+)
+
+
+def rect(x1, y1, x2, y2):
+    return [[x1, y1], [x2, y1], [x2, y2], [x1, y2]]
+
+
+def test_split_lines_accepts_literal_and_real_newlines():
+    assert split_lines("가\\n 나 \n\n다") == ["가", "나", "다"]
+    assert split_lines("No text detected.") == []
+    assert split_lines(None) == []
+
+
+def test_align_lines_pairs_similar_lines_in_order():
+    base = ["3월 2일 입학식", "3월 5일 소풍", "3월 9일 생일잔치"]
+    other = ["3월2일 입학식", "잡음", "3월 9일 생일잔치"]
+    assert align_lines(base, other) == [(0, 0), (2, 2)]
+
+
+def test_align_lines_ignores_lines_below_min_similarity():
+    assert align_lines(["abcdef"], ["uvwxyz"]) == []
+    assert align_lines(["abcdef"], ["abcxyz"], min_similarity=0.4) == [(0, 0)]
+
+
+def test_align_lines_is_monotonic():
+    # a crossing match would reorder the document
+    base = ["입학식 안내", "가을 소풍"]
+    other = ["가을 소풍", "입학식 안내"]
+    assert len(align_lines(base, other)) == 1
+
+
+def test_align_boxes_prefers_best_overlap_and_uses_each_box_once():
+    base = [{"box": rect(0, 0, 10, 10)}, {"box": rect(20, 0, 30, 10)}]
+    other = [
+        {"box": rect(21, 0, 31, 10)},
+        {"box": rect(1, 0, 11, 10)},
+        {"box": rect(2, 0, 12, 10)},
+    ]
+    assert align_boxes(base, other) == [(0, 1), (1, 0)]
+
+
+def test_align_boxes_skips_disjoint_boxes():
+    assert align_boxes([{"box": rect(0, 0, 10, 10)}], [{"box": rect(50, 50, 60, 60)}]) == []
+
+
+def test_vote_agrees_when_majority_reads_every_character():
+    line = ConsensusLine(["소풍 가는 날", "소풍가는 날", "소풍 기는 날"])
+    line.vote(3)
+    assert line.text in ("소풍 가는 날", "소풍가는 날")
+    assert line.agreed
+    assert line.agreed_chars == line.total_chars == len("소풍가는날")
+
+
+def test_vote_disputes_characters_without_majority():
+    line = ConsensusLine(["abc", "abd", "abe"])
+    line.vote(3)
+    assert not line.agreed
+    assert (line.agreed_chars, line.total_chars) == (2, 3)
+
+
+def test_vote_counts_missing_engines_against_the_line():
+    line = ConsensusLine(["only one engine", None, None])
+    line.vote(3)
+    assert not line.agreed
+    assert line.agreed_chars == 0
+
+
+def test_merge_text_keeps_lines_seen_by_one_engine():
+    merged = ConsensusMerger().merge_text(["a line\\nshared", "shared", "shared\\nextra"])
+    assert [line.text for line in merged.lines] == ["a line", "shared", "extra"]
+    assert merged.disputed == [0, 2]
+    assert merged.text({0: ""}) == "shared\nextra"
+
+
+def test_merge_boxes_aligns_by_overlap():
+    results = [
+        [{"box": rect(0, 0, 10, 10), "text": "hello"}],
+        [{"box": rect(1, 1, 10, 10), "text": "hello"}, {"box": rect(0, 50, 9, 60), "text": " "}],
+    ]
+    merged = ConsensusMerger().merge_boxes(results)
+    assert merged.items() == [{"box": rect(0, 0, 10, 10), "text": "hello"}]
+    assert merged.agreement == 1.0
+
+
+@pytest.mark.parametrize(
+    "results, skip",
+    [
+        (["같은 줄\\n둘째 줄", "같은 줄\\n둘째 줄", "같은 줄\\n둘째 줄"], True),
+        (["같은 줄\\n둘째 줄", "같은 줄\\n둘쨰 줄", "같은 줄\\n둘째 즐"], True),
+        (["abc", "abd", "abe"], False),
+        (["No text detected.", "", ""], False),
+    ],
+)
+def test_should_skip(results, skip):
+    merger = ConsensusMerger(skip_threshold=0.95)
+    assert merger.should_skip(merger.merge_text(results)) is skip
+
+
+def test_stats_average_per_mode():
+    merger = ConsensusMerger()
+    merger.record("skipped", 1.0, 0, 0.01)
+    merger.record("compact", 0.5, 100, 0.03, 1.0)
+    merger.record("compact", 0.7, 300, 0.01, 2.0)
+    stats = merger.stats()["modes"]
+    assert stats["skipped"]["count"] == 1
+    assert stats["compact"] == {
+        "count": 2,
+        "avg_agreement": 0.6,
+        "avg_prompt_tokens": 200.0,
+        "avg_consensus_seconds": 0.02,
+        "avg_llm_seconds": 1.5,
+    }
+
+
+class FakeChatModel:
+    def __init__(self, content):
+        self.content = content
+        self.prompts = []
+
+    def __call__(self, messages):
+        self.prompts.append(messages[0].content)
+        return self
+
+
+@pytest.fixture
+def agreeing_engines(monkeypatch):
+    # the package re-exports the `detect` function under the module's name
+    detect = importlib.import_module("app.api.calendar.BetterOCR.betterocr.detect")
+    monkeypatch.setattr(detect, "load_image", lambda image, adaptive: None)
+    monkeypatch.setattr(
+        detect, "run_jobs", lambda *args: ["뉴스 기사 제목\\n본문", "뉴스 기사 제목\\n본문"]
+    )
+    return detect
+
+
+def test_skipped_merge_still_asks_if_it_is_a_schedule(agreeing_engines):
+    chat_model = FakeChatModel('{"data":"no"}')
+    with pytest.raises(ValueError):
+        agreeing_engines.detect_text(
+            "image.png", ["ko"], cache=None, chat_model=chat_model, consensus=ConsensusMerger()
+        )
+    assert "yes" in chat_model.prompts[0] and "본문" in chat_model.prompts[0]
+
+
+def test_skipped_merge_returns_voted_text(agreeing_engines):
+    merger = ConsensusMerger()
+    text = agreeing_engines.detect_text(
+        "image.png", ["ko"], cache=None, chat_model=FakeChatModel('{"data":"yes"}'), consensus=merger
+    )
+    assert text == "뉴스 기사 제목\n본문"
+    assert merger.stats()["modes"]["checked"]["count"] == 1
+
+
+def test_skipped_merge_without_schedule_check(agreeing_engines):
+    chat_model = FakeChatModel("")
+    text = agreeing_engines.detect_text(
+        "image.png",
+        ["ko"],
+        cache=None,
+        chat_model=chat_model,
+        consensus=ConsensusMerger(check_schedule=False),
+    )
+    assert text == "뉴스 기사 제목\n본문"
+    assert chat_model.prompts == []
@@ -0,0 +1,130 @@
+from datetime import date
+
+import pytest
+
+from app.api.calendar.utils.date_util import TemporalExpressionParser
+
+# 2026-10-15 은 목요일 (이번 주: 10-12 월 ~ 10-18 일)
+TODAY = date(2026, 10, 15)
+
+
+def d(month, day, year=2026):
+    return date(year, month, day)
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        # 상대 일
+        ("오늘 뭐 했어", (d(10, 15), d(10, 15))),
+        ("어제", (d(10, 14), d(10, 14))),
+        ("그저께", (d(10, 13), d(10, 13))),
+        ("모레", (d(10, 17), d(10, 17))),
+        ("3일 전", (d(10, 12), d(10, 12))),
+        ("최근 7일", (d(10, 9), d(10, 15))),
+        ("어젯밤에 뭐 했지", (d(10, 14), d(10, 14))),
+        ("엊저녁에", (d(10, 14), d(10, 14))),
+        ("그저께 밤", (d(10, 13), d(10, 13))),
+        ("오늘 아침", (d(10, 15), d(10, 15))),
+        # 고유어 날수
+        ("하루 전", (d(10, 14), d(10, 14))),
+        ("사흘 전", (d(10, 12), d(10, 12))),
+        ("보름 전", (d(9, 30), d(9, 30))),
+        ("이틀 동안", (d(10, 14), d(10, 15))),
+        ("열흘 뒤", (d(10, 25), d(10, 25))),
+        # 상대 주/요일
+        ("지난주", (d(10, 5), d(10, 11))),
+        ("이번 주", (d(10, 12), d(10, 18))),
+        ("다음주", (d(10, 19), d(10, 25))),
+        ("지난주 금요일", (d(10, 9), d(10, 9))),
+        ("지난 금요일", (d(10, 9), d(10, 9))),
+        ("금요일", (d(10, 9), d(10, 9))),
+        ("목요일", (d(10, 15), d(10, 15))),
+        ("주말", (d(10, 10), d(10, 11))),
+        ("2주 전", (d(9, 28), d(10, 4))),
+        ("지난 2주간", (d(10, 2), d(10, 15))),
+        ("일주일 전에", (d(10, 5), d(10, 11))),
+        ("최근 일주일", (d(10, 9), d(10, 15))),
+        # 상대 달/해
+        ("이번 달", (d(10, 1), d(10, 31))),
+        ("이 달에", (d(10, 1), d(10, 31))),
+        ("한 달 전에", (d(9, 1), d(9, 30))),
+        ("두 달 전", (d(8, 1), d(8, 31))),
+        ("3 달 전", (d(7, 1), d(7, 31))),
+        ("지난 한 달 동안", (d(9, 16), d(10, 15))),
+        ("지난달", (d(9, 1), d(9, 30))),
+        ("지지난달", (d(8, 1), d(8, 31))),
+        ("지난달 3일", (d(9, 3), d(9, 3))),
+        ("3개월 전", (d(7, 1), d(7, 31))),
+        ("작년", (d(1, 1, 2025), d(12, 31, 2025))),
+        # 절대 날짜
+        ("9월 3일", (d(9, 3), d(9, 3))),
+        ("9/3", (d(9, 3), d(9, 3))),
+        ("12월 24일", (d(12, 24, 2025), d(12, 24, 2025))),
+        ("2025년 12월 25일", (d(12, 25, 2025), d(12, 25, 2025))),
+        ("2026-02-28", (d(2, 28), d(2, 28))),
+        ("12월", (d(12, 1, 2025), d(12, 31, 2025))),
+        ("5일", (d(10, 5), d(10, 5))),
+        ("20일", (d(9, 20), d(9, 20))),
+        # 여러 표현은 하나의 범위로
+        ("9월 3일부터 9월 5일까지", (d(9, 3), d(9, 5))),
+        # 시간 표현 없음
+        ("아이가 좋아하는 음식", None),
+        ("아이 달리기 대회", None),
+    ],
+)
+def test_parse(query, expected):
+    assert TemporalExpressionParser(TODAY).parse(query) == expected
+
+
+@pytest.mark.parametrize(
+    "query, today",
+    [
+        ("2월 30일", date(2026, 10, 18)),
+        ("2월 30일에 뭐 했지", date(2026, 10, 18)),
+        ("지난달 31일", date(2026, 3, 31)),
+        ("31일", date(2026, 3, 15)),
+        ("2/30", date(2026, 10, 18)),
+    ],
+)
+def test_invalid_dates_are_not_reparsed(query, today):
+    # 잘못된 날짜의 일부("2월", "30일")를 뒤 규칙이 다시 해석하지 않고 원문 그대로 남김
+    parser = TemporalExpressionParser(today)
+    ranges, rest = parser.extract(query)
+    assert ranges == []
+    assert rest == query
+    assert parser.has_unparsed(rest)
+
+
+def test_invalid_date_keeps_other_expressions():
+    parser = TemporalExpressionParser(date(2026, 10, 18))
+    ranges, rest = parser.extract("어제랑 2월 30일")
+    assert ranges == [(d(10, 17), d(10, 17))]
+    assert "2월 30일" in rest
+
+
+@pytest.mark.parametrize(
+    "query, unparsed",
+    [
+        ("어제 아이 기분 어땠어", False),
+        ("지난주 일기 보여줘", False),
+        ("아이가 좋아하는 음식", False),
+        ("며칠 전에 뭐 했지", True),
+        ("크리스마스에 뭐 했어", True),
+        ("추석 연휴 때", True),
+        ("그날 아이가 뭐라고 했지", True),
+        ("last week", True),
+        ("어젯밤에 뭐 했지", False),
+        ("한 달 전에", False),
+        ("아이랑 전화했어", False),
+        ("요즘 아이가 좋아하는 것", True),
+        ("최근에 뭐 했어", True),
+        ("아침에 뭐 먹었어", True),
+        ("식사 후에 뭐 했지", True),
+        ("방학 동안", True),
+    ],
+)
+def test_has_unparsed(query, unparsed):
+    parser = TemporalExpressionParser(TODAY)
+    _, rest = parser.extract(query)
+    assert parser.has_unparsed(rest) is unparsed
@@ -0,0 +1,136 @@
+import asyncio
+import importlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+# the package re-exports the `detect` function under the module's name
+detect = importlib.import_module("app.api.calendar.BetterOCR.betterocr.detect")
+
+IMAGE = np.full((32, 32, 3), 255, np.uint8)
+
+
+def make_job(name, func):
+    func.__name__ = name
+    return func
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        yield pool
+
+
+def use_jobs(monkeypatch, jobs):
+    monkeypatch.setattr(detect, "get_jobs", lambda languages, boxes=False: jobs)
+
+
+def concurrent_jobs(count):
+    # 모든 엔진이 동시에 실행 중이어야 barrier 를 통과
+    barrier = threading.Barrier(count, timeout=5)
+
+    def engine(i):
+        def job(options):
+            barrier.wait()
+            return f"engine {i}"
+
+        return make_job(f"job_{i}", job)
+
+    return [engine(i) for i in range(count)]
+
+
+def test_detect_async_runs_engines_concurrently(monkeypatch, executor):
+    use_jobs(monkeypatch, concurrent_jobs(2))
+    results = asyncio.run(
+        detect.detect_async(IMAGE, ["ko"], cache=None, executor=executor, timeout=10)
+    )
+    assert results == ["engine 0", "engine 1"]
+
+
+def test_detect_text_async_runs_engines_concurrently(monkeypatch, executor):
+    use_jobs(monkeypatch, concurrent_jobs(2))
+    prompts = []
+
+    class ChatModel:
+        async def ainvoke(self, messages):
+            prompts.append(messages[0].content)
+            return type("Response", (), {"content": '{"data": "merged"}'})()
+
+    text = asyncio.run(
+        detect.detect_text_async(
+            IMAGE, ["ko"], cache=None, executor=executor, chat_model=ChatModel(), timeout=10
+        )
+    )
+    assert text == "merged"
+    assert "engine 0" in prompts[0] and "engine 1" in prompts[0]
+
+
+def test_failing_engine_cancels_engines_not_started(monkeypatch, executor):
+    started = []
+
+    def fail(options):
+        started.append("fail")
+        raise RuntimeError("engine crashed")
+
+    def slow(options):
+        started.append("slow")
+        time.sleep(0.2)
+        return "slow"
+
+    def queued(i):
+        def job(options):
+            started.append(f"queued {i}")
+            time.sleep(0.2)
+            return "queued"
+
+        return make_job(f"job_queued_{i}", job)
+
+    jobs = [make_job("job_fail", fail), make_job("job_slow", slow)] + [queued(i) for i in range(4)]
+    use_jobs(monkeypatch, jobs)
+
+    with pytest.raises(RuntimeError, match="engine crashed"):
+        asyncio.run(detect.detect_async(IMAGE, ["ko"], cache=None, executor=executor))
+    executor.shutdown(wait=True)
+    # fail 이 끝난 워커가 바로 집어 간 하나를 빼고, 대기 중이던 엔진은 실행되지 않음
+    assert started[:2] == ["fail", "slow"] or started[:2] == ["slow", "fail"]
+    assert len(started) <= 3
+
+
+def test_detect_async_timeout(monkeypatch, executor):
+    use_jobs(monkeypatch, [make_job("job_sleep", lambda options: time.sleep(0.5) or "late")])
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(detect.detect_async(IMAGE, ["ko"], cache=None, executor=executor, timeout=0.05))
+
+
+def test_detect_returns_boxes_in_original_pixels_without_touching_the_cache(monkeypatch):
+    class Cache:
+        def __init__(self):
+            self.items = {}
+
+        def get(self, key):
+            return self.items.get(key)
+
+        def set(self, key, value):
+            self.items[key] = value
+
+    image = detect.load_image(IMAGE)
+    image.scale = 2
+    monkeypatch.setattr(detect, "load_image", lambda path, adaptive: image)
+    boxes = [{"box": [[1, 2], [3, 2], [3, 4], [1, 4]], "text": "소풍"}]
+    use_jobs(monkeypatch, [make_job("job_boxes", lambda options: boxes)])
+    cache = Cache()
+
+    results = detect.detect(IMAGE, ["ko"], boxes=True, cache=cache)
+
+    assert results == [[{"box": [[2, 4], [6, 4], [6, 8], [2, 8]], "text": "소풍"}]]
+    assert list(cache.items.values()) == [[{"box": [[1, 2], [3, 2], [3, 4], [1, 4]], "text": "소풍"}]]
+
+
+def test_detect_exported_entry_points():
+    from app.api.calendar.BetterOCR import betterocr
+
+    assert betterocr.detect is detect.detect
+    assert asyncio.iscoroutinefunction(betterocr.detect_async)
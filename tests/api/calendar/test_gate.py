@@ -0,0 +1,90 @@
+import importlib
+import json
+
+import numpy as np
+import pytest
+
+from app.api.calendar.BetterOCR.betterocr.gate import (
+    DocumentGate,
+    LogisticGate,
+    NotADocumentError,
+    heatmap_features,
+)
+
+detect = importlib.import_module("app.api.calendar.BetterOCR.betterocr.detect")
+
+
+def features(density, chars=0):
+    return {"density": density, "chars": chars, "peak": 1.0, "mean": density}
+
+
+def test_heatmap_features_counts_character_blobs():
+    heatmap = np.zeros((20, 20), dtype=np.float32)
+    heatmap[2:4, 2:4] = 0.9
+    heatmap[10:12, 10:13] = 0.8
+    heatmap[18, 18] = 0.9  # single-pixel noise
+    result = heatmap_features(heatmap)
+    assert result["chars"] == 2
+    assert result["density"] == pytest.approx(11 / 400)
+    assert result["peak"] == pytest.approx(0.9)
+
+
+def test_gate_rejects_below_threshold():
+    gate = DocumentGate(threshold=0.01)
+    gate.check(features(0.02))
+    with pytest.raises(NotADocumentError):
+        gate.check(features(0.005))
+    assert gate.stats()["checked"] == 2
+    assert gate.stats()["rejected"] == 1
+
+
+def test_log_only_gate_never_rejects(tmp_path):
+    log_path = tmp_path / "gate.jsonl"
+    gate = DocumentGate(threshold=0.01, log_path=str(log_path), enforce=False)
+    gate.check(features(0.0), elapsed=0.1, digest="abc")
+
+    assert gate.stats()["rejected"] == 1
+    record = json.loads(log_path.read_text().strip())
+    assert record["accepted"] is False
+    assert record["enforced"] is False
+    assert record["digest"] == "abc"
+    assert record["density"] == 0.0
+
+
+def test_logistic_gate_from_json(tmp_path):
+    path = tmp_path / "gate.json"
+    path.write_text(
+        json.dumps({"bias": -2.0, "weights": {"chars": 1.0}, "log_features": ["chars"]})
+    )
+    classifier = LogisticGate.from_json(str(path))
+    assert classifier(features(0.0, chars=0)) == pytest.approx(1 / (1 + np.exp(2.0)))
+    assert classifier(features(0.0, chars=100)) > 0.9
+
+    gate = DocumentGate(classifier=classifier)
+    assert gate.threshold == 0.5
+    gate.check(features(0.0, chars=100))
+    with pytest.raises(NotADocumentError):
+        gate.check(features(0.0, chars=1))
+
+
+def test_gate_fails_open_when_the_heatmap_job_fails():
+    def runner(job, options):
+        raise RuntimeError("detector crashed")
+
+    gate = DocumentGate(threshold=0.5)
+    detect.check_document(gate, runner, {"digest": None})
+    assert gate.stats()["failed"] == 1
+    assert gate.stats()["checked"] == 0
+
+
+def test_check_document_passes_gate_options_to_the_job():
+    seen = {}
+
+    def runner(job, options):
+        seen.update(options["gate"])
+        return features(0.0)
+
+    gate = DocumentGate(threshold=0.5, canvas_size=320)
+    with pytest.raises(NotADocumentError):
+        detect.check_document(gate, runner, {"digest": "abc"})
+    assert seen == {"canvas_size": 320, "low_text": 0.4}
@@ -0,0 +1,89 @@
+import cv2
+import numpy as np
+import pytest
+
+from app.api.calendar.BetterOCR.betterocr.image import (
+    MAX_CANVAS_SIZE,
+    MIN_CANVAS_SIZE,
+    MIN_TEXT_HEIGHT,
+    DecodedImage,
+    estimate_text_height,
+    plan_decode,
+)
+
+
+@pytest.mark.parametrize(
+    "text_height, scale",
+    [
+        (None, 1),
+        (12, 1),
+        (39, 1),
+        (40, 2),
+        (79, 2),
+        (80, 4),
+        (159, 4),
+        (160, 8),
+        (400, 8),
+    ],
+)
+def test_plan_decode_picks_largest_scale_keeping_min_text_height(text_height, scale):
+    assert plan_decode(text_height, 4000)[0] == scale
+    if text_height is not None:
+        assert text_height / scale >= MIN_TEXT_HEIGHT or scale == 1
+
+
+@pytest.mark.parametrize(
+    "text_height, long_side, canvas_size, mag_ratio",
+    [
+        (None, 4000, MAX_CANVAS_SIZE, 1.0),
+        # 40px -> 1/2 디코드에서 20px, 32px 가 되도록 1.6배
+        (40, 2000, 1600, 1.6),
+        # 작은 글자는 최대 2배까지만 확대
+        (8, 1000, MAX_CANVAS_SIZE, 2.0),
+        # 큰 글자는 축소하지 않고 canvas 로 줄임
+        (32, 1000, 1000, 1.0),
+        (64, 400, MIN_CANVAS_SIZE, 1.0),
+    ],
+)
+def test_plan_decode_sizes_canvas_for_target_height(text_height, long_side, canvas_size, mag_ratio):
+    _, planned_canvas, planned_mag = plan_decode(text_height, long_side)
+    assert planned_canvas == canvas_size
+    assert planned_mag == pytest.approx(mag_ratio)
+
+
+def render_schedule(glyph_scale, rows=24, size=(2400, 1800)):
+    """가짜 일정표: 같은 크기의 글자 줄을 여러 줄 그린 흰 배경 이미지."""
+    image = np.full((size[1], size[0]), 255, np.uint8)
+    (_, height), _ = cv2.getTextSize("0", cv2.FONT_HERSHEY_SIMPLEX, glyph_scale, 2)
+    for row in range(rows):
+        y = int((row + 1) * height * 2.2)
+        if y >= size[1]:
+            break
+        for col in range(0, size[0] - height * 8, height * 9):
+            cv2.putText(image, f"{row % 9}/{col % 7 + 1} 12", (col + 10, y),
+                        cv2.FONT_HERSHEY_SIMPLEX, glyph_scale, 0, 2)
+    return image, height
+
+
+def test_estimate_text_height_tracks_glyph_size():
+    for glyph_scale in (1.0, 2.0, 3.0):
+        image, height = render_schedule(glyph_scale)
+        assert estimate_text_height(image) == pytest.approx(height, rel=0.35)
+
+
+def test_estimate_text_height_needs_text():
+    assert estimate_text_height(np.full((1000, 1000), 255, np.uint8)) is None
+
+
+@pytest.mark.parametrize("glyph_scale", [1.0, 2.0, 4.0])
+def test_adaptive_decode_keeps_glyphs_readable(glyph_scale):
+    image, height = render_schedule(glyph_scale)
+    ok, data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    assert ok
+
+    decoded = DecodedImage.from_bytes_adaptive(data.tobytes())
+
+    assert decoded.grey.shape[1] == image.shape[1] // decoded.scale
+    # 축소 디코드 후에도 글자 높이가 MIN_TEXT_HEIGHT 근처 이상이어야 함
+    if decoded.scale > 1:
+        assert estimate_text_height(decoded.grey) >= MIN_TEXT_HEIGHT * 0.75
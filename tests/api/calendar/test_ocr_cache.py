@@ -0,0 +1,129 @@
+import cv2
+import numpy as np
+import pytest
+
+from app.api.calendar.BetterOCR.betterocr import cache as cache_module
+from app.api.calendar.BetterOCR.betterocr.cache import OCRCache, image_digest, make_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "ocr" / "cache.sqlite")
+
+
+def test_hit_and_miss_are_counted():
+    cache = OCRCache()
+    assert cache.get("k") is None
+    cache.set("k", ["3월 2일", {"box": [[1, 2]]}])
+    assert cache.get("k") == ["3월 2일", {"box": [[1, 2]]}]
+    assert cache.stats() == {"hits": 1, "misses": 1, "memory_entries": 1}
+
+
+def test_memory_lru_evicts_least_recently_used():
+    cache = OCRCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert [cache.get(key) for key in ("a", "b", "c")] == [1, None, 3]
+
+
+def test_disk_tier_survives_restart_and_refills_memory(db_path):
+    OCRCache(path=db_path).set("k", {"text": "소풍"})
+    cache = OCRCache(path=db_path)
+    assert cache.get("k") == {"text": "소풍"}
+    assert cache.stats()["memory_entries"] == 1
+
+
+@pytest.mark.parametrize("with_disk", [False, True])
+def test_entries_expire_after_ttl(with_disk, db_path, clock):
+    cache = OCRCache(path=db_path if with_disk else None, ttl=60)
+    cache.set("k", "value")
+
+    clock[0] += 60
+    assert cache.get("k") == "value"
+    clock[0] += 1
+    assert cache.get("k") is None
+    if with_disk:
+        assert cache.stats()["disk_entries"] == 0
+
+
+def test_expired_disk_entry_is_not_served_after_restart(db_path, clock):
+    OCRCache(path=db_path, ttl=60).set("k", "old")
+    clock[0] += 61
+    assert OCRCache(path=db_path, ttl=60).get("k") is None
+
+
+def test_set_drops_expired_disk_rows(db_path, clock):
+    cache = OCRCache(path=db_path, ttl=60)
+    cache.set("old", "value")
+    clock[0] += 61
+    cache.set("new", "value")
+    assert cache.stats()["disk_entries"] == 1
+
+
+def test_disk_tier_evicts_least_recently_accessed_over_size(db_path, clock):
+    value = "x" * 100  # JSON 으로 102 bytes
+    cache = OCRCache(path=db_path, max_disk_bytes=250, max_entries=0)
+    cache.set("a", value)
+    clock[0] += 1
+    cache.set("b", value)
+    clock[0] += 1
+    assert cache.get("a") == value  # a 를 최근 접근으로 갱신
+    clock[0] += 1
+    cache.set("c", value)
+
+    assert cache.stats()["disk_entries"] == 2
+    assert cache.stats()["disk_bytes"] <= 250
+    assert cache.get("b") is None
+    assert cache.get("a") == value
+    assert cache.get("c") == value
+
+
+def test_clear_empties_both_tiers(db_path):
+    cache = OCRCache(path=db_path)
+    cache.set("k", 1)
+    cache.clear()
+    assert cache.get("k") is None
+    assert cache.stats()["disk_entries"] == 0
+
+
+def make_image(seed=0, shape=(40, 60, 3)):
+    return np.random.default_rng(seed).integers(0, 256, shape, dtype=np.uint8)
+
+
+def test_image_digest_depends_on_pixels_not_source(tmp_path):
+    image = make_image()
+    path = str(tmp_path / "schedule.png")
+    cv2.imwrite(path, image)
+    with open(path, "rb") as f:
+        data = f.read()
+
+    digest = image_digest(image)
+    assert image_digest(path) == digest
+    assert image_digest(data) == digest
+    copy = str(tmp_path / "renamed.png")
+    cv2.imwrite(copy, image)
+    assert image_digest(copy) == digest
+
+
+def test_image_digest_changes_with_pixels_and_shape():
+    image = make_image()
+    changed = image.copy()
+    changed[0, 0, 0] ^= 1
+    assert image_digest(changed) != image_digest(image)
+    # 같은 바이트라도 모양이 다르면 다른 이미지
+    assert image_digest(image.reshape(60, 40, 3)) != image_digest(image)
+
+
+def test_make_key_is_order_independent_for_dict_options():
+    assert make_key("digest", {"a": 1, "b": 2}) == make_key("digest", {"b": 2, "a": 1})
+    assert make_key("digest", ["ko", "en"]) != make_key("digest", ["en", "ko"])
+    assert make_key("digest", "job_easy_ocr") != make_key("other", "job_easy_ocr")
@@ -0,0 +1,131 @@
+import asyncio
+import importlib
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.calendar.models import ImageInput
+from app.api.calendar.utils.pool_util import AdmissionLimit, WorkerPool
+
+
+@pytest.fixture
+def calendar(monkeypatch):
+    # 모듈 로드 시 LLM 클라이언트를 만들므로 네트워크 없이 만들 수 있는 설정을 넣음
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("LLM_MODEL", "gpt-4o-mini")
+    module = importlib.import_module("app.api.calendar.calendar")
+    monkeypatch.setattr(module, "ocr_admission", AdmissionLimit("ocr", max_requests=1))
+    monkeypatch.setattr(module, "chain", SimpleNamespace(ainvoke=fake_chain))
+    return module
+
+
+async def fake_chain(inputs):
+    return {"events": [{"date": "03", "description": inputs["ocr_result"]}]}
+
+
+def image_input():
+    return ImageInput(user_id=1, baby_id=2, image_path="/tmp/schedule.png")
+
+
+def test_request_runs_to_completion(calendar, monkeypatch):
+    async def detect(*args, **kwargs):
+        return "3일 소풍"
+
+    monkeypatch.setattr(calendar.betterocr, "detect_text_async", detect)
+    result = asyncio.run(calendar.process_image(image_input()))
+    assert result == {"events": [{"date": "03", "description": "3일 소풍"}], "user_id": 1, "baby_id": 2}
+    assert calendar.ocr_admission.stats()["active"] == 0
+
+
+def test_busy_route_rejects_new_requests_with_503(calendar, monkeypatch):
+    state = {}
+
+    async def detect(*args, **kwargs):
+        state["started"].set()
+        await state["release"].wait()
+        return "3일 소풍"
+
+    monkeypatch.setattr(calendar.betterocr, "detect_text_async", detect)
+
+    async def scenario():
+        state["started"], state["release"] = asyncio.Event(), asyncio.Event()
+        first = asyncio.create_task(calendar.process_image(image_input()))
+        await state["started"].wait()
+        with pytest.raises(HTTPException) as rejected:
+            await calendar.process_image(image_input())
+        state["release"].set()
+        return rejected.value, await first
+
+    rejected, result = asyncio.run(scenario())
+    assert rejected.status_code == 503
+    assert rejected.headers == {"Retry-After": "5"}
+    # 먼저 받아들인 요청은 끝까지 처리
+    assert result["user_id"] == 1
+    assert calendar.ocr_admission.stats() == {"name": "ocr", "max_requests": 1, "active": 0, "rejected": 1}
+
+
+def test_admitted_request_is_not_rejected_by_its_own_tasks(calendar, monkeypatch):
+    # 요청 하나가 작업을 여러 개 제출해도 작업 풀은 503 을 내지 않음
+    pool = WorkerPool("ocr", max_workers=1)
+
+    async def detect(*args, executor, **kwargs):
+        loop = asyncio.get_running_loop()
+        parts = await asyncio.gather(
+            *(loop.run_in_executor(executor, time.sleep, 0.01) for _ in range(8))
+        )
+        return f"{len(parts)} parts"
+
+    monkeypatch.setattr(calendar, "ocr_pool", pool)
+    monkeypatch.setattr(calendar.betterocr, "detect_text_async", detect)
+    assert asyncio.run(calendar.process_image(image_input()))["events"][0]["description"] == "8 parts"
+    pool.shutdown()
+
+
+def test_ocr_timeout_returns_504(calendar, monkeypatch):
+    async def detect(*args, **kwargs):
+        raise asyncio.TimeoutError
+
+    monkeypatch.setattr(calendar.betterocr, "detect_text_async", detect)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(calendar.process_image(image_input()))
+    assert error.value.status_code == 504
+    assert "ocr stage" in error.value.detail
+    assert calendar.ocr_admission.stats()["active"] == 0
+
+
+def test_llm_timeout_returns_504(calendar, monkeypatch):
+    async def detect(*args, **kwargs):
+        return "3일 소풍"
+
+    async def slow_chain(inputs):
+        await asyncio.sleep(1)
+
+    monkeypatch.setattr(calendar.betterocr, "detect_text_async", detect)
+    monkeypatch.setattr(calendar, "chain", SimpleNamespace(ainvoke=slow_chain))
+    monkeypatch.setattr(calendar, "LLM_TIMEOUT", 0.01)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(calendar.process_image(image_input()))
+    assert error.value.status_code == 504
+    assert "llm stage" in error.value.detail
+
+
+def test_worker_pool_timeout_returns_504():
+    pool = WorkerPool("s3", max_workers=1, max_queue=1)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(pool.run(time.sleep, 0.2, timeout=0.01))
+    assert error.value.status_code == 504
+    pool.shutdown()
+
+
+def test_bounded_worker_pool_rejects_when_queue_is_full():
+    pool = WorkerPool("s3", max_workers=1, max_queue=1)
+    futures = [pool.submit(time.sleep, 0.1) for _ in range(2)]
+    with pytest.raises(HTTPException) as error:
+        pool.submit(time.sleep, 0)
+    assert error.value.status_code == 503
+    for future in futures:
+        future.result()
+    assert pool.stats()["pending"] == 0
+    pool.shutdown()
@@ -0,0 +1,105 @@
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from app.api.calendar.BetterOCR.betterocr.image import DecodedImage
+from app.api.calendar.BetterOCR.betterocr.process_pool import EngineProcessPool
+
+# jobs run in spawned workers, so they must be importable module-level functions
+warmup_languages = []
+
+
+def job_slow_pid(options):
+    time.sleep(0.5)
+    return {"pid": os.getpid(), "sum": int(options["image"].grey.sum())}
+
+
+def job_languages(options):
+    if not warmup_languages:
+        warmup_languages.append(options["lang"])
+    return {"warmup": warmup_languages[0], "call": options["lang"]}
+
+
+def make_options(lang=("ko", "en")):
+    image = np.full((8, 8, 3), 2, dtype=np.uint8)
+    return {"image": DecodedImage.from_bgr(image), "path": None, "lang": list(lang)}
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(jobs, **kwargs):
+        pool = EngineProcessPool(jobs, routes={}, startup_timeout=60, **kwargs)
+        pools.append(pool)
+        pool.wait_ready()
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.shutdown()
+
+
+def run(pool, job, options):
+    with pool.shared_options(options) as pool_options:
+        return pool.run_job(job, pool_options)
+
+
+def test_workers_of_one_engine_run_concurrently(make_pool):
+    pool = make_pool([job_slow_pid], warmup=False, workers_per_engine=2)
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(2) as threads:
+        results = list(threads.map(lambda _: run(pool, job_slow_pid, make_options()), range(2)))
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.9
+    assert {result["sum"] for result in results} == {8 * 8 * 2}
+    assert len({result["pid"] for result in results}) == 2
+    assert len(pool.stats()["workers"]["job_slow_pid"]) == 2
+    assert pool.stats()["idle"]["job_slow_pid"] == 2
+
+
+def test_workers_warm_up_with_the_configured_languages(make_pool):
+    pool = make_pool([job_languages], warmup=True, languages=["ja"])
+    assert run(pool, job_languages, make_options(["ja"])) == {"warmup": ["ja"], "call": ["ja"]}
+
+
+def test_recycled_worker_keeps_its_slot(make_pool):
+    pool = make_pool([job_slow_pid], warmup=False, workers_per_engine=1, max_jobs_per_worker=1)
+    first = run(pool, job_slow_pid, make_options())["pid"]
+    second = run(pool, job_slow_pid, make_options())["pid"]
+    assert first != second
+    assert pool.stats()["recycled"] == 2
+
+
+@pytest.mark.parametrize("start_method", ["spawn", "fork"])
+def test_workers_leave_shared_memory_to_the_resource_tracker_of_the_pool(start_method):
+    # resource trackers report leaks (and unlink again) when their process exits
+    script = (
+        "from tests.api.calendar.test_process_pool import job_slow_pid, make_options, run\n"
+        "from app.api.calendar.BetterOCR.betterocr.process_pool import EngineProcessPool\n"
+        "if __name__ == '__main__':\n"
+        "    pool = EngineProcessPool(\n"
+        "        [job_slow_pid], routes={}, warmup=False, workers_per_engine=2,\n"
+        f"        start_method='{start_method}', max_jobs_per_worker=1,\n"
+        "    )\n"
+        "    for _ in range(3):\n"
+        "        run(pool, job_slow_pid, make_options())\n"
+        "    pool.shutdown()\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        timeout=120,
+        cwd=os.path.join(os.path.dirname(__file__), "..", "..", ".."),
+    )
+    assert result.returncode == 0, result.stderr
+    assert "leaked shared_memory" not in result.stderr
+    assert "Traceback" not in result.stderr
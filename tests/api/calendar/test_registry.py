@@ -0,0 +1,25 @@
+from app.api.calendar.BetterOCR.betterocr.registry import ModelRegistry
+
+
+def test_models_are_cached_per_device():
+    loaded = []
+    registry = ModelRegistry()
+    registry.register_loader("pororo", lambda *key: loaded.append(key) or object())
+
+    cpu = registry.get("pororo", ["ko"], gpu=False, quantize=False)
+    gpu = registry.get("pororo", ["ko"], gpu="cuda", quantize=False)
+
+    assert cpu is not gpu
+    assert cpu is registry.get("pororo", ["ko"], gpu="cpu", quantize=False)
+    assert loaded == [(("ko",), "cpu", False), (("ko",), "cuda", False)]
+
+
+def test_evict_by_engine():
+    registry = ModelRegistry()
+    registry.register_loader("pororo", lambda *key: object())
+    registry.register_loader("easyocr", lambda *key: object())
+    registry.get("pororo", ["ko"], gpu=False)
+    registry.get("easyocr", ["ko", "en"], gpu=False)
+
+    assert registry.evict("pororo") == 1
+    assert [key[0] for key in registry.loaded_keys()] == ["easyocr"]
@@ -0,0 +1,133 @@
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.api.calendar.BetterOCR.betterocr.wrappers.tesseract import engine as tesseract_engine
+from app.api.calendar.BetterOCR.betterocr.wrappers.tesseract.engine import (
+    TesseractEngine,
+    close_tesseract_engines,
+    get_tesseract_engine,
+    merge_word_boxes,
+    parse_config,
+)
+
+
+@pytest.mark.parametrize(
+    "config, expected",
+    [
+        ("", (None, None, {})),
+        (None, (None, None, {})),
+        ("--psm 6", (6, None, {})),
+        ("--oem 1 --psm 11", (11, 1, {})),
+        ("-c preserve_interword_spaces=1", (None, None, {"preserve_interword_spaces": "1"})),
+        (
+            "--psm 4 -c tessedit_char_whitelist='0123456789 월일' -c load_system_dawg=0",
+            (4, None, {"tessedit_char_whitelist": "0123456789 월일", "load_system_dawg": "0"}),
+        ),
+        ("-c a=b=c", (None, None, {"a": "b=c"})),
+        # pytesseract 가 받는 다른 인자와 값 없는 옵션은 무시
+        ("--dpi 300 --psm", (None, None, {})),
+        ("-c novalue --psm 3", (3, None, {})),
+    ],
+)
+def test_parse_config(config, expected):
+    assert parse_config(config) == expected
+
+
+def test_merge_word_boxes_groups_words_by_line_in_order():
+    words = [
+        (0, "3월", 90.0, 10, 10, 40, 30),
+        (0, "2일", 80.0, 45, 12, 70, 32),
+        (1, "입학식", 95.0, 10, 50, 60, 70),
+        (0, "(월)", 70.0, 75, 8, 100, 30),
+    ]
+    assert merge_word_boxes(words) == [
+        {"box": [[10, 8], [100, 8], [100, 32], [10, 32]], "text": "3월 2일 (월)"},
+        {"box": [[10, 50], [60, 50], [60, 70], [10, 70]], "text": "입학식"},
+    ]
+
+
+def test_merge_word_boxes_drops_low_confidence_and_blank_words():
+    words = [
+        ((1, 1, 1), "noise", 4.9, 0, 0, 500, 500),
+        ((1, 1, 1), " ", 99.0, 0, 0, 500, 500),
+        ((1, 1, 1), "소풍", 5.0, 1, 2, 3, 4),
+        ((1, 1, 2), "", 99.0, 0, 0, 1, 1),
+    ]
+    assert merge_word_boxes(words) == [{"box": [[1, 2], [3, 2], [3, 4], [1, 4]], "text": "소풍"}]
+
+
+class FakeApi:
+    created = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.variables = {}
+        self.ended = False
+        FakeApi.created.append(self)
+
+    def SetVariable(self, name, value):
+        self.variables[name] = value
+
+    def SetImageBytes(self, data, width, height, channels, stride):
+        self.image = (width, height, channels, stride)
+
+    def GetUTF8Text(self):
+        return "text"
+
+    def End(self):
+        self.ended = True
+
+
+@pytest.fixture
+def fake_tesserocr(monkeypatch):
+    FakeApi.created = []
+    monkeypatch.setattr(tesseract_engine, "tesserocr", SimpleNamespace(PyTessBaseAPI=FakeApi))
+    monkeypatch.setattr(tesseract_engine, "_engines", {})
+    return FakeApi
+
+
+def test_engine_keeps_one_handle_per_thread(fake_tesserocr):
+    engine = TesseractEngine("kor+eng", {"config": "--psm 6 -c a=1"})
+    image = np.zeros((4, 6), np.uint8)
+    engine.image_to_string(image)
+    engine.image_to_string(image)
+    thread = threading.Thread(target=engine.image_to_string, args=(image,))
+    thread.start()
+    thread.join()
+
+    assert len(fake_tesserocr.created) == 2
+    api = fake_tesserocr.created[0]
+    assert api.kwargs == {"lang": "kor+eng", "psm": 6}
+    assert api.variables == {"a": "1"}
+    assert api.image == (6, 4, 1, 6)
+
+
+def test_close_ends_every_thread_handle(fake_tesserocr):
+    engine = TesseractEngine("kor")
+    image = np.zeros((4, 6, 3), np.uint8)
+    threads = [threading.Thread(target=engine.image_to_string, args=(image,)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    engine.close()
+    assert [api.ended for api in fake_tesserocr.created] == [True] * 3
+
+    # 닫은 뒤 다시 쓰면 새 핸들을 로드
+    engine.image_to_string(image)
+    assert len(fake_tesserocr.created) == 4 and not fake_tesserocr.created[-1].ended
+
+
+def test_close_tesseract_engines_closes_cached_engines(fake_tesserocr):
+    engine = get_tesseract_engine("kor", {"config": "--psm 6"})
+    assert get_tesseract_engine("kor", {"config": "--psm 6"}) is engine
+    engine.image_to_string(np.zeros((2, 2), np.uint8))
+
+    close_tesseract_engines()
+
+    assert fake_tesserocr.created[0].ended
+    assert get_tesseract_engine("kor", {"config": "--psm 6"}) is not engine
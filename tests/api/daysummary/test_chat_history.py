@@ -0,0 +1,110 @@
+import pytest
+
+from app.api.daysummary import models
+from app.api.daysummary.models import AIChatHistory
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(models.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_history(request, tmp_path):
+    def make(**kwargs):
+        if request.param == "sqlite":
+            kwargs.setdefault("path", str(tmp_path / "history.sqlite"))
+            kwargs.setdefault("sweep_every", 1)
+        history = AIChatHistory(**kwargs)
+        history._encoding = None  # 글자 수 = 토큰 수
+        return history
+
+    return make
+
+
+def add_turn(history, question, answer, session_id="s", baby_id=1):
+    history.add_message(1, session_id, baby_id, question, is_user=True)
+    history.add_message(1, session_id, baby_id, answer, is_user=False)
+
+
+def test_full_history_keeps_list_format(make_history):
+    history = make_history()
+    add_turn(history, "안녕", "반가워요")
+    assert history.get_full_history(1, "s", 1) == str(["User: 안녕", "Bot: 반가워요"])
+    assert history.get_full_history(1, "other", 1) == "[]"
+
+
+def test_window_keeps_last_turns(make_history):
+    history = make_history(max_turns=2)
+    for i in range(4):
+        add_turn(history, f"q{i}", f"a{i}")
+    assert history.get_chat_history(1, "s", 1) == ["User: q2", "Bot: a2", "User: q3", "Bot: a3"]
+
+
+def test_window_drops_oldest_messages_over_token_limit(make_history):
+    history = make_history(max_tokens=20)
+    add_turn(history, "12345", "12345")  # 메시지당 "User: "/"Bot: " 포함 11/10 토큰
+    history.add_message(1, "s", 1, "abc")
+    assert history.get_chat_history(1, "s", 1) == ["Bot: 12345", "User: abc"]
+
+
+def test_window_always_keeps_the_last_message(make_history):
+    history = make_history(max_tokens=5)
+    history.add_message(1, "s", 1, "a message longer than the limit")
+    assert history.get_chat_history(1, "s", 1) == ["User: a message longer than the limit"]
+
+
+def test_sessions_are_separate_per_baby(make_history):
+    history = make_history()
+    history.add_message(1, "s", 1, "첫째")
+    history.add_message(1, "s", 2, "둘째")
+    assert history.get_chat_history(1, "s", 1) == ["User: 첫째"]
+    history.reset_history(1, "s", 1)
+    assert history.get_chat_history(1, "s", 1) == []
+    assert history.get_chat_history(1, "s", 2) == ["User: 둘째"]
+
+
+def test_idle_session_expires(make_history, clock):
+    history = make_history(idle_ttl=60)
+    history.add_message(1, "s", 1, "hello")
+
+    clock[0] += 59
+    assert history.get_chat_history(1, "s", 1) == ["User: hello"]  # 읽으면 last_access 갱신
+
+    clock[0] += 59
+    assert history.get_chat_history(1, "s", 1) == ["User: hello"]
+
+    clock[0] += 61
+    assert history.get_chat_history(1, "s", 1) == []
+    assert history.stats()["evictions"] == 1
+
+
+def test_idle_session_restarts_on_write(make_history, clock):
+    history = make_history(idle_ttl=60)
+    history.add_message(1, "s", 1, "old")
+    clock[0] += 61
+    history.add_message(1, "s", 1, "new")
+    assert history.get_chat_history(1, "s", 1) == ["User: new"]
+
+
+def test_max_sessions_evicts_least_recently_used(make_history, clock):
+    history = make_history(max_sessions=2)
+    for session_id in ("a", "b"):
+        history.add_message(1, session_id, 1, session_id)
+        clock[0] += 1
+    history.get_chat_history(1, "a", 1)  # a 를 최근 사용으로
+    clock[0] += 1
+    history.add_message(1, "c", 1, "c")
+
+    assert history.get_chat_history(1, "b", 1) == []
+    assert history.get_chat_history(1, "a", 1) == ["User: a"]
+    assert history.get_chat_history(1, "c", 1) == ["User: c"]
+    assert history.stats()["sessions"] == 2
+
+
+def test_sqlite_history_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "history.sqlite")
+    AIChatHistory(path=path).add_message(1, "s", 1, "from worker 1")
+    assert AIChatHistory(path=path).get_chat_history(1, "s", 1) == ["User: from worker 1"]
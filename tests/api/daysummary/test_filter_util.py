@@ -0,0 +1,59 @@
+from datetime import date
+
+import pytest
+
+from app.api.daysummary.utils.filter_util import RetrievalFilterBuilder
+
+TODAY = date(2026, 10, 15)
+
+
+def no_fallback():
+    raise AssertionError("LLM fallback should not be called")
+
+
+@pytest.mark.parametrize(
+    "query, expr",
+    [
+        ("어제 아이 기분 어땠어", "date == '2026-10-14' and role == 'child'"),
+        ("지난주에 나는 뭐 했지", "date >= '2026-10-05' and date <= '2026-10-11' and role == 'parents'"),
+        ("9월 3일 일기", "date == '2026-09-03'"),
+        ("우리 애랑 내가 같이 한 일", "date == '2026-10-15'"),
+    ],
+)
+def test_rule_based_filter(query, expr):
+    builder = RetrievalFilterBuilder()
+    assert builder.build(query, no_fallback, today=TODAY) == expr
+    assert builder.stats()["rule"] == 1
+
+
+@pytest.mark.parametrize(
+    "query, expr",
+    [
+        ("어젯밤에 뭐 했지", "date == '2024-09-19'"),
+        ("엊저녁에", "date == '2024-09-19'"),
+        ("그저께 밤에", "date == '2024-09-18'"),
+        ("이 달에", "date >= '2024-09-01' and date <= '2024-09-30'"),
+        ("한 달 전에", "date >= '2024-08-01' and date <= '2024-08-31'"),
+        ("일주일 전에", "date >= '2024-09-09' and date <= '2024-09-15'"),
+        ("사흘 전", "date == '2024-09-17'"),
+        ("보름 전", "date == '2024-09-05'"),
+    ],
+)
+def test_native_korean_time_phrases(query, expr):
+    # 이전에는 모두 오늘(2024-09-20)로 해석되던 표현
+    assert RetrievalFilterBuilder().build(query, no_fallback, today=date(2024, 9, 20)) == expr
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["며칠 전에 뭐 했지", "2월 30일 일기", "크리스마스에 아이가 뭐 했어", "요즘 아이가 뭐 좋아해", "아침에 뭐 먹었지"],
+)
+def test_unparsed_expressions_use_the_llm(query):
+    builder = RetrievalFilterBuilder()
+    assert builder.build(query, lambda: "llm expr", today=TODAY) == "llm expr"
+    assert builder.stats() == {"rule": 0, "llm_fallback": 1, "fallback_rate": 1.0}
+
+
+def test_invalid_relative_day_uses_the_llm():
+    builder = RetrievalFilterBuilder()
+    assert builder.build("지난달 31일", lambda: "llm expr", today=date(2026, 3, 31)) == "llm expr"
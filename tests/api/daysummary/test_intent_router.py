@@ -0,0 +1,112 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.api.daysummary.utils import intent_router
+from app.api.daysummary.utils.intent_router import IntentRouter
+
+# 의도별 키워드 -> 축 하나. 키워드가 없는 문장은 모든 축에 조금씩 걸침
+KEYWORDS = {
+    "QUESTION": "뭐",
+    "DIARY_WRITE": "써줘",
+    "SHARING": "즐거웠",
+    "DIARY_SAVE": "저장",
+    "EXCEPT": "날씨",
+}
+AXES = list(KEYWORDS)
+
+
+def stub_embed(texts):
+    vectors = []
+    for text in texts:
+        vector = np.full(len(AXES), 0.1)
+        for i, intent in enumerate(AXES):
+            if KEYWORDS[intent] in text:
+                vector[i] += 1.0
+        vectors.append(vector.tolist())
+    return vectors
+
+
+@pytest.fixture
+def seeds(monkeypatch):
+    monkeypatch.setattr(
+        intent_router,
+        "SEED_EXAMPLES",
+        {intent: [f"{keyword} 예시 {i}" for i in range(3)] for intent, keyword in KEYWORDS.items()},
+    )
+
+
+@pytest.mark.parametrize(
+    "query, intent",
+    [
+        ("오늘 점심 뭐 먹었어?", "QUESTION"),
+        ("오늘 일기 써줘", "DIARY_WRITE"),
+        ("공원에 가서 즐거웠어", "SHARING"),
+        ("이대로 저장해줘", "DIARY_SAVE"),
+        ("내일 날씨 알려줘", "EXCEPT"),
+    ],
+)
+def test_classify_picks_the_nearest_centroid(seeds, query, intent):
+    router = IntentRouter(stub_embed)
+    predicted, score, margin = router.classify(query)
+    assert predicted == intent
+    assert score >= router.min_score and margin >= router.min_margin
+
+
+def test_ambiguous_query_falls_back_to_react(seeds):
+    router = IntentRouter(stub_embed)
+    # 두 의도의 키워드가 모두 있으면 1, 2등 차이가 min_margin 보다 작음
+    assert router.classify("뭐 먹었는지 일기 써줘")[0] is None
+    # 키워드가 없으면 모든 centroid 와 비슷하게 멀어 min_score 미만
+    assert IntentRouter(stub_embed, min_score=0.9).classify("음")[0] is None
+
+
+def test_embedding_failure_falls_back_to_react(seeds):
+    def broken_embed(texts):
+        raise RuntimeError("embedding api down")
+
+    assert IntentRouter(broken_embed).classify("오늘 일기 써줘") == (None, 0.0, 0.0)
+
+
+def test_centroids_are_embedded_once(seeds):
+    calls = []
+
+    def counting_embed(texts):
+        calls.append(len(texts))
+        return stub_embed(texts)
+
+    router = IntentRouter(counting_embed)
+    router.classify("오늘 일기 써줘")
+    router.classify("이대로 저장해줘")
+    assert calls == [15, 1, 1]
+
+
+def test_record_skips_duplicates_and_seed_examples(seeds, tmp_path):
+    path = tmp_path / "intents.jsonl"
+    router = IntentRouter(stub_embed, examples_path=str(path))
+
+    assert router.record(" 오늘 뭐 했지 ", "question")
+    assert not router.record("오늘 뭐 했지", "QUESTION")
+    assert not router.record("뭐 예시 0", "QUESTION")
+    assert not router.record("오늘 뭐 했지", "NOT_AN_INTENT")
+    assert router.record("오늘 뭐 했지", "SHARING")
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert lines == [
+        {"query": "오늘 뭐 했지", "intent": "QUESTION"},
+        {"query": "오늘 뭐 했지", "intent": "SHARING"},
+    ]
+
+
+def test_record_stops_at_max_recorded(seeds, tmp_path):
+    path = tmp_path / "intents.jsonl"
+    router = IntentRouter(stub_embed, examples_path=str(path), max_recorded=2)
+    assert [router.record(f"질문 {i}", "QUESTION") for i in range(4)] == [True, True, False, False]
+
+    # 다시 시작해도 파일에 있는 개수부터 이어서 셈
+    reloaded = IntentRouter(stub_embed, examples_path=str(path), max_recorded=3)
+    assert "질문 1" in reloaded.examples["QUESTION"]
+    assert not reloaded.record("질문 1", "QUESTION")
+    assert reloaded.record("질문 9", "QUESTION")
+    assert not reloaded.record("질문 10", "QUESTION")
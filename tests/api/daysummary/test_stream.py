@@ -0,0 +1,63 @@
+import asyncio
+import importlib
+
+import pytest
+
+from app.api.daysummary.models import Query
+
+
+@pytest.fixture
+def daysumm(monkeypatch, tmp_path):
+    # 모듈 로드 시 클라이언트/벡터 저장소를 만들므로 네트워크 없이 만들 수 있는 설정을 넣음
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("LLM_MODEL", "gpt-4o-mini")
+    monkeypatch.setenv("EMBEDDING_MODEL", "text-embedding-3-small")
+    monkeypatch.setenv("EMBEDDING_DIMENSION", "4")
+    monkeypatch.setenv("VECTOR_STORE", "numpy")
+    monkeypatch.setenv("VECTOR_STORE_PATH", str(tmp_path / "vectors"))
+    return importlib.import_module("app.api.daysummary.daysumm")
+
+
+def read_stream(daysumm, text="오늘 뭐 했어?"):
+    async def collect():
+        response = await daysumm.process_user_query_stream(Query(text=text, session_id="s"))
+        return [frame async for frame in response.body_iterator]
+
+    return asyncio.run(collect())
+
+
+def test_sse_event_names_the_event(daysumm):
+    assert daysumm.sse_event({"a": "가"}) == 'data: {"a": "가"}\n\n'
+    assert daysumm.sse_event({"a": 1}, event="error") == 'event: error\ndata: {"a": 1}\n\n'
+
+
+def test_stream_sends_error_frame_when_routing_fails(daysumm, monkeypatch):
+    async def fail(input, chat_history):
+        raise RuntimeError("router is down")
+
+    monkeypatch.setattr(daysumm, "pre_route", fail)
+    frames = read_stream(daysumm)
+
+    assert frames[0].startswith("data: ") and '"type": "session"' in frames[0]
+    assert frames[-1] == 'event: error\ndata: {"type": "error", "detail": "router is down"}\n\n'
+    assert daysumm.stream_metrics.stats()["error"]["count"] >= 1
+
+
+def test_stream_sends_error_frame_when_tool_fails_mid_stream(daysumm, monkeypatch):
+    async def route(input, chat_history):
+        return "direct", daysumm.FinalToolCall("Sharing", "input"), []
+
+    async def tokens(tool_name, tool_input):
+        yield "첫 "
+        raise RuntimeError("llm timeout")
+
+    monkeypatch.setattr(daysumm, "pre_route", route)
+    monkeypatch.setattr(daysumm, "astream_final_tool", tokens)
+    frames = read_stream(daysumm)
+
+    assert [frame.split("\n")[0] for frame in frames] == [
+        frames[0].split("\n")[0],
+        'data: {"type": "token", "content": "첫 "}',
+        "event: error",
+    ]
+    assert "llm timeout" in frames[-1]
@@ -0,0 +1,99 @@
+import asyncio
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.embedding.models import DayInfoBatch, DayInfoItem
+from app.api.utils.embedding_cache import EmbeddingCache
+
+
+@pytest.fixture
+def embedd(monkeypatch, tmp_path):
+    # 모듈 로드 시 클라이언트/벡터 저장소를 만들므로 네트워크 없이 만들 수 있는 설정을 넣음
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("EMBEDDING_MODEL", "text-embedding-3-small")
+    monkeypatch.setenv("EMBEDDING_DIMENSION", "2")
+    monkeypatch.setenv("VECTOR_STORE", "numpy")
+    monkeypatch.setenv("VECTOR_STORE_PATH", str(tmp_path / "vectors"))
+    module = importlib.import_module("app.api.embedding.embedd")
+    monkeypatch.setattr(module, "embedding_cache", EmbeddingCache())
+    return module
+
+
+def vector(text):
+    """텍스트마다 다른 임베딩: [번호, 1]"""
+    return [float(text.split()[-1]), 1.0]
+
+
+class OutOfOrderEmbeddings:
+    """
+    가짜 비동기 임베딩 API. 먼저 보낸 chunk 일수록 늦게 끝나고,
+    응답 data 도 index 역순으로 돌려줍니다.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+
+    async def create(self, input, model):
+        order = len(self.calls)
+        self.calls.append(list(input))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.05 / (order + 1))
+        self.active -= 1
+        data = [SimpleNamespace(index=i, embedding=vector(text)) for i, text in enumerate(input)]
+        return SimpleNamespace(data=data[::-1])
+
+
+@pytest.fixture
+def client():
+    return SimpleNamespace(embeddings=OutOfOrderEmbeddings())
+
+
+def texts(count):
+    return [f"일기 {i}" for i in range(count)]
+
+
+def test_chunked_embeddings_keep_input_order(embedd, client):
+    embeddings = asyncio.run(
+        embedd.get_embeddings(client, texts(10), chunk_size=3, concurrency=2)
+    )
+    assert embeddings == [vector(text) for text in texts(10)]
+    assert [len(chunk) for chunk in client.embeddings.calls] == [3, 3, 3, 1]
+    assert client.embeddings.peak == 2
+
+
+def test_cached_and_duplicate_texts_keep_their_positions(embedd, client):
+    embedd.embedding_cache.set("일기 4", embedd.embedding_model, [4.0, 1.0])
+    batch = ["일기 5", "일기 4", "일기 1", "일기 5", "일기\n7"]
+
+    embeddings = asyncio.run(embedd.get_embeddings(client, batch, chunk_size=2, concurrency=2))
+
+    assert embeddings == [[5.0, 1.0], [4.0, 1.0], [1.0, 1.0], [5.0, 1.0], [7.0, 1.0]]
+    assert client.embeddings.calls == [["일기 5", "일기 1"], ["일기 7"]]
+
+
+def test_insert_attaches_each_vector_to_its_own_row(embedd, client, monkeypatch):
+    inserted = []
+    monkeypatch.setattr(embedd, "async_client", client)
+    monkeypatch.setattr(
+        embedd, "vector_store", SimpleNamespace(insert=lambda rows: inserted.extend(rows) or len(rows))
+    )
+    monkeypatch.setattr(
+        embedd.get_embeddings, "__defaults__", (embedd.embedding_model, 3, 2)
+    )
+    items = [
+        DayInfoItem(user_id=1, baby_id=i % 2, date=f"2024-09-{i + 1:02d}", role="child", text=text)
+        for i, text in enumerate(texts(8))
+    ]
+
+    result = asyncio.run(embedd.insert_day_info(DayInfoBatch(items=items)))
+
+    assert result == {"message": "Successfully inserted 8 entities into the collection"}
+    assert len(client.embeddings.calls) == 3
+    for item, row in zip(items, inserted):
+        assert (row["date"], row["text"], row["baby_id"]) == (item.date, item.text, item.baby_id)
+        assert row["embedding"] == vector(item.text)
@@ -0,0 +1,114 @@
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.embedding.utils import vecdb_util
+
+
+class FakeCollection:
+    """Old-schema collection: user_id is the primary key and repeats across rows."""
+
+    def __init__(self, rows, index_type="FLAT", partitioned=False):
+        self.rows = rows
+        self.inserted = []
+        self.schema = SimpleNamespace(
+            fields=[SimpleNamespace(name="user_id", is_partition_key=partitioned)]
+        )
+        self.indexes = [
+            SimpleNamespace(field_name="embedding", params={"index_type": index_type})
+        ]
+
+    @property
+    def num_entities(self):
+        return len(self.rows)
+
+    def query(self, expr, output_fields, offset=0, limit=16384):
+        op, value = re.fullmatch(r"user_id (>=|>|==) (\d+)", expr).groups()
+        match = {">=": int.__ge__, ">": int.__gt__, "==": int.__eq__}[op]
+        rows = sorted(
+            (row for row in self.rows if match(row["user_id"], int(value))),
+            key=lambda row: row["user_id"],
+        )
+        return [{f: row[f] for f in output_fields} for row in rows[offset : offset + limit]]
+
+    def insert(self, rows):
+        self.inserted.extend(rows)
+
+    def load(self):
+        pass
+
+    def release(self):
+        pass
+
+    def flush(self):
+        pass
+
+
+def make_rows(user_ids):
+    return [
+        {"user_id": user_id, "baby_id": 1, "date": f"2024-09-{i + 1:02d}", "role": "child",
+         "text": f"diary {i}", "embedding": [0.0, 1.0]}
+        for i, user_id in enumerate(user_ids)
+    ]
+
+
+@pytest.fixture
+def milvus(monkeypatch):
+    collections = {}
+    monkeypatch.setattr(vecdb_util, "Collection", lambda name: collections[name])
+    monkeypatch.setattr(
+        vecdb_util,
+        "create_collection",
+        lambda name, dim, index_type=None: collections.setdefault(name, FakeCollection([])),
+    )
+    monkeypatch.setattr(
+        vecdb_util,
+        "utility",
+        SimpleNamespace(
+            has_collection=lambda name: name in collections,
+            drop_collection=lambda name: collections.pop(name),
+            rename_collection=lambda old, new: collections.__setitem__(new, collections.pop(old)),
+        ),
+    )
+    return collections
+
+
+def test_distinct_user_ids_pages_past_repeated_keys():
+    collection = FakeCollection(make_rows([3, 1, 1, 1, 2, 2, 5]))
+    assert vecdb_util.distinct_user_ids(collection, batch_size=2) == [1, 2, 3, 5]
+
+
+def test_migrate_copies_every_row_of_repeated_user_ids(milvus):
+    rows = make_rows([1] * 7 + [2] * 3 + [9])
+    milvus["diary"] = FakeCollection(rows)
+
+    vecdb_util.migrate_collection("diary", 2, "HNSW", batch_size=2)
+
+    assert "diary_migrating" not in milvus
+    copied = milvus["diary"].inserted
+    assert sorted(row["text"] for row in copied) == sorted(row["text"] for row in rows)
+
+
+def test_migrate_keeps_old_collection_when_rows_are_missing(milvus, monkeypatch):
+    milvus["diary"] = FakeCollection(make_rows([1, 1, 2]))
+    monkeypatch.setattr(vecdb_util, "query_user_rows", lambda collection, user_id, size: iter([]))
+
+    with pytest.raises(RuntimeError):
+        vecdb_util.migrate_collection("diary", 2, batch_size=2)
+    assert "diary_migrating" not in milvus
+    assert milvus["diary"].num_entities == 3
+
+
+@pytest.mark.parametrize(
+    "index_type, params",
+    [("FLAT", {}), ("HNSW", {"ef": 64}), ("IVF_FLAT", {"nprobe": 16}), ("AUTOINDEX", {})],
+)
+def test_search_params_follow_the_existing_index(index_type, params, monkeypatch):
+    monkeypatch.setitem(vecdb_util.INDEX_SEARCH_PARAMS, "HNSW", {"ef": 64})
+    monkeypatch.setitem(vecdb_util.INDEX_SEARCH_PARAMS, "IVF_FLAT", {"nprobe": 16})
+    collection = FakeCollection([], index_type=index_type)
+    assert vecdb_util.collection_search_params(collection) == {
+        "metric_type": "COSINE",
+        "params": params,
+    }
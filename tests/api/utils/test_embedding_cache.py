@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.utils import embedding_cache as cache_module
+from app.api.utils.embedding_cache import EmbeddingCache, cached_embeddings, normalize_text
+
+
+class FakeEmbeddings:
+    """임베딩 API 대역: 입력 길이로 벡터를 만들고 호출 입력을 기록합니다. (index 역순으로 응답)"""
+
+    def __init__(self):
+        self.calls = []
+
+    def create(self, input, model):
+        self.calls.append(list(input))
+        data = [SimpleNamespace(index=i, embedding=[float(len(text)), 1.0]) for i, text in enumerate(input)]
+        return SimpleNamespace(data=data[::-1])
+
+
+@pytest.fixture
+def client():
+    return SimpleNamespace(embeddings=FakeEmbeddings())
+
+
+def test_normalize_text_unifies_width_whitespace_and_case():
+    assert normalize_text("  Ｈello\t World ") == "hello world"
+
+
+def test_memory_lru_evicts_least_recently_used():
+    cache = EmbeddingCache(max_entries=2)
+    cache.set("a", "m", [1.0])
+    cache.set("b", "m", [2.0])
+    assert cache.get("a", "m") == [1.0]  # a 가 최근 사용으로 이동
+    cache.set("c", "m", [3.0])
+
+    assert cache.get("b", "m") is None
+    assert cache.get("a", "m") == [1.0]
+    assert cache.get("c", "m") == [3.0]
+    assert cache.stats()["memory_entries"] == 2
+
+
+def test_keys_are_per_model_and_normalized():
+    cache = EmbeddingCache()
+    cache.set("Hello  World", "m1", [1.0])
+    assert cache.get("hello world", "m1") == [1.0]
+    assert cache.get("hello world", "m2") is None
+
+
+def test_disk_cache_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    EmbeddingCache(path=path).set("text", "m", [0.5, 0.25])
+
+    cache = EmbeddingCache(path=path)
+    assert cache.get("text", "m") == [0.5, 0.25]
+    assert cache.get("text", "m") == [0.5, 0.25]
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["disk_entries"]) == (1, 1, 1)
+
+
+def test_disk_entries_expire_after_ttl(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.sqlite")
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    EmbeddingCache(path=path).set("text", "m", [1.0])
+
+    now[0] += 59
+    assert EmbeddingCache(path=path, ttl=60).get("text", "m") == [1.0]
+
+    now[0] += 2
+    cache = EmbeddingCache(path=path, ttl=60)
+    assert cache.get("text", "m") is None
+    assert cache.stats()["disk_entries"] == 0
+
+
+def test_disk_entries_without_ttl_never_expire(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.sqlite")
+    EmbeddingCache(path=path).set("text", "m", [1.0])
+    monkeypatch.setattr(cache_module.time, "time", lambda: 1e12)
+    assert EmbeddingCache(path=path).get("text", "m") == [1.0]
+
+
+def test_cached_embeddings_sends_only_unique_misses(client):
+    cache = EmbeddingCache()
+    cache.set("cached", "m", [9.0, 9.0])
+
+    embeddings = cached_embeddings(cache, client, ["ab", "cached", "abc", "ab"], "m")
+
+    assert client.embeddings.calls == [["ab", "abc"]]
+    assert embeddings == [[2.0, 1.0], [9.0, 9.0], [3.0, 1.0], [2.0, 1.0]]
+
+
+def test_cached_embeddings_skips_api_when_everything_is_cached(client):
+    cache = EmbeddingCache()
+    cached_embeddings(cache, client, ["a\nb", "c"], "m")
+    assert cached_embeddings(cache, client, ["a b", "c"], "m") == [[3.0, 1.0], [1.0, 1.0]]
+    assert len(client.embeddings.calls) == 1
@@ -0,0 +1,169 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from app.api.utils import llm_util
+from app.api.utils.llm_util import LLMClientProvider, RateLimitTracker, parse_reset, request_model
+
+
+@pytest.mark.parametrize(
+    "value, seconds",
+    [
+        ("1m30s", 90.0),
+        ("250ms", 0.25),
+        ("6m0s", 360.0),
+        ("1.5s", 1.5),
+        ("20ms", 0.02),
+        ("1h2m3s", 3723.0),
+        ("", 0.0),
+        (None, 0.0),
+    ],
+)
+def test_parse_reset(value, seconds):
+    assert parse_reset(value) == pytest.approx(seconds)
+
+
+def test_request_model_reads_json_body_or_falls_back_to_path():
+    url = "https://api.openai.com/v1/chat/completions"
+    assert request_model(httpx.Request("POST", url, json={"model": "gpt-4o-mini"})) == "gpt-4o-mini"
+    assert request_model(httpx.Request("POST", url, content=b"--multipart")) == "/v1/chat/completions"
+
+
+def response(status=200, **headers):
+    return httpx.Response(status, headers=headers)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_util.time, "time", lambda: now[0])
+    return now
+
+
+def test_tracker_waits_until_reset_when_no_requests_remain(clock):
+    tracker = RateLimitTracker(max_wait=10)
+    tracker.record(
+        "gpt",
+        response(
+            429,
+            **{"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "1m30s"},
+        ),
+    )
+    # 리셋까지 90초 남았지만 max_wait 로 제한
+    assert tracker.wait_time("gpt") == 10
+    clock[0] += 85
+    assert tracker.wait_time("gpt") == pytest.approx(5)
+    clock[0] += 10
+    assert tracker.wait_time("gpt") == 0
+    assert tracker.wait_time("other") == 0
+    stats = tracker.stats()["gpt"]
+    assert (stats["requests"], stats["errors"], stats["rate_limited"]) == (1, 1, 1)
+
+
+def test_tracker_does_not_wait_with_requests_remaining(clock):
+    tracker = RateLimitTracker()
+    tracker.record(
+        "gpt",
+        response(**{"x-ratelimit-remaining-requests": "3", "x-ratelimit-reset-requests": "250ms"}),
+    )
+    assert tracker.wait_time("gpt") == 0
+    assert tracker.stats()["gpt"]["remaining_requests"] == 3
+
+
+class Concurrency:
+    """가짜 전송 계층 응답: 동시에 처리 중인 요청 수의 최댓값을 기록."""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.active -= 1
+
+
+def test_sync_transport_limits_concurrent_requests(monkeypatch):
+    concurrency = Concurrency()
+
+    def handle_request(self, request):
+        with concurrency:
+            time.sleep(0.05)
+        return httpx.Response(200, json={}, request=request)
+
+    monkeypatch.setattr(httpx.HTTPTransport, "handle_request", handle_request)
+    provider = LLMClientProvider(api_key="test", max_concurrency=2, http2=False)
+    client = provider.http_client
+
+    threads = [
+        threading.Thread(target=client.post, args=("https://llm.test/v1/chat",), kwargs={"json": {"model": "m"}})
+        for _ in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert concurrency.peak == 2
+    assert provider.stats()["in_flight"] == 0
+    assert provider.rate_limits.stats()["m"]["requests"] == 6
+
+
+def test_async_transport_limits_concurrent_requests(monkeypatch):
+    concurrency = Concurrency()
+
+    async def handle_async_request(self, request):
+        with concurrency:
+            await asyncio.sleep(0.05)
+        return httpx.Response(200, json={}, request=request)
+
+    monkeypatch.setattr(httpx.AsyncHTTPTransport, "handle_async_request", handle_async_request)
+    provider = LLMClientProvider(api_key="test", max_concurrency=3, http2=False)
+
+    async def run():
+        client = provider.async_http_client
+        await asyncio.gather(
+            *(client.post("https://llm.test/v1/chat", json={"model": "m"}) for _ in range(9))
+        )
+        await provider.aclose()
+
+    asyncio.run(run())
+    assert concurrency.peak == 3
+    assert provider.stats()["in_flight"] == 0
+
+
+def test_transport_waits_for_rate_limit_reset(monkeypatch):
+    slept = []
+
+    def handle_request(self, request):
+        return httpx.Response(
+            200,
+            headers={"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "2s"},
+            json={},
+            request=request,
+        )
+
+    monkeypatch.setattr(httpx.HTTPTransport, "handle_request", handle_request)
+    monkeypatch.setattr(llm_util.time, "sleep", slept.append)
+    client = LLMClientProvider(api_key="test", http2=False).http_client
+
+    client.post("https://llm.test/v1/chat", json={"model": "m"})
+    client.post("https://llm.test/v1/chat", json={"model": "m"})
+
+    assert len(slept) == 1 and 0 < slept[0] <= 2
+
+
+def test_chat_models_are_cached_per_settings():
+    provider = LLMClientProvider(api_key="test", http2=False)
+    assert provider.chat("gpt-4o-mini", temperature=0) is provider.chat("gpt-4o-mini", temperature=0)
+    assert provider.chat("gpt-4o-mini", temperature=0) is not provider.chat("gpt-4o-mini", temperature=1)
+    assert provider.stats()["chat_models"] == 2
+    provider.close()
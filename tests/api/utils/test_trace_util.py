@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from app.api.utils import trace_util
+from app.api.utils.trace_util import LatencyHistogram, escape_label, span, traced
+
+
+def test_render_cumulative_buckets_sum_and_count():
+    histogram = LatencyHistogram("stage_latency_seconds", "Latency.", buckets=(0.5, 0.1, 1.0))
+    for seconds in (0.05, 0.1, 0.3, 2.0):
+        histogram.observe("ocr", seconds)
+    histogram.observe("llm", 0.7, status="error")
+
+    assert histogram.render() == (
+        "# HELP stage_latency_seconds Latency.\n"
+        "# TYPE stage_latency_seconds histogram\n"
+        'stage_latency_seconds_bucket{stage="llm",status="error",le="0.1"} 0\n'
+        'stage_latency_seconds_bucket{stage="llm",status="error",le="0.5"} 0\n'
+        'stage_latency_seconds_bucket{stage="llm",status="error",le="1.0"} 1\n'
+        'stage_latency_seconds_bucket{stage="llm",status="error",le="+Inf"} 1\n'
+        'stage_latency_seconds_sum{stage="llm",status="error"} 0.7\n'
+        'stage_latency_seconds_count{stage="llm",status="error"} 1\n'
+        # 경계값(0.1)은 해당 bucket 에 포함(le), 2.0 은 +Inf 에만 포함
+        'stage_latency_seconds_bucket{stage="ocr",status="ok",le="0.1"} 2\n'
+        'stage_latency_seconds_bucket{stage="ocr",status="ok",le="0.5"} 3\n'
+        'stage_latency_seconds_bucket{stage="ocr",status="ok",le="1.0"} 3\n'
+        'stage_latency_seconds_bucket{stage="ocr",status="ok",le="+Inf"} 4\n'
+        'stage_latency_seconds_sum{stage="ocr",status="ok"} 2.45\n'
+        'stage_latency_seconds_count{stage="ocr",status="ok"} 4\n'
+    )
+
+
+def test_render_without_observations_has_only_metadata():
+    assert LatencyHistogram("x_seconds", "X.").render() == "# HELP x_seconds X.\n# TYPE x_seconds histogram\n"
+
+
+@pytest.mark.parametrize(
+    "value, escaped",
+    [("plain.stage", "plain.stage"), ('say "hi"', 'say \\"hi\\"'), ("a\\b", "a\\\\b"), ("a\nb", "a\\nb")],
+)
+def test_escape_label(value, escaped):
+    assert escape_label(value) == escaped
+
+
+def test_render_escapes_label_values():
+    histogram = LatencyHistogram("x_seconds", "X.", buckets=(1.0,))
+    histogram.observe('tool."name"\n', 0.1)
+    assert 'x_seconds_count{stage="tool.\\"name\\"\\n",status="ok"} 1' in histogram.render()
+
+
+@pytest.fixture
+def histogram(monkeypatch):
+    histogram = LatencyHistogram("stage_latency_seconds", "Latency.")
+    monkeypatch.setattr(trace_util, "stage_latency", histogram)
+    return histogram
+
+
+def test_span_records_status(histogram):
+    with span("ok.stage"):
+        pass
+    with pytest.raises(ValueError):
+        with span("bad.stage"):
+            raise ValueError
+    rendered = histogram.render()
+    assert 'stage_latency_seconds_count{stage="ok.stage",status="ok"} 1' in rendered
+    assert 'stage_latency_seconds_count{stage="bad.stage",status="error"} 1' in rendered
+
+
+def test_traced_wraps_sync_and_async_functions(histogram):
+    @traced("sync.stage")
+    def add(a, b):
+        return a + b
+
+    @traced("async.stage")
+    async def double(a):
+        return a * 2
+
+    assert add(1, 2) == 3
+    assert asyncio.run(double(4)) == 8
+    rendered = histogram.render()
+    assert 'stage="sync.stage",status="ok"} 1' in rendered
+    assert 'stage="async.stage",status="ok"} 1' in rendered
@@ -0,0 +1,127 @@
+import os
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.api.daysummary.utils.filter_util import RetrievalFilterBuilder
+from app.api.utils.vector_store import NumpyVectorStore, compile_filter
+
+ROWS = [
+    {"user_id": 1, "baby_id": 1, "date": "2024-09-01", "role": "child", "text": "소풍"},
+    {"user_id": 1, "baby_id": 1, "date": "2024-09-02", "role": "parents", "text": "병원"},
+    {"user_id": 1, "baby_id": 1, "date": "2024-09-03", "role": "child", "text": "소풍 준비"},
+    {"user_id": 1, "baby_id": 2, "date": "2024-09-10", "role": "parents", "text": "생일"},
+    {"user_id": 2, "baby_id": 1, "date": "2024-10-01", "role": "child", "text": "운동회"},
+]
+
+
+def matching(expr):
+    predicate = compile_filter(expr)
+    return [i for i, row in enumerate(ROWS) if predicate(row)]
+
+
+@pytest.mark.parametrize(
+    "expr, rows",
+    [
+        ("", [0, 1, 2, 3, 4]),
+        (None, [0, 1, 2, 3, 4]),
+        ("date == '2024-09-02'", [1]),
+        ("role != 'child'", [1, 3]),
+        ("user_id in [2, 3]", [4]),
+        ("date not in ['2024-09-01', '2024-09-02']", [2, 3, 4]),
+        ("date >= '2024-09-02' and date <= '2024-09-10'", [1, 2, 3]),
+        ("'2024-09-02' <= date < '2024-09-10'", [1, 2]),
+        ("baby_id > 1 or user_id >= 2", [3, 4]),
+        ("role == 'child' and (date == '2024-09-01' or date == '2024-10-01')", [0, 4]),
+        ("role == 'child' && date > '2024-09-01' || baby_id == 2", [2, 3, 4]),
+        ("role == 'child' AND NOT date == '2024-09-01'", [2, 4]),
+        ("!(role == 'child')", [1, 3]),
+        ("not role in ['child']", [1, 3]),
+        ("text like '소풍%'", [0, 2]),
+        ("text like '_일'", [3]),
+    ],
+)
+def test_filter_matches_milvus_expression_semantics(expr, rows):
+    assert matching(expr) == rows
+
+
+def test_filter_accepts_filter_builder_output():
+    # 2024-09-11(수) 기준 지난주 = 9/2(월) ~ 9/8(일)
+    expr = RetrievalFilterBuilder().build("지난주에 아이 뭐 했어", lambda: "", today=date(2024, 9, 11))
+    assert matching(expr) == [2]
+
+
+@pytest.mark.parametrize(
+    "expr",
+    ["date ==", "height > 3", "len(text) > 1", "date == '2024-09-01' + 1", "user_id is 1"],
+)
+def test_filter_rejects_unsupported_expressions(expr):
+    with pytest.raises(ValueError):
+        compile_filter(expr)(ROWS[0])
+
+
+def entities(vectors, rows=ROWS):
+    return [{**row, "embedding": vector} for row, vector in zip(rows, vectors)]
+
+
+VECTORS = [[1, 0, 0], [0, 1, 0], [1, 1, 0], [1, 0, 0], [1, 0, 0]]
+
+
+def test_search_ranks_by_cosine_within_a_family():
+    store = NumpyVectorStore(3, initial_capacity=2)
+    assert store.insert(entities(VECTORS)) == 5
+
+    hits = store.search([2, 0, 0], user_id=1, baby_id=1, limit=2)
+    assert [hit["text"] for hit in hits] == ["소풍", "소풍 준비"]
+    assert hits[0]["score"] == pytest.approx(1.0)
+    assert hits[1]["score"] == pytest.approx(np.sqrt(0.5))
+
+    assert [hit["text"] for hit in store.search([1, 0, 0], 1, 2, limit=5)] == ["생일"]
+    assert store.search([1, 0, 0], 3, 1) == []
+
+
+def test_search_applies_filter():
+    store = NumpyVectorStore(3)
+    store.insert(entities(VECTORS))
+    hits = store.search([1, 0, 0], 1, 1, expr="role == 'parents'", limit=3)
+    assert [hit["date"] for hit in hits] == ["2024-09-02"]
+
+
+def test_insert_rejects_wrong_dimension():
+    with pytest.raises(ValueError):
+        NumpyVectorStore(4).insert(entities(VECTORS))
+
+
+def test_append_reload_search(tmp_path):
+    path = str(tmp_path / "store" / "diary")
+    store = NumpyVectorStore(3, path=path)
+    store.insert(entities(VECTORS[:2], ROWS[:2]))
+    store.insert(entities(VECTORS[2:], ROWS[2:]))
+    store.flush()
+
+    reloaded = NumpyVectorStore(3, path=path)
+    assert reloaded.count() == 5
+    assert reloaded.search([0, 1, 0], 1, 1) == store.search([0, 1, 0], 1, 1)
+
+    # 재시작 후에도 이어서 append
+    reloaded.insert(entities([[0, 0, 1]], [{**ROWS[0], "text": "새 일기"}]))
+    reloaded.flush()
+    assert NumpyVectorStore(3, path=path).search([0, 0, 1], 1, 1)[0]["text"] == "새 일기"
+
+
+def test_reload_drops_a_partially_written_tail(tmp_path):
+    path = str(tmp_path / "diary")
+    store = NumpyVectorStore(3, path=path)
+    store.insert(entities(VECTORS[:2], ROWS[:2]))
+    store.flush()
+    # 벡터만 쓰이고 메타데이터는 쓰이지 못한 상태
+    with open(f"{path}.f32", "ab") as f:
+        f.write(np.ones(3, dtype=np.float32).tobytes())
+
+    reloaded = NumpyVectorStore(3, path=path)
+    assert reloaded.count() == 2
+    assert os.path.getsize(f"{path}.f32") == 2 * 3 * 4
+    reloaded.insert(entities([[0, 0, 1]], ROWS[2:3]))
+    reloaded.flush()
+    assert NumpyVectorStore(3, path=path).search([0, 0, 1], 1, 1)[0]["text"] == "소풍 준비"